@@ -0,0 +1,871 @@
+"""
+Fakes and offline benchmarks for jarvis_pro_gui_final.
+
+    python jarvis_bench.py <name> [args]     e.g. router, fuzzy, e2e, startup
+    python jarvis_bench.py all
+"""
+
+import array
+import atexit
+import collections
+import contextlib
+import difflib
+import io
+import json
+import math
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import wave
+import webbrowser
+from pathlib import Path
+from typing import List, Optional
+
+import jarvis_pro_gui_final
+from jarvis_pro_gui_final import (
+    INTENTS, OPTIONAL_DEPS, RECOGNIZER_BACKENDS, AudioStream, FuzzyIndex, HeadlessService, IntentRouter,
+    JarvisCore, JsonLineClient, LanguageIdentifier, NotesStore, ProcessTable, RecognizerBackend,
+    WakeWordSpotter, WeatherClient, _ratio_difflib, _ratio_rapidfuzz, config, fuzz, process, requests, sr,
+)
+
+
+# ---------------- FAKES ----------------
+class NullTTS:
+    """Silent TTS stand-in recording (time, text, lang) of every utterance, for benchmarks."""
+
+    def __init__(self, config_ref=None):
+        self.config = config_ref
+        self.spoken = []
+
+    def speak(self, text: str, lang: Optional[str] = None, priority: int = None, status: bool = False):
+        if text:
+            self.spoken.append((time.perf_counter(), text, lang))
+
+    def cancel(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"queue_depth": 0, "spoken": len(self.spoken)}
+
+
+class RecordedMicrophone:
+    """
+    Microphone stand-in that plays back PCM audio through the sr.Microphone interface.
+    realtime=True paces reads like a live device; once the data runs out it yields
+    silence (end_with_silence=True) or ends the stream.
+    """
+
+    def __init__(self, data: bytes = b"", sample_rate: int = 16000, sample_width: int = 2,
+                 chunk: int = 1024, realtime: bool = False, end_with_silence: bool = True):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = sample_width
+        self.CHUNK = chunk
+        self.data = data
+        self.realtime = realtime
+        self.end_with_silence = end_with_silence
+        self.stream = None
+        self._pos = 0
+        self._next_read = None
+
+    @classmethod
+    def from_wav(cls, path: str, **kwargs) -> "RecordedMicrophone":
+        with wave.open(path, "rb") as w:
+            frames = w.readframes(w.getnframes())
+            width, channels = w.getsampwidth(), w.getnchannels()
+            if channels > 1:
+                # keep the first channel
+                frames = b"".join(frames[i:i + width] for i in range(0, len(frames), width * channels))
+            return cls(frames, sample_rate=w.getframerate(), sample_width=w.getsampwidth(), **kwargs)
+
+    def __enter__(self):
+        self.stream = self
+        self._pos = 0
+        self._next_read = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stream = None
+
+    def read(self, n: int) -> bytes:
+        size = n * self.SAMPLE_WIDTH
+        if self.realtime:
+            self._next_read += float(n) / self.SAMPLE_RATE
+            delay = self._next_read - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        chunk = self.data[self._pos:self._pos + size]
+        self._pos += size
+        if len(chunk) < size and self.end_with_silence:
+            chunk += b"\x00" * (size - len(chunk))
+        return chunk
+
+
+class ScriptedMicrophone(RecordedMicrophone):
+    """
+    Real-time microphone stand-in that is silent until say() queues an utterance; the time the
+    last sample of each utterance is read is kept as speech_ended_at (the true end of speech).
+    """
+
+    def __init__(self, sample_rate: int = 16000, **kwargs):
+        super().__init__(b"", sample_rate=sample_rate, realtime=True, end_with_silence=True, **kwargs)
+        self._lock = threading.Lock()
+        self.speech_ended_at = None
+
+    def say(self, pcm: bytes):
+        with self._lock:
+            self.data = pcm
+            self._pos = 0
+            self.speech_ended_at = None
+
+    def read(self, n: int) -> bytes:
+        with self._lock:
+            playing = self._pos < len(self.data)
+            chunk = super().read(n)
+            if playing and self._pos >= len(self.data):
+                self.speech_ended_at = time.perf_counter()
+            return chunk
+
+
+class FakeRecognizerBackend(RecognizerBackend):
+    """
+    Deterministic backend for tests and benchmarks: scripted (text, confidence) per language
+    with simulated latency. A str passed as audio is returned as the transcript.
+    """
+
+    name = "fake"
+
+    def __init__(self, config_ref=None, recognizer=None, results: dict = None, latency=0.0):
+        self.results = results or {}  # lang -> (text or None, confidence)
+        self.latency = latency if isinstance(latency, dict) else {}
+        self.default_latency = 0.0 if isinstance(latency, dict) else latency
+        self.calls = 0
+
+    def recognize(self, audio, lang: str):
+        self.calls += 1
+        time.sleep(self.latency.get(lang, self.default_latency))
+        if isinstance(audio, str):
+            return (audio, 1.0) if audio else (None, 0.0)
+        return self.results.get(lang, (None, 0.0))
+
+
+# config RECOGNIZER_BACKEND = "fake" selects it
+RECOGNIZER_BACKENDS["fake"] = FakeRecognizerBackend
+
+
+class _CallRecorder:
+    """Any attribute is a function that records (label, args) instead of acting."""
+
+    def __init__(self, label: str, calls: list):
+        self._label = label
+        self._calls = calls
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._calls.append((f"{self._label}.{name}", args))
+
+
+class FakeDesktop:
+    """
+    Context manager replacing the desktop side effects of handlers (webbrowser.open,
+    subprocess.Popen/run, os.kill, pyautogui, pywhatkit) with recorders; calls lists them.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._saved = []
+
+    def _record(self, label: str, result=None):
+        def fake(*args, **kwargs):
+            self.calls.append((label, args))
+            return result
+        return fake
+
+    def _patch(self, obj, name: str, value):
+        self._saved.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def __enter__(self):
+        module = jarvis_pro_gui_final
+        self._patch(webbrowser, "open", self._record("webbrowser.open", True))
+        self._patch(subprocess, "Popen", self._record("subprocess.Popen"))
+        self._patch(subprocess, "run", self._record("subprocess.run", subprocess.CompletedProcess([], 0)))
+        self._patch(os, "kill", self._record("os.kill"))
+        self._patch(module, "pyautogui", _CallRecorder("pyautogui", self.calls))
+        self._patch(module, "pywhatkit", _CallRecorder("pywhatkit", self.calls))
+        return self
+
+    def __exit__(self, *exc):
+        while self._saved:
+            obj, name, value = self._saved.pop()
+            setattr(obj, name, value)
+
+
+class FakeWeatherServer:
+    """
+    Local stand-in for the OpenWeather current-weather endpoint (same JSON shape), for tests and
+    benchmarks: python's threading HTTP server on 127.0.0.1 with optional per-request latency.
+    Unknown cities get OpenWeather's 404 body.
+    """
+
+    CITIES = {"delhi": ("haze", 31.5), "mumbai": ("light rain", 28.2), "amritsar": ("clear sky", 24.0),
+              "london": ("overcast clouds", 12.3)}
+
+    def __init__(self, latency: float = 0.0):
+        import http.server
+        server_ref = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def do_GET(self):
+                server_ref.requests += 1
+                time.sleep(server_ref.latency)
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                city = (query.get("q") or [""])[0].lower()
+                if city in server_ref.CITIES:
+                    desc, temp = server_ref.CITIES[city]
+                    status, body = 200, {"cod": 200, "name": city.title(), "weather": [{"description": desc}],
+                                         "main": {"temp": temp}}
+                else:
+                    status, body = 404, {"cod": "404", "message": "city not found"}
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.latency = latency
+        self.requests = 0
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/data/2.5/weather"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# ---------------- BENCHMARKS ----------------
+SAMPLE_COMMANDS = [
+    "open chrome", "close notepad", "search for python threading", "weather in delhi",
+    "take note buy milk", "play believer on youtube", "what time is it", "type hello world",
+    "translate hello to hi", "speak hindi", "open display settings", "stop listening",
+    "close tab", "tell me something nice",
+]
+
+
+def _time_per_call(fn, items, repeat: int = 200) -> float:
+    """Mean microseconds per call of fn over items."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for it in items:
+            fn(it)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(items))
+
+
+def bench_router():
+    print(f"{'custom intents':>15} {'us/command':>12}")
+    for n in (0, 100, 500, 2000):
+        custom = [{"name": f"custom_{i}", "keywords": [f"custom{i} action", f"do thing{i}"],
+                   "priority": 5, "handler": "handle_search"} for i in range(n)]
+        router = IntentRouter(INTENTS + custom)
+        print(f"{n:>15} {_time_per_call(router.match, SAMPLE_COMMANDS):>12.2f}")
+
+
+def _fuzzy_names(n: int) -> List[str]:
+    """n distinct app-like names built from a fixed syllable table."""
+    syl = ["ka", "lo", "mi", "tra", "zen", "po", "vi", "nex", "qu", "sha", "dor", "fe", "gri", "xo", "lum", "bet"]
+    names = []
+    for i in range(n):
+        parts, k = [], i
+        while True:
+            parts.append(syl[k % len(syl)])
+            k //= len(syl)
+            if not k:
+                break
+        names.append("".join(parts) + (" studio" if i % 3 == 0 else " player" if i % 3 == 1 else ""))
+    return names
+
+
+def bench_fuzzy():
+    """Trigram-shortlisted FuzzyIndex vs scoring every choice, per scorer and catalog size."""
+    scorers = [("difflib", _ratio_difflib)]
+    if fuzz:
+        scorers.insert(0, ("rapidfuzz", None))  # the default scorer, which full-scans small indexes
+    print(f"{'scorer':>10} {'entries':>8} {'build ms':>9} {'index us/q':>11} {'full scan us/q':>15} {'agree':>6}")
+    for n in (100, 10_000, 100_000):
+        names = _fuzzy_names(n)
+        # misheard versions: one character dropped from a spread of names
+        queries = [nm[:2] + nm[3:] for nm in names[::max(1, n // 20)]][:20]
+        for label, scorer in scorers:
+            start = time.perf_counter()
+            index = FuzzyIndex(names, scorer=scorer)
+            build_ms = (time.perf_counter() - start) * 1000
+            idx_us = _time_per_call(index.best, queries, repeat=5)
+            scan_queries = queries[:3] if n > 1000 else queries
+            if label == "rapidfuzz":
+                scan = lambda q: process.extractOne(q, names, scorer=fuzz.ratio, score_cutoff=60)
+            else:
+                scan = lambda q: difflib.get_close_matches(q, names, n=1, cutoff=0.6)
+            scan_us = _time_per_call(scan, scan_queries, repeat=1)
+            agree = 0  # same best score as the full scan (ties may pick a different name)
+            for q in scan_queries:
+                hit, full = index.best(q), scan(q)
+                full = (scorer or _ratio_rapidfuzz)(q, full[0]) if full else None
+                agree += (hit[1] if hit else None) == full
+            print(f"{label:>10} {n:>8} {build_ms:>9.1f} {idx_us:>11.1f} {scan_us:>15.1f} {agree:>3}/{len(scan_queries)}")
+
+
+def bench_close(count: int = 20):
+    """Closing a set of dummy processes with pkill -f vs the in-process /proc table."""
+    if not ProcessTable(config).available or not shutil.which("pkill"):
+        print("needs /proc and pkill")
+        return
+    count = int(count)
+    tmp = tempfile.mkdtemp(prefix="jarvis-bench-")
+    dummy = os.path.join(tmp, "jarvisbenchdummy")
+    os.symlink(shutil.which("sleep"), dummy)
+
+    def spawn():
+        procs = [subprocess.Popen([dummy, "60"]) for _ in range(count)]
+        time.sleep(0.05)
+        return procs
+
+    def reap(procs) -> int:
+        closed = 0
+        for p in procs:
+            try:
+                p.wait(timeout=2)
+                closed += 1
+            except subprocess.TimeoutExpired:
+                p.kill()
+                p.wait()
+        return closed
+
+    table = ProcessTable(config)
+    start = time.perf_counter()
+    table.refresh()
+    cold_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    table.refresh()
+    warm_ms = (time.perf_counter() - start) * 1000
+    print(f"/proc scan: {len(table.snapshot()):d} processes, cold {cold_ms:.2f} ms, warm refresh {warm_ms:.2f} ms")
+    rounds = 5
+    for label in ("pkill -f", "ProcessTable", "ProcessTable (cached)"):
+        total, closed = 0.0, 0
+        for _ in range(rounds):
+            procs = spawn()
+            if label == "ProcessTable (cached)":
+                table.refresh()
+            start = time.perf_counter()
+            if label == "pkill -f":
+                subprocess.run(["pkill", "-f", "jarvisbenchdummy"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                max_age = None if label.endswith("(cached)") else 0
+                table.terminate(table.find({"jarvisbenchdummy"}, max_age=max_age))
+            total += time.perf_counter() - start
+            closed += reap(procs)
+        print(f"{label:>22}: {total * 1000 / rounds:7.2f} ms/close, {closed}/{rounds * count} closed")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _bench_core(**overrides) -> "JarvisCore":
+    """JarvisCore over a copy of config with its files in a throwaway directory (removed at exit)."""
+    tmp = tempfile.mkdtemp(prefix="jarvis-bench-")
+    atexit.register(shutil.rmtree, tmp, ignore_errors=True)
+    cfg = dict(config, NOTES_FILE=os.path.join(tmp, "notes.txt"),
+               TRANSLATION_CACHE_FILE=os.path.join(tmp, "translation_cache.jsonl"),
+               APP_INDEX_FILE=os.path.join(tmp, "app_index.json"))
+    cfg.update(overrides)
+    return JarvisCore(cfg, queue.Queue())
+
+
+def bench_recognition():
+    """Serial vs concurrent language attempts when only the last language succeeds."""
+    fake = FakeRecognizerBackend(results={"en-IN": (None, 0.0), "hi-IN": (None, 0.0), "pa-IN": ("sat sri akal", 0.9)},
+                                 latency=0.05)
+    for mode in ("serial", "first_success", "best_confidence"):
+        core = _bench_core(RECOGNIZER_BACKEND="fake", RECOGNITION_MODE=mode)
+        core.backend = fake
+        runs = 10
+        start = time.perf_counter()
+        for _ in range(runs):
+            text = core.recognize_audio(None)
+        ms = (time.perf_counter() - start) * 1000 / runs
+        print(f"{mode:>16}: {ms:7.1f} ms/utterance -> {text!r}")
+
+
+def bench_wakeword(test_dir: str = None):
+    """
+    Idle CPU of the capture + gate stage on silence, and false-accept / false-reject rates of
+    the wake-word spotter over a directory of WAV files (names starting with 'wake' are positives).
+    """
+    seconds = 3.0
+    stream = AudioStream(lambda: RecordedMicrophone(realtime=True))
+    stream.start()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    stream.close()
+    print(f"idle capture CPU: {100 * cpu / wall:.2f}% of one core over {wall:.1f}s of silence")
+
+    if not test_dir:
+        print("pass a directory of WAV files to measure accuracy: python jarvis_bench.py wakeword <dir>")
+        return
+    if not sr:
+        print("SpeechRecognition is required to load the test set")
+        return
+    spotter = WakeWordSpotter(config)
+    if not spotter.has_model:
+        print("no Vosk model configured; only the voiced-duration gate is measured")
+    recognizer = sr.Recognizer()
+    counts = {"pos": 0, "neg": 0, "fa": 0, "fr": 0}
+    gate_ms = []
+    for path in sorted(Path(test_dir).glob("*.wav")):
+        with sr.AudioFile(str(path)) as src:
+            audio = recognizer.record(src)
+        positive = path.name.lower().startswith("wake")
+        start = time.perf_counter()
+        accepted = spotter.probable(audio)
+        gate_ms.append((time.perf_counter() - start) * 1000)
+        counts["pos" if positive else "neg"] += 1
+        if positive and not accepted:
+            counts["fr"] += 1
+        elif accepted and not positive:
+            counts["fa"] += 1
+    if not gate_ms:
+        print(f"no WAV files in {test_dir}")
+        return
+    print(f"files: {counts['pos']} wake / {counts['neg']} other, gate {sum(gate_ms) / len(gate_ms):.1f} ms avg")
+    print(f"false reject: {counts['fr'] / max(1, counts['pos']):.1%}  false accept: {counts['fa'] / max(1, counts['neg']):.1%}")
+
+
+# the phrases the token tables were written from: a regression check, not an accuracy figure
+LANG_ID_SAMPLES = [
+    ("open chrome", "en"), ("what is the weather today", "en"), ("play some music on youtube", "en"),
+    ("take a note about the meeting", "en"), ("how are you", "en"), ("search for python tutorials", "en"),
+    ("good morning jarvis", "en"), ("close the notepad please", "en"),
+    ("mujhe gaana sunao", "hi"), ("aaj mausam kaisa hai", "hi"), ("tum kaun ho", "hi"),
+    ("kya haal hai", "hi"), ("mera naam prince hai", "hi"), ("chrome kholo", "hi"),
+    ("yeh kya ho raha hai", "hi"), ("mujhe kuch nahi chahiye", "hi"), ("आज मौसम कैसा है", "hi"),
+    ("मुझे गाना सुनाओ", "hi"), ("क्रोम खोलो।", "hi"),
+    ("tusi kiven ho", "pa"), ("mainu gaana sunao ji", "pa"), ("sat sri akal paaji", "pa"),
+    ("tuhada naam ki hai", "pa"), ("menu changa lagda", "pa"), ("asi kal karange", "pa"),
+    ("kithe ja rahe ho tusi", "pa"), ("ਤੁਸੀਂ ਕਿਵੇਂ ਹੋ", "pa"), ("ਸਤ ਸ੍ਰੀ ਅਕਾਲ।", "pa"),
+    ("ਮੈਨੂੰ ਗਾਣਾ ਸੁਣਾਓ", "pa"),
+]
+
+# held out: written separately and never used to tune TOKEN_WEIGHTS / SUFFIX_WEIGHTS; keep it that way
+# (when a miss here prompts a table change, move the phrase to LANG_ID_SAMPLES and add a fresh one)
+LANG_ID_HELDOUT = [
+    ("set an alarm for six", "en"), ("turn up the volume", "en"), ("remind me to call mom", "en"),
+    ("who won the match yesterday", "en"), ("shut down the computer", "en"), ("read my latest email", "en"),
+    ("where is the nearest hospital", "en"), ("send a message to rahul", "en"),
+    ("light band kar do", "hi"), ("kal subah jaldi uthana", "hi"), ("paani peene ka time ho gaya", "hi"),
+    ("gaadi kahan khadi hai", "hi"), ("mujhe neend aa rahi hai", "hi"), ("aaj ki taaza khabar sunao", "hi"),
+    ("ghar pe kaun aaya tha", "hi"), ("thoda dheere bolo", "hi"), ("बत्ती बंद करो", "hi"),
+    ("kal aapan mele chalange", "pa"), ("roti kha layi tusi", "pa"), ("mera phone kithe pya hai", "pa"),
+    ("aaj bada thand hai ji", "pa"), ("gaddi hauli chala", "pa"), ("tuhanu ki chahida", "pa"),
+    ("main ghar ja reha haan", "pa"), ("ਅੱਜ ਮੌਸਮ ਕਿਹੋ ਜਿਹਾ ਹੈ", "pa"),
+]
+
+
+def _langid_score(lid, samples, label: str):
+    correct = 0
+    for text, expected in samples:
+        lang, conf = lid.identify(text)
+        correct += lang == expected
+        if lang != expected:
+            print(f"  miss: {text!r} -> {lang} ({conf}), expected {expected}")
+    print(f"{label}: {correct}/{len(samples)} ({correct / len(samples):.1%})")
+
+
+def bench_langid():
+    lid = LanguageIdentifier()
+    _langid_score(lid, LANG_ID_SAMPLES, "tuning phrases (tables built from these; regression only)")
+    _langid_score(lid, LANG_ID_HELDOUT, "held-out accuracy")
+    texts = [t for t, _ in LANG_ID_SAMPLES + LANG_ID_HELDOUT]
+    print(f"latency: {_time_per_call(lid.identify, texts, repeat=500):.2f} us/call")
+
+
+def bench_notes_search():
+    """Search index build and query time versus note count."""
+    words = [f"w{i}" for i in range(5000)] + ["milk", "meeting", "doctor", "birthday", "project"]
+    queries = ["milk", "meeting project", "doctor birthday", "w42", "w4999 milk"]
+    print(f"{'notes':>8} {'log+index build s':>18} {'search build s':>15} {'query ms':>9}")
+    for n in (1000, 10000, 100000):
+        tmp = Path(tempfile.mkdtemp(prefix="jarvis-bench-"))
+        path = tmp / "notes.txt"
+        with path.open("w", encoding="utf-8") as f:
+            for i in range(n):
+                picks = " ".join(words[(i * k * 7919) % len(words)] for k in range(1, 7))
+                f.write(f"[2024-01-01 10:00:00] note {i} {picks}\n")
+        start = time.perf_counter()
+        store = NotesStore(path)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        store.search_index.reset()
+        store.sync()
+        search_build = time.perf_counter() - start
+        query_ms = _time_per_call(lambda q: store.search(q, limit=10), queries, repeat=20) / 1000
+        print(f"{n:>8} {build:>18.2f} {search_build:>15.2f} {query_ms:>9.2f}")
+
+
+def bench_weather():
+    """Fresh connection per request vs pooled session vs cached city, against a local stand-in."""
+    if not requests:
+        print("requests not installed")
+        return
+    cities = ["delhi", "mumbai", "amritsar", "london"] * 5
+    with FakeWeatherServer() as server:
+        start = time.perf_counter()
+        for c in cities:
+            requests.get(server.url, params={"q": c, "appid": "bench", "units": "metric"}, timeout=8).json()
+        fresh = (time.perf_counter() - start) * 1000 / len(cities)
+        client = WeatherClient(dict(config, OPENWEATHER_URL=server.url, OPENWEATHER_API_KEY="bench",
+                                    WEATHER_CACHE_TTL=0))
+        start = time.perf_counter()
+        for c in cities:
+            client.current(c)
+        pooled = (time.perf_counter() - start) * 1000 / len(cities)
+        client.config["WEATHER_CACHE_TTL"] = 600
+        start = time.perf_counter()
+        for c in cities:
+            client.current(c.upper() + " ")
+        cached = (time.perf_counter() - start) * 1000 / len(cities)
+        client.close()
+    print(f"fresh connection: {fresh:.2f} ms/query")
+    print(f"pooled session:   {pooled:.2f} ms/query")
+    print(f"with city cache:  {cached:.3f} ms/query ({client.requests_made} requests for {2 * len(cities)} queries)")
+
+    # multi-city query with 100 ms provider latency: sequential vs concurrent
+    multi = ["delhi", "mumbai", "amritsar", "london"]
+    with FakeWeatherServer(latency=0.1) as server:
+        cfg = dict(config, OPENWEATHER_URL=server.url, OPENWEATHER_API_KEY="bench", WEATHER_CACHE_TTL=0)
+        client = WeatherClient(cfg)
+        start = time.perf_counter()
+        for c in multi:
+            client.current(c)
+        sequential = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        client.current_many(multi)
+        concurrent_ms = (time.perf_counter() - start) * 1000
+        client.close()
+    print(f"{len(multi)} cities @100 ms: sequential {sequential:.0f} ms, concurrent {concurrent_ms:.0f} ms")
+
+
+HEADLESS_COMMANDS = ["what time is it", "take note buy milk", "find notes milk", "speak english",
+                     "read notes", "auto reply on", "what is the date"]
+
+
+def bench_headless(count: int = 2000):
+    """Startup and back-to-back throughput of the headless worker on side-effect-free commands."""
+    count = int(count)
+    tmp = tempfile.mkdtemp(prefix="jarvis-bench-")
+    cfg = dict(config, NOTES_FILE=os.path.join(tmp, "notes.txt"), APP_INDEX_FILE=os.path.join(tmp, "app_index.json"),
+               TRANSLATION_CACHE_FILE=os.path.join(tmp, "translation_cache.jsonl"),
+               RECOGNIZER_BACKEND="fake", TTS_ENABLED=False, MICROPHONE=False)
+    service = HeadlessService(cfg)
+    stream = io.StringIO()
+    client = JsonLineClient(stream)
+    service.connect(client)
+    saved, sys.stdout = sys.stdout, io.StringIO()  # silence the console echo of replies
+    try:
+        start = time.perf_counter()
+        for i in range(count):
+            service.submit(client, HEADLESS_COMMANDS[i % len(HEADLESS_COMMANDS)])
+        client.wait_idle()
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdout = saved
+        service.disconnect(client)
+        service.shutdown()
+    done = [json.loads(ln)["data"]["ms"] for ln in stream.getvalue().splitlines() if '"event": "done"' in ln]
+    done.sort()
+    print(f"startup {service.startup_ms:.1f} ms, {len(done)} commands in {elapsed * 1000:.0f} ms "
+          f"({len(done) / elapsed:.0f} cmds/s, p50 {done[len(done) // 2]:.2f} ms, max {done[-1]:.2f} ms)")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+class _RecordingClient(JsonLineClient):
+    """Benchmark client keeping each command's submit-to-done latency instead of writing JSON."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.latencies_ms = []
+
+    def send(self, event: dict):
+        if event.get("event") == "done":
+            data = event["data"]
+            self.latencies_ms.append(data["wait_ms"] + data["ms"])
+
+
+def bench_sessions(per_session: int = 40):
+    """Load test: commands/s and p50/p99 submit-to-done latency as concurrent (closed-loop) sessions grow."""
+    per_session = int(per_session)
+    with contextlib.ExitStack() as stack:
+        overrides = {}
+        commands = ["speak hindi", "take note check the oven", "what time is it", "speak english", "find notes oven"]
+        if requests:
+            # one I/O-bound command per cycle against a 10 ms stand-in provider
+            server = stack.enter_context(FakeWeatherServer(latency=0.01))
+            overrides = dict(OPENWEATHER_URL=server.url, OPENWEATHER_API_KEY="bench", WEATHER_CACHE_TTL=0)
+            commands.append("weather in delhi")
+        saved = sys.stdout
+        sys.stdout = io.StringIO()  # silence the console echo of replies
+        stack.callback(setattr, sys, "stdout", saved)
+        rows = []
+        for n in (1, 4, 16, 64):
+            tmp = tempfile.mkdtemp(prefix="jarvis-bench-")
+            cfg = dict(config, NOTES_FILE=os.path.join(tmp, "notes.txt"), APP_INDEX_FILE=os.path.join(tmp, "apps.json"),
+                       TRANSLATION_CACHE_FILE=os.path.join(tmp, "translation_cache.jsonl"),
+                       SESSION_NOTES_DIR=os.path.join(tmp, "sessions"), RECOGNIZER_BACKEND="fake",
+                       TTS_ENABLED=False, MICROPHONE=False, **overrides)
+            service = HeadlessService(cfg)
+            clients = [_RecordingClient() for _ in range(n)]
+
+            def user(k):
+                # closed loop: each user sends its next command once the previous one is done
+                for i in range(per_session):
+                    service.submit(clients[k], commands[(i + k) % len(commands)], f"user{k}")
+                    clients[k].wait_idle()
+
+            users = [threading.Thread(target=user, args=(k,)) for k in range(n)]
+            start = time.perf_counter()
+            for t in users:
+                t.start()
+            for t in users:
+                t.join()
+            elapsed = time.perf_counter() - start
+            # each session must end in the language of its own last switch
+            isolated = all(service.sessions[f"user{k}"].core.config.get("RESPONSE_LANGUAGE") ==
+                           next(("hi" if c == "speak hindi" else "en") for c in reversed(
+                               [commands[(i + k) % len(commands)] for i in range(per_session)]) if c.startswith("speak"))
+                           for k in range(n))
+            service.shutdown()
+            lat = sorted(ms for c in clients for ms in c.latencies_ms)
+            rows.append((n, len(lat) / elapsed, lat[len(lat) // 2], lat[min(len(lat) - 1, int(len(lat) * 0.99))],
+                         isolated and cfg["RESPONSE_LANGUAGE"] == config["RESPONSE_LANGUAGE"]))
+            shutil.rmtree(tmp, ignore_errors=True)
+    print(f"{'sessions':>8} {'cmds/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'isolated':>9}")
+    for n, rate, p50, p99, ok in rows:
+        print(f"{n:>8} {rate:>9.0f} {p50:>8.2f} {p99:>8.2f} {str(ok):>9}")
+
+
+E2E_COMMANDS = [
+    "open chrome", "close notepad", "search for python threading", "weather in delhi", "take note buy milk",
+    "play believer on youtube", "what time is it", "type hello world", "translate hello to hi", "speak hindi",
+    "find notes milk", "close tab",
+]
+
+
+def _tone(seconds: float, sample_rate: int = 16000, amplitude: int = 4000) -> bytes:
+    """16-bit mono sine burst standing in for a spoken phrase."""
+    n = int(seconds * sample_rate)
+    return array.array("h", (int(amplitude * math.sin(2 * math.pi * 220 * i / sample_rate)) for i in range(n))).tobytes()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+
+def bench_e2e(reps: int = 3, asr_latency: float = 0.15, pause: float = 0.8):
+    """
+    End-of-speech to first spoken reply per intent, through listen_once -> process_command ->
+    handler -> TTS, with a scripted real-time microphone, a stub recognizer (asr_latency seconds
+    per call), a silent TTS and recorded desktop side effects. Needs speech_recognition only.
+    """
+    if not sr:
+        print("speech_recognition not installed")
+        return
+    reps, asr_latency, pause = int(reps), float(asr_latency), float(pause)
+    with contextlib.ExitStack() as stack:
+        overrides = {}
+        if requests:
+            server = stack.enter_context(FakeWeatherServer(latency=0.02))
+            overrides = dict(OPENWEATHER_URL=server.url, OPENWEATHER_API_KEY="bench", WEATHER_CACHE_TTL=0)
+        core = _bench_core(RECOGNIZER_BACKEND="fake", TTS_ENABLED=False, AUTO_LANGUAGE_REPLY=False,
+                           RESPONSE_LANGUAGE="en", **overrides)
+        stack.callback(core.shutdown)
+        desktop = stack.enter_context(FakeDesktop())
+        core.tts = tts = NullTTS()
+        core.backend = asr = FakeRecognizerBackend(latency=asr_latency)
+        mic = ScriptedMicrophone()
+        core.audio_stream = AudioStream(lambda: mic, pause_threshold=pause)
+        core.audio_stream.start()
+        saved, sys.stdout = sys.stdout, io.StringIO()  # silence the console echo of replies
+        stack.callback(setattr, sys, "stdout", saved)
+        speech = _tone(0.4)
+        rows = collections.defaultdict(lambda: {"listen": [], "handle": [], "total": []})
+        commands = [c for c in E2E_COMMANDS if requests or "weather" not in c]
+        for _ in range(reps):
+            for command in commands:
+                asr.results = {lang: (command, 0.95) for lang in core.config.get("LANGUAGES", ["en-IN"])}
+                before = len(tts.spoken)
+                mic.say(speech)
+                text = core.listen_once(timeout=5, phrase_time_limit=6)
+                heard = time.perf_counter()
+                core.process_command(text)
+                intent = core.router.match(command)
+                replies = tts.spoken[before:]
+                if not text or not replies or mic.speech_ended_at is None:
+                    continue
+                row = rows[intent.name if intent else "fallback"]
+                row["listen"].append((heard - mic.speech_ended_at) * 1000)
+                row["handle"].append((replies[0][0] - heard) * 1000)
+                row["total"].append((replies[0][0] - mic.speech_ended_at) * 1000)
+                core.config["RESPONSE_LANGUAGE"] = "en"
+    print(f"pause_threshold {pause:.2f} s, recognizer {asr_latency * 1000:.0f} ms/call, {len(desktop.calls)} side effects recorded")
+    print(f"{'intent':>14} {'n':>3} {'endpoint+asr p50':>17} {'handler p50':>12} {'reply p50':>10} {'p90':>8} {'max':>8}")
+    for name, row in sorted(rows.items(), key=lambda kv: -_percentile(kv[1]["total"], 0.5)):
+        total = row["total"]
+        print(f"{name:>14} {len(total):>3} {_percentile(row['listen'], 0.5):>17.1f} {_percentile(row['handle'], 0.5):>12.2f} "
+              f"{_percentile(total, 0.5):>10.1f} {_percentile(total, 0.9):>8.1f} {max(total):>8.1f}")
+
+
+def bench_metrics():
+    """Cost of one timing span and of a full text command with metrics off, on, and tracing to a file."""
+    tmp = tempfile.mkdtemp(prefix="jarvis-bench-")
+    trace_path = os.path.join(tmp, "trace.jsonl")
+    print(f"{'metrics':>10} {'us/span':>8} {'us/command':>11}")
+    saved, sys.stdout = sys.stdout, io.StringIO()  # silence the console echo of replies
+    rows = []
+    try:
+        for label, overrides in (("off", dict(METRICS_ENABLED=False)), ("on", {}),
+                                 ("trace", dict(METRICS_TRACE_FILE=trace_path))):
+            core = _bench_core(RECOGNIZER_BACKEND="fake", TTS_ENABLED=False, **overrides)
+            core.tts = NullTTS()
+            metrics = core.metrics
+
+            def one_span(_):
+                with metrics.span("bench"):
+                    pass
+
+            span_us = _time_per_call(one_span, range(1000), repeat=50)
+            cmd_us = _time_per_call(core.process_command, ["what time is it", "speak english"], repeat=2000)
+            rows.append((label, span_us, cmd_us))
+            core.shutdown()
+    finally:
+        sys.stdout = saved
+    for label, span_us, cmd_us in rows:
+        print(f"{label:>10} {span_us:>8.3f} {cmd_us:>11.2f}")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+_STARTUP_SCRIPT = r"""
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import jarvis_pro_gui_final as jarvis
+imported = time.perf_counter()
+tmp = os.getcwd()
+cfg = dict(jarvis.config, NOTES_FILE=os.path.join(tmp, "notes.txt"), APP_INDEX_FILE=os.path.join(tmp, "apps.json"),
+           TRANSLATION_CACHE_FILE=os.path.join(tmp, "translation_cache.jsonl"), WARM_UP=[])
+core = jarvis.JarvisCore(cfg, jarvis.UIDispatcher())
+built = time.perf_counter()
+window_ms, no_window = None, "tkinter not available"
+if jarvis.tk:
+    try:
+        gui = jarvis.open_window(core)
+        gui.update()
+        window_ms = (time.perf_counter() - start) * 1000
+        gui.destroy()
+    except Exception as e:
+        no_window = str(e).splitlines()[0]
+sys.stderr.write("--- window\n")
+sys.stderr.flush()
+deferred = {name: [dep.load() is not None, dep.load_ms] for name, dep in jarvis.OPTIONAL_DEPS.items()}
+print(json.dumps({"import_ms": (imported - start) * 1000, "core_ms": (built - imported) * 1000,
+                  "window_ms": window_ms, "no_window": no_window, "deferred_ms": deferred}))
+"""
+
+
+def bench_startup():
+    """Time to window in a fresh interpreter, and what each optional dependency costs to import."""
+    tmp = tempfile.mkdtemp(prefix="jarvis-bench-")
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPT, here],
+                          cwd=tmp, capture_output=True, text=True, timeout=120)
+    shutil.rmtree(tmp, ignore_errors=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        return
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    before, after = proc.stderr.split("--- window\n", 1)
+    watched = set(OPTIONAL_DEPS) | {"tkinter", "_tkinter", "jarvis_pro_gui_final"}
+
+    def cumulative(text):
+        found = {}
+        for line in text.splitlines():
+            m = re.match(r"import time:\s+\d+\s*\|\s*(\d+)\s*\|\s*(\S+)", line)
+            if m and m.group(2) in watched:
+                found[m.group(2)] = int(m.group(1)) / 1000
+        return found
+
+    print(f"module import   {result['import_ms']:8.1f} ms")
+    print(f"JarvisCore()    {result['core_ms']:8.1f} ms")
+    if result["window_ms"] is not None:
+        print(f"time to window  {result['window_ms']:8.1f} ms")
+    else:
+        print(f"time to window       n/a ({result['no_window']})")
+    print(f"\n{'module':>22} {'before window ms':>17} {'deferred ms':>12}")
+    startup, deferred = cumulative(before), cumulative(after)
+    for name in sorted(watched, key=lambda n: -max(startup.get(n, 0), deferred.get(n, 0))):
+        ok, lazy_ms = result["deferred_ms"].get(name, (True, 0))
+        if name in startup or name in deferred or name in OPTIONAL_DEPS:
+            print(f"{name:>22} {startup.get(name, 0):>17.1f} {deferred.get(name, lazy_ms):>12.1f}"
+                  + ("" if ok else "  (not installed)"))
+    total = sum(ms for _ok, ms in result["deferred_ms"].values())
+    print(f"\nloaded in the background after the window: {total:.1f} ms")
+
+
+BENCHMARKS = {
+    "router": bench_router,
+    "recognition": bench_recognition,
+    "wakeword": bench_wakeword,
+    "langid": bench_langid,
+    "notes_search": bench_notes_search,
+    "weather": bench_weather,
+    "fuzzy": bench_fuzzy,
+    "close": bench_close,
+    "headless": bench_headless,
+    "sessions": bench_sessions,
+    "e2e": bench_e2e,
+    "metrics": bench_metrics,
+    "startup": bench_startup,
+}
+
+
+def run_benchmark(name: str, *args):
+    names = list(BENCHMARKS) if name == "all" else [name]
+    for n in names:
+        if n not in BENCHMARKS:
+            print(f"Unknown benchmark: {n}. Available: {', '.join(BENCHMARKS)}, all")
+            return
+        print(f"== {n} ==")
+        BENCHMARKS[n](*args)
+
+
+if __name__ == '__main__':
+    run_benchmark(*(sys.argv[1:] or ["all"]))
@@ -1,1045 +1,4008 @@
-"""
-Jarvis AI - Pro (GUI + Voice control + App open/close + Inside-app tasks)
-Final file with:
- - Multilingual (English, Hindi, Punjabi) listening
- - Auto-language reply (Jarvis replies in the language you spoke)
- - Translation features (using googletrans when available)
- - GUI language selector (Auto / en / hi / pa) and small Translate panel
- - Graceful fallbacks when optional deps missing
-
-Author: (Your Name) - adapted for Prince
-Save as jarvis_pro_gui_final.py and run: python jarvis_pro_gui_final.py
-"""
-
-import threading
-import queue
-import time
-import os
-import sys
-import webbrowser
-import subprocess
-import datetime
-from pathlib import Path
-from typing import Optional
-
-# optional imports with graceful fallbacks
-try:
-    import speech_recognition as sr
-except Exception:
-    sr = None
-
-try:
-    import pyttsx3
-except Exception:
-    pyttsx3 = None
-
-try:
-    import requests
-except Exception:
-    requests = None
-
-try:
-    import pywhatkit
-except Exception:
-    pywhatkit = None
-
-try:
-    import pyautogui
-except Exception:
-    pyautogui = None
-
-try:
-    from rapidfuzz import fuzz, process
-    _HAS_RAPIDFUZZ = True
-except Exception:
-    import difflib
-    _HAS_RAPIDFUZZ = False
-
-# translation library (optional)
-try:
-    from googletrans import Translator as GoogleTranslator
-    _HAS_GOOGLETRANS = True
-except Exception:
-    GoogleTranslator = None
-    _HAS_GOOGLETRANS = False
-
-try:
-    import tkinter as tk
-    from tkinter import ttk, messagebox, scrolledtext
-except Exception:
-    tk = None
-
-# ---------------- CONFIG ----------------
-config = {
-    "OPENWEATHER_API_KEY": "PUT_YOUR_OPENWEATHER_API_KEY_HERE",
-    "USER_NAME": "Prince",
-    "NOTES_FILE": "jarvis_notes_gui.txt",
-    "WAKE_WORDS": ["jarvis", "hey jarvis", "ok jarvis", "prince", "please","Riya","hey Riya","ok Riya","please Riya"],
-    # Map friendly app names to file paths (Windows) or command names (mac/linux)
-    "APPS": {
-       # Browsers
-    "chrome": r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
-    "brave": r"C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-    "edge": r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe",
-
-    # Code & Editors
-    "vscode": r"C:\\Users\\princ\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe",
-    "notepad": "notepad.exe",
-
-    # System Apps
-    "file explorer": r"C:\\Windows\\explorer.exe",
-    "explorer": r"C:\\Windows\\explorer.exe",
-    "cmd": r"C:\\Windows\\System32\\cmd.exe",
-    "command prompt": r"C:\\Windows\\System32\\cmd.exe",
-    "powershell": r"C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe",
-    "terminal": r"C:\\Users\\princ\\AppData\\Local\\Microsoft\\WindowsApps\\wt.exe",
-
-    # Basic Windows Tools
-    "calculator": "calc",
-    "paint": r"C:\\Windows\\System32\\mspaint.exe",
-    "camera": r"microsoft.windows.camera:",
-    "snipping tool": r"C:\\Windows\\System32\\SnippingTool.exe",
-
-    # Settings & Controls
-    "settings": "ms-settings:",
-    "wifi": "ms-settings:network-wifi",
-    "bluetooth": "ms-settings:bluetooth",
-    "update": "ms-settings:windowsupdate",
-    "display": "ms-settings:display",
-    "sound": "ms-settings:sound",
-    "power": "ms-settings:powersleep",
-    "battery": "ms-settings:batterysaver",
-    "apps settings": "ms-settings:appsfeatures",
-
-    # Control Panels
-    "control panel": r"C:\\Windows\\System32\\control.exe",
-    "system info": r"C:\\Windows\\System32\\msinfo32.exe",
-
-    # Admin / Task Tools
-    "task manager": r"C:\\Windows\\System32\\Taskmgr.exe",
-    "run": r"C:\\Windows\\System32\\run.exe"  # Opens Run dialog
-    },
-    # languages to attempt for recognition (order)
-    "LANGUAGES": ["en-IN", "hi-IN", "pa-IN"],
-    # "RESPONSE_LANGUAGE": "auto" (auto means follow speaker if auto_reply enabled)
-    "RESPONSE_LANGUAGE": "en",  # default speaking language (en / hi / pa / auto)
-    "AUTO_LANGUAGE_REPLY": True,  # if True, Jarvis replies in the same language the user spoke
-}
-# ----------------------------------------
-
-def resolve_path(path: str) -> str:
-    if not path:
-        return path
-    return os.path.expanduser(os.path.expandvars(path))
-
-
-class TTS:
-    def __init__(self, config_ref):
-        self.engine = None
-        self.config = config_ref
-        if pyttsx3:
-            try:
-                self.engine = pyttsx3.init()
-                rate = self.engine.getProperty("rate")
-                # slightly slower
-                self.engine.setProperty("rate", int(rate * 0.95))
-            except Exception:
-                self.engine = None
-
-
-        # optional googletrans fallback TTS could be added, but to keep simple we use pyttsx3 only
-        # note: pyttsx3 voices vary by system. We'll try to pick a voice matching language codes.
-
-    def _find_voice_for_lang(self, target_lang_code: str):
-        """Try to find a voice id that matches the short language code (en, hi, pa)."""
-        if not self.engine or not target_lang_code:
-            return None
-        try:
-            voices = self.engine.getProperty("voices")
-            for v in voices:
-                # try multiple heuristics: v.languages, v.id, v.name
-                try:
-                    langs = []
-                    if hasattr(v, 'languages') and v.languages:
-                        # languages can be like [b'\x05en_GB'] or ['en_US']
-                        for L in v.languages:
-                            if isinstance(L, bytes):
-                                try:
-                                    langs.append(L.decode('utf-8', errors='ignore'))
-                                except Exception:
-                                    pass
-                            else:
-                                langs.append(str(L))
-                    # combine properties
-                    searchable = " ".join([str(v.id or ""), str(v.name or "")] + langs).lower()
-                    if target_lang_code in searchable or f"{target_lang_code}-" in searchable or f"{target_lang_code}_" in searchable:
-                        return v.id
-                except Exception:
-                    continue
-            # fallback heuristics: 'hindi' or 'punjabi' in name
-            for v in voices:
-                try:
-                    name_search = (v.name or "").lower()
-                    if target_lang_code == "hi" and ("hindi" in name_search or "hind" in name_search):
-                        return v.id
-                    if target_lang_code == "pa" and ("punjabi" in name_search or "punjabi" in name_search):
-                        return v.id
-                except Exception:
-                    continue
-        except Exception:
-            return None
-        return None
-
-    def speak(self, text: str, lang: Optional[str] = None):
-        """Speak text. lang is short code: 'en', 'hi', 'pa', or None to use config."""
-        if not text:
-            return
-        # decide language
-        if lang is None:
-            resp_lang = self.config.get("RESPONSE_LANGUAGE", "en")
-            if resp_lang == "auto":
-                resp_lang = "en"
-        else:
-            resp_lang = lang
-
-        print("Jarvis:", text)
-        if self.engine:
-            try:
-                # try to set voice if we can find appropriate one
-                voice_id = None
-                short = None
-                if resp_lang and len(resp_lang) >= 2:
-                    # given values in config may be 'en' or 'hi' or 'pa' or full like 'en-IN'
-                    short = resp_lang.split("-")[0]
-                if short:
-                    voice_id = self._find_voice_for_lang(short)
-                if voice_id:
-                    try:
-                        self.engine.setProperty("voice", voice_id)
-                    except Exception:
-                        pass
-                # speak in background thread
-                threading.Thread(target=self._say, args=(text,), daemon=True).start()
-            except Exception:
-                pass
-
-    def _say(self, text: str):
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception:
-            pass
-
-
-class JarvisCore:
-    def __init__(self, config: dict, out_queue: queue.Queue):
-        self.config = config
-        self.out_queue = out_queue
-        self.username = config.get("USER_NAME", "User")
-        self.notes_file = Path(config.get("NOTES_FILE", "jarvis_notes_gui.txt"))
-        self.notes_file.parent.mkdir(parents=True, exist_ok=True)
-        self.notes_file.touch(exist_ok=True)
-        self.wake_words = config.get("WAKE_WORDS", [])
-        self.recognizer = sr.Recognizer() if sr else None
-        self.tts = TTS(config)
-        self.listening = False
-        self._stop_listening_flag = threading.Event()
-        self.translator = GoogleTranslator() if _HAS_GOOGLETRANS else None
-        self.last_detected_lang = "en"  # short code like 'en', 'hi', 'pa'
-
-    def _put(self, typ: str, payload):
-        try:
-            self.out_queue.put((typ, payload))
-        except Exception:
-            pass
-
-    def speak(self, text: str, lang: Optional[str] = None):
-        # if auto-reply enabled, prefer last_detected_lang
-        if self.config.get("AUTO_LANGUAGE_REPLY", False):
-            lang_to_use = self.last_detected_lang or lang or self.config.get("RESPONSE_LANGUAGE", "en")
-        else:
-            # use explicit RESPONSE_LANGUAGE unless set to 'auto'
-            resp = self.config.get("RESPONSE_LANGUAGE", "en")
-            if resp == "auto":
-                lang_to_use = self.last_detected_lang or lang or "en"
-            else:
-                lang_to_use = lang or resp
-        # normalize to short codes
-        if isinstance(lang_to_use, str) and "-" in lang_to_use:
-            lang_to_use = lang_to_use.split("-")[0]
-        # finally speak
-        self.tts.speak(text, lang=lang_to_use)
-        self._put("status", f"Spoke: {text}")
-
-    def listen_once(self, timeout: Optional[int] = None, phrase_time_limit: Optional[int] = None) -> Optional[str]:
-        """
-        Listen once and try to recognize speech. We attempt multiple languages (config LANGUAGES).
-        After recognition, detect language (if translator available) and set last_detected_lang.
-        """
-        if not self.recognizer:
-            self._put("status", "SpeechRecognition not available")
-            return None
-        try:
-            with sr.Microphone() as source:
-                self._put("status", "Listening...")
-                try:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.4)
-                except Exception:
-                    pass
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-                self._put("status", "Recognizing...")
-                # try multiple languages
-                detected_text = None
-                for lang in self.config.get("LANGUAGES", ["en-IN"]):
-                    try:
-                        text = self.recognizer.recognize_google(audio, language=lang)
-                        if text:
-                            detected_text = text
-                            break
-                    except sr.UnknownValueError:
-                        continue
-                    except Exception:
-                        continue
-
-                if not detected_text:
-                    self._put("status", "Could not understand audio")
-                    return None
-
-                # detected_text now holds string. detect language using translator if possible
-                text_low = detected_text.lower()
-                detected_lang_short = "en"
-                if self.translator:
-                    try:
-                        det = self.translator.detect(detected_text)
-                        if det and hasattr(det, 'lang'):
-                            # map to short code (googletrans returns 'en', 'hi', 'pa')
-                            detected_lang_short = det.lang.split('-')[0]
-                    except Exception:
-                        # fallback heuristic: check presence of Hindi/Punjabi words
-                        detected_lang_short = self._heuristic_lang_detect(text_low)
-                else:
-                    detected_lang_short = self._heuristic_lang_detect(text_low)
-
-                # update last detected
-                self.last_detected_lang = detected_lang_short
-                self._put("last_command", detected_text)
-                return detected_text.lower()
-        except sr.WaitTimeoutError:
-            self._put("status", "Listen timeout")
-            return None
-        except sr.UnknownValueError:
-            self._put("status", "Could not understand audio")
-            return None
-        except sr.RequestError as e:
-            self._put("status", f"Speech service error: {e}")
-            return None
-        except Exception as e:
-            self._put("status", f"Unexpected listening error: {e}")
-            return None
-
-    def _heuristic_lang_detect(self, text: str) -> str:
-        """Very small heuristic if googletrans not available: look for Devanagari or Punjabi words."""
-        # Devanagari unicode range roughly \u0900-\u097F
-        if any('\u0900' <= ch <= '\u097F' for ch in text):
-            return 'hi'
-        # presence of common Hindi words (in latin) - weak heuristic
-        hi_tokens = ['kya', 'hai', 'hamesha', 'kar', 'kaun', 'ka']
-        pa_tokens = ['ki', 'ki', 'hun', 'haan', 'kiven', 'kidaan', 'sadda']
-        words = text.split()
-        for t in words:
-            if t in hi_tokens:
-                return 'hi'
-            if t in pa_tokens:
-                return 'pa'
-        # default
-        return 'en'
-
-    def is_wake_word(self, text: str) -> bool:
-        if not text:
-            return False
-        for w in self.wake_words:
-            if w in text:
-                return True
-        return False
-
-    # fuzzy app name matcher
-    def fuzzy_match(self, command: str, choices: dict):
-        if not choices:
-            return None
-        if _HAS_RAPIDFUZZ:
-            best = process.extractOne(command, choices.keys(), scorer=fuzz.ratio)
-            if best and best[1] >= 60:
-                return best[0]
-            return None
-        else:
-            keys = list(choices.keys())
-            matches = difflib.get_close_matches(command, keys, n=1, cutoff=0.5)
-            return matches[0] if matches else None
-
-    # Open application by config name or command
-    def handle_open_app(self, command: str):
-        for name, path in self.config.get("APPS", {}).items():
-            if name in command:
-                resolved = resolve_path(path)
-                try:
-                    if sys.platform.startswith("win"):
-                        os.startfile(resolved)
-                    elif sys.platform == "darwin":
-                        subprocess.Popen(["open", resolved])
-                    else:
-                        if os.path.exists(resolved):
-                            subprocess.Popen([resolved])
-                        else:
-                            subprocess.Popen(resolved.split())
-                    self.speak(f"Opening {name}")
-                    return
-                except Exception as e:
-                    print("open app error", e)
-                    self.speak(f"Couldn't open {name}")
-                    return
-        # fallback: youtube or web
-        if "youtube" in command:
-            webbrowser.open("https://www.youtube.com")
-            self.speak("Opening YouTube")
-            return
-        best = self.fuzzy_match(command, self.config.get("APPS", {}))
-        if best:
-            try:
-                resolved = resolve_path(self.config['APPS'][best])
-                if sys.platform.startswith('win'):
-                    os.startfile(resolved)
-                elif sys.platform == 'darwin':
-                    subprocess.Popen(['open', resolved])
-                else:
-                    if os.path.exists(resolved):
-                        subprocess.Popen([resolved])
-                    else:
-                        subprocess.Popen(resolved.split())
-                self.speak(f"Opening {best}")
-                return
-            except Exception as e:
-                print("fuzzy open error", e)
-        self.speak("I could not find that application. Please add it to APPS in config.")
-
-    # Close application by name (best-effort) - cross-platform
-    def handle_close_app(self, command: str):
-        target = command
-        for w in ["close", "kill", "stop", "exit"]:
-            target = target.replace(w, "")
-        target = target.strip()
-        if not target:
-            self.speak("Which application should I close?")
-            resp = self.listen_once(timeout=5, phrase_time_limit=4)
-            if not resp:
-                return
-            target = resp
-        # try config mapping
-        for name, path in self.config.get("APPS", {}).items():
-            if name in target:
-                proc_name = os.path.basename(path)
-                try:
-                    if sys.platform.startswith('win'):
-                        subprocess.run(["taskkill", "/f", "/im", proc_name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    else:
-                        subprocess.run(["pkill", "-f", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    self.speak(f"Attempted to close {name}")
-                    return
-                except Exception as e:
-                    print("close error", e)
-                    self.speak("Failed to close application")
-                    return
-        # generic close attempts
-        try:
-            if sys.platform.startswith('win'):
-                subprocess.run(["taskkill", "/f", "/im", f"{target}.exe"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            else:
-                subprocess.run(["pkill", "-f", target], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            self.speak(f"Attempted to close {target}")
-        except Exception as e:
-            print("close generic error", e)
-            self.speak("Failed to close app")
-
-    # Inside-app tasks using pyautogui
-    def handle_inside_task(self, command: str):
-        if not pyautogui:
-            self.speak("pyautogui not installed. Install it to use inside-app tasks.")
-            return
-        # simple parsing
-        if "type" in command:
-            text = command.split("type", 1)[1].strip()
-            pyautogui.typewrite(text, interval=0.05)
-            self.speak("Typed the text")
-        elif "press enter" in command or "press return" in command:
-            pyautogui.press('enter')
-            self.speak("Pressed enter")
-        elif "press escape" in command or "press esc" in command:
-            pyautogui.press('esc')
-            self.speak("Pressed escape")
-        elif "new tab" in command:
-            pyautogui.hotkey('ctrl', 't')
-            self.speak('Opened new tab')
-        elif "close tab" in command:
-            pyautogui.hotkey('ctrl', 'w')
-            self.speak('Closed tab')
-        elif "copy" in command:
-            pyautogui.hotkey('ctrl', 'c')
-            self.speak('Copied')
-        elif "paste" in command:
-            pyautogui.hotkey('ctrl', 'v')
-            self.speak('Pasted')
-        else:
-            self.speak("Task not recognized for inside-app automation.")
-
-    def handle_search(self, command: str):
-        query = command
-        for trigger in ["search for", "search", "google"]:
-            if trigger in command:
-                query = command.split(trigger, 1)[-1].strip()
-                break
-        if not query:
-            self.speak("What should I search for?")
-            q = self.listen_once(timeout=5, phrase_time_limit=8)
-            if not q:
-                self.speak("No query received.")
-                return
-            query = q
-        url = f"https://www.google.com/search?q={requests.utils.requote_uri(query) if requests else query}"
-        webbrowser.open(url)
-        self.speak(f"Here are the results for {query}")
-
-    def handle_play_youtube(self, command: str):
-        query = command
-        for trigger in ["play on youtube", "play youtube", "play"]:
-            if trigger in command:
-                query = command.split(trigger, 1)[-1].strip()
-                break
-        if not query:
-            self.speak("What should I play on YouTube?")
-            q = self.listen_once(timeout=6, phrase_time_limit=8)
-            if not q:
-                self.speak("No query provided.")
-                return
-            query = q
-        self.speak(f"Playing {query} on YouTube")
-        if pywhatkit:
-            try:
-                pywhatkit.playonyt(query)
-            except Exception:
-                webbrowser.open(f"https://www.youtube.com/results?search_query={query}")
-        else:
-            webbrowser.open(f"https://www.youtube.com/results?search_query={query}")
-
-    def handle_weather(self, command: str):
-        if not requests:
-            self.speak("Requests not available. Can't fetch weather.")
-            return
-        city = None
-        if " in " in command:
-            city = command.split(" in ", 1)[1].strip()
-        else:
-            words = command.split()
-            if words:
-                city = words[-1]
-        if not city:
-            self.speak("Which city?")
-            city = self.listen_once(timeout=5, phrase_time_limit=5)
-            if not city:
-                self.speak("No city specified.")
-                return
-        api_key = '0af251d9cd7937c07fa0bc56d4d9bff0'
-        if not api_key or api_key.startswith('PUT_YOUR'):
-            self.speak('Weather API key not configured. Please update config.')
-            return
-        try:
-            resp = requests.get(f"https://api.openweathermap.org/data/2.5/weather?units=metric&q={requests.utils.requote_uri(city)}&appid={api_key}&units=metric", timeout=8)
-            data = resp.json()
-            if resp.status_code != 200:
-                self.speak(f"Couldn't fetch weather: {data.get('message', 'unknown')}")
-                return
-            desc = data['weather'][0]['description']
-            temp = data['main']['temp']
-            self.speak(f"Weather in {city}: {desc}, {temp} degree Celsius")
-        except Exception as e:
-            print('weather error', e)
-            self.speak('Failed to fetch weather right now.')
-
-    def handle_notes(self, command: str):
-        fn = self.notes_file
-        action = None
-        if any(k in command for k in ["write", "take note", "add note"]):
-            action = 'write'
-        elif any(k in command for k in ["read", "show notes", "list notes"]):
-            action = 'read'
-        elif any(k in command for k in ["delete", "clear notes", "remove notes"]):
-            action = 'delete'
-        else:
-            self.speak('Write, read, or delete notes?')
-            resp = self.listen_once(timeout=5, phrase_time_limit=4)
-            if not resp:
-                self.speak('No response. Cancelling notes.')
-                return
-            if 'write' in resp or 'add' in resp:
-                action = 'write'
-            elif 'read' in resp or 'show' in resp:
-                action = 'read'
-            elif 'delete' in resp or 'clear' in resp:
-                action = 'delete'
-        if action == 'write':
-            self.speak('What should I write?')
-            note = self.listen_once(timeout=8, phrase_time_limit=15)
-            if not note:
-                self.speak('No note content detected.')
-                return
-            ts = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with fn.open('a', encoding='utf-8') as f:
-                f.write(f'[{ts}] {note}\n')
-            self.speak('Note saved.')
-            self._put('notes_updated', None)
-        elif action == 'read':
-            if not fn.exists() or fn.stat().st_size == 0:
-                self.speak('No notes found.')
-                return
-            with fn.open('r', encoding='utf-8') as f:
-                lines = f.readlines()[-10:]
-                for line in lines:
-                    self.speak(line.strip())
-        elif action == 'delete':
-            self.speak('Are you sure you want to clear all notes? Say yes to confirm.')
-            conf = self.listen_once(timeout=5, phrase_time_limit=4)
-            if conf and 'yes' in conf:
-                fn.write_text('')
-                self.speak('All notes cleared.')
-                self._put('notes_updated', None)
-            else:
-                self.speak('Delete cancelled.')
-
-    def handle_time_date(self, _=None):
-        now = datetime.datetime.now()
-        self.speak(f"It is {now.strftime('%I:%M %p on %A, %B %d, %Y')}")
-
-    # Translation helpers
-    def translate_text(self, text: str, dest: str = "en") -> str:
-        if not text:
-            return ""
-        dest_short = dest.split("-")[0] if "-" in dest else dest
-        if self.translator:
-            try:
-                res = self.translator.translate(text, dest=dest_short)
-                return res.text
-            except Exception:
-                # fallback: return original
-                return text
-        else:
-            # no translator available
-            return text
-
-    def process_command(self, command: str):
-        if not command:
-            return
-        command = command.lower()
-        # strip wake words
-        for w in self.config.get('WAKE_WORDS', []):
-            if w in command:
-                command = command.replace(w, '').strip()
-
-        # special language commands
-        if "speak hindi" in command or "bol hindi" in command:
-            self.config["RESPONSE_LANGUAGE"] = "hi"
-            self.config["AUTO_LANGUAGE_REPLY"] = False
-            self.speak("अब मैं हिंदी में बात करूँगा।", lang="hi")
-            return
-        if "speak punjabi" in command or "bol punjabi" in command or "bol panjabi" in command:
-            self.config["RESPONSE_LANGUAGE"] = "pa"
-            self.config["AUTO_LANGUAGE_REPLY"] = False
-            # Punjabi phrase - written in Gurmukhi
-            self.speak("ਹੁਣ ਮੈਂ ਪੰਜਾਬੀ ਵਿੱਚ ਗੱਲ ਕਰਾਂਗਾ।", lang="pa")
-            return
-        if "speak english" in command or "bol english" in command:
-            self.config["RESPONSE_LANGUAGE"] = "en"
-            self.config["AUTO_LANGUAGE_REPLY"] = False
-            self.speak("I will now speak in English.", lang="en")
-            return
-        if "auto language reply" in command or "auto reply" in command or "auto language" in command:
-            self.config["AUTO_LANGUAGE_REPLY"] = not self.config.get("AUTO_LANGUAGE_REPLY", False)
-            state = "enabled" if self.config["AUTO_LANGUAGE_REPLY"] else "disabled"
-            self.speak(f"Auto language reply {state}.")
-            return
-
-        # translate command: "translate to hi <text>" or "translate <text> to pa"
-        if command.startswith("translate ") or command.startswith("translate to ") or " translate to " in command:
-            # naive parser
-            dest = "en"
-            text = ""
-            if " to " in command:
-                # eg "translate hello to hi" or "translate to hi hello"
-                parts = command.split(" to ")
-                if parts[0].strip() == "translate":
-                    # form: translate to hi something OR translate to hi
-                    after = parts[1].strip()
-                    toks = after.split()
-                    if len(toks) >= 2:
-                        dest = toks[0]
-                        text = " ".join(toks[1:])
-                    else:
-                        dest = toks[0]
-                        text = ""
-                else:
-                    # form: translate some text to hi
-                    dest = parts[-1].strip().split()[0]
-                    text = " to ".join(parts[:-1]).replace("translate", "").strip()
-            else:
-                text = command.replace("translate", "").strip()
-            if not text:
-                self.speak("What text should I translate?")
-                q = self.listen_once(timeout=6, phrase_time_limit=10)
-                if not q:
-                    self.speak("No text provided for translation.")
-                    return
-                text = q
-            # normalize language codes
-            code_map = {"hindi": "hi", "hi": "hi", "english": "en", "en": "en", "punjabi": "pa", "pa": "pa", "panjabi": "pa"}
-            if dest.lower() in code_map:
-                dest_short = code_map[dest.lower()]
-            else:
-                dest_short = dest.split("-")[0] if "-" in dest else dest[:2]
-            translated = self.translate_text(text, dest_short)
-            self.speak(f"Translation: {translated}", lang=dest_short)
-            return
-
-        # routing
-        if any(k in command for k in ['open', 'launch', 'start']):
-            self.handle_open_app(command)
-        elif any(k in command for k in ['close', 'kill', 'stop']) and not command.startswith("screenshot"):
-            self.handle_close_app(command)
-        elif any(k in command for k in ['search', 'google']):
-            self.handle_search(command)
-        elif any(k in command for k in ['weather', 'temperature', 'forecast']):
-            self.handle_weather(command)
-        elif any(k in command for k in ['note', 'notes', 'write note', 'take note']):
-            self.handle_notes(command)
-        elif any(k in command for k in ['play', 'youtube']):
-            self.handle_play_youtube(command)
-        elif any(k in command for k in ['time', 'date']):
-            self.handle_time_date(command)
-        elif any(k in command for k in ['type', 'press', 'copy', 'paste', 'new tab', 'close tab']):
-            self.handle_inside_task(command)
-        elif any(k in command for k in ['exit', 'quit']):
-            self.speak('Goodbye.')
-            self._put('exit', None)
-        else:
-            # fallback quick search
-            self.speak("I didn't catch that. Should I search the web for it?")
-            resp = self.listen_once(timeout=5, phrase_time_limit=6)
-            if resp and ('yes' in resp or 'search' in resp):
-                self.handle_search(command)
-            else:
-                self.speak('Okay. Waiting for commands.')
-
-    # Wake-word loop
-    def run_wake_word_loop(self):
-        if not self.recognizer:
-            self._put('status', 'SpeechRecognition not installed; wake-word disabled')
-            return
-        self.listening = True
-        self._stop_listening_flag.clear()
-        self._put('status', 'Wake-word mode active')
-        while not self._stop_listening_flag.is_set():
-            text = self.listen_once(timeout=None, phrase_time_limit=6)
-            if not text:
-                continue
-            if self.is_wake_word(text):
-                remainder = text
-                for w in self.wake_words:
-                    remainder = remainder.replace(w, '')
-                remainder = remainder.strip()
-                if remainder:
-                    self.process_command(remainder)
-                else:
-                    # ask and process
-                    self.speak('Yes? What can I do for you?')
-                    cmd = self.listen_once(timeout=6, phrase_time_limit=12)
-                    if cmd:
-                        self.process_command(cmd)
-        self._put('status', 'Wake-word mode stopped')
-        self.listening = False
-
-    def start_wake_word(self):
-        if self.listening:
-            return
-        self._stop_listening_flag.clear()
-        threading.Thread(target=self.run_wake_word_loop, daemon=True).start()
-
-    def stop_wake_word(self):
-        if not self.listening:
-            return
-        self._stop_listening_flag.set()
-
-    def listen_and_process_once(self):
-        text = self.listen_once(timeout=None, phrase_time_limit=12)
-        if text:
-            for w in self.config.get('WAKE_WORDS', []):
-                text = text.replace(w, '')
-            text = text.strip()
-            self.process_command(text)
-
-
-class JarvisGUI(tk.Tk):
-    def __init__(self, jarvis: JarvisCore):
-        super().__init__()
-        self.title('Jarvis AI - Pro (Final)')
-        self.geometry('860x600')
-        self.jarvis = jarvis
-        self.out_queue = jarvis.out_queue
-        self.protocol('WM_DELETE_WINDOW', self.on_close)
-        self.create_widgets()
-        self.after(200, self.check_queue)
-
-    def create_widgets(self):
-        pad = 8
-        frm_top = ttk.Frame(self)
-        frm_top.pack(fill=tk.X, padx=pad, pady=(pad, 0))
-
-        self.status_var = tk.StringVar(value='Idle')
-        ttk.Label(frm_top, text='Status:').pack(side=tk.LEFT)
-        ttk.Label(frm_top, textvariable=self.status_var, foreground='blue').pack(side=tk.LEFT, padx=(6, 20))
-
-        ttk.Label(frm_top, text='Last Command:').pack(side=tk.LEFT)
-        self.last_cmd_var = tk.StringVar(value='None')
-        ttk.Label(frm_top, textvariable=self.last_cmd_var, foreground='green').pack(side=tk.LEFT, padx=(6, 20))
-
-        # Language selector and auto checkbox
-        ttk.Label(frm_top, text='Response Language:').pack(side=tk.LEFT)
-        self.lang_var = tk.StringVar(value=self.jarvis.config.get("RESPONSE_LANGUAGE", "en"))
-        lang_choices = ["auto", "en", "hi", "pa"]
-        self.lang_combo = ttk.Combobox(frm_top, values=lang_choices, textvariable=self.lang_var, width=6, state="readonly")
-        self.lang_combo.pack(side=tk.LEFT, padx=(6, 10))
-        self.lang_combo.bind("<<ComboboxSelected>>", self.on_lang_change)
-
-        self.auto_reply_var = tk.BooleanVar(value=self.jarvis.config.get("AUTO_LANGUAGE_REPLY", True))
-        self.auto_chk = ttk.Checkbutton(frm_top, text='Auto-reply', variable=self.auto_reply_var, command=self.on_auto_toggle)
-        self.auto_chk.pack(side=tk.LEFT, padx=(6, 10))
-
-        ttk.Button(frm_top, text='Start Wake-word', command=self.toggle_wake).pack(side=tk.RIGHT)
-        self.wake_btn = ttk.Button(frm_top, text='Push-to-Talk', command=self.push_to_talk)
-        self.wake_btn.pack(side=tk.RIGHT, padx=(0,10))
-
-        # Middle: notes, translate and log
-        frm_mid = ttk.Frame(self)
-        frm_mid.pack(fill=tk.BOTH, expand=True, padx=pad, pady=pad)
-
-        left_col = ttk.Frame(frm_mid)
-        left_col.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        notes_frame = ttk.LabelFrame(left_col, text='Notes')
-        notes_frame.pack(fill=tk.BOTH, expand=True, padx=(0,6))
-        self.notes_box = scrolledtext.ScrolledText(notes_frame, wrap=tk.WORD, width=40, height=10)
-        self.notes_box.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
-
-        notes_btns = ttk.Frame(notes_frame)
-        notes_btns.pack(fill=tk.X, padx=6, pady=(0,6))
-        ttk.Button(notes_btns, text='Refresh Notes', command=self.load_notes).pack(side=tk.LEFT)
-        ttk.Button(notes_btns, text='Add Note (text)', command=self.add_note_via_gui).pack(side=tk.LEFT, padx=6)
-        ttk.Button(notes_btns, text='Clear Notes', command=self.clear_notes_gui).pack(side=tk.LEFT)
-
-        # Translate panel
-        translate_frame = ttk.LabelFrame(left_col, text='Translate (manual)')
-        translate_frame.pack(fill=tk.BOTH, expand=False, pady=(8,0))
-        ttk.Label(translate_frame, text='Dest (en/hi/pa):').pack(side=tk.LEFT, padx=6)
-        self.trans_dest_var = tk.StringVar(value='hi')
-        self.trans_entry = ttk.Entry(translate_frame, width=6, textvariable=self.trans_dest_var)
-        self.trans_entry.pack(side=tk.LEFT, padx=(0,8))
-        self.trans_text_var = tk.StringVar()
-        ttk.Entry(translate_frame, textvariable=self.trans_text_var, width=40).pack(side=tk.LEFT, padx=(0,6))
-        ttk.Button(translate_frame, text='Translate', command=self.gui_translate).pack(side=tk.LEFT)
-
-        right_col = ttk.Frame(frm_mid)
-        right_col.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-
-        log_frame = ttk.LabelFrame(right_col, text='Activity Log')
-        log_frame.pack(fill=tk.BOTH, expand=True)
-        self.log_box = scrolledtext.ScrolledText(log_frame, height=20)
-        self.log_box.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
-
-        # Bottom: quick commands
-        frm_bottom = ttk.Frame(self)
-        frm_bottom.pack(fill=tk.X, padx=pad, pady=(0,pad))
-        ttk.Label(frm_bottom, text='Quick Commands:').pack(side=tk.LEFT)
-        ttk.Button(frm_bottom, text='Open Chrome', command=lambda: self.run_quick('open chrome')).pack(side=tk.LEFT, padx=6)
-        ttk.Button(frm_bottom, text='Search Google', command=self.quick_search_prompt).pack(side=tk.LEFT, padx=6)
-        ttk.Button(frm_bottom, text='Play YouTube', command=self.quick_play_prompt).pack(side=tk.LEFT, padx=6)
-        ttk.Button(frm_bottom, text='Weather', command=self.quick_weather_prompt).pack(side=tk.LEFT, padx=6)
-        ttk.Button(frm_bottom, text='Translate sample', command=lambda: self.run_quick('translate hello to hi')).pack(side=tk.LEFT, padx=6)
-
-        self.load_notes()
-
-    def on_lang_change(self, _evt=None):
-        sel = self.lang_var.get()
-        self.jarvis.config["RESPONSE_LANGUAGE"] = sel
-        self.log(f"Response language set to: {sel}")
-
-    def on_auto_toggle(self):
-        val = self.auto_reply_var.get()
-        self.jarvis.config["AUTO_LANGUAGE_REPLY"] = val
-        self.log(f"Auto language reply: {'ON' if val else 'OFF'}")
-
-    def toggle_wake(self):
-        if self.jarvis.listening:
-            self.jarvis.stop_wake_word()
-            self.status_var.set('Wake-word stopped')
-            self.log('Wake-word listening stopped')
-        else:
-            self.jarvis.start_wake_word()
-            self.status_var.set('Wake-word active')
-            self.log('Wake-word listening started')
-
-    def push_to_talk(self):
-        self.status_var.set('Push-to-Talk: Listening')
-        self.log('Push-to-Talk activated')
-        threading.Thread(target=self._push_thread, daemon=True).start()
-
-    def _push_thread(self):
-        self.jarvis.listen_and_process_once()
-        time.sleep(0.5)
-        self.status_var.set('Idle')
-
-    def run_quick(self, command: str):
-        self.log(f'Quick command: {command}')
-        threading.Thread(target=self.jarvis.process_command, args=(command,), daemon=True).start()
-
-    def quick_search_prompt(self):
-        q = self.simple_input_dialog('Search Google', 'Enter search query:')
-        if q:
-            self.run_quick(f'search {q}')
-
-    def quick_play_prompt(self):
-        q = self.simple_input_dialog('Play YouTube', 'Enter song or video name:')
-        if q:
-            self.run_quick(f'play {q}')
-
-    def quick_weather_prompt(self):
-        city = self.simple_input_dialog('Weather', 'Enter city name:')
-        if city:
-            self.run_quick(f'weather in {city}')
-
-    def simple_input_dialog(self, title: str, prompt: str) -> Optional[str]:
-        dialog = tk.Toplevel(self)
-        dialog.title(title)
-        dialog.geometry('420x120')
-        ttk.Label(dialog, text=prompt).pack(padx=8, pady=8)
-        entry = ttk.Entry(dialog, width=60)
-        entry.pack(padx=8)
-        entry.focus()
-        result = {'value': None}
-
-        def on_ok():
-            result['value'] = entry.get().strip()
-            dialog.destroy()
-
-        def on_cancel():
-            dialog.destroy()
-
-        btns = ttk.Frame(dialog)
-        btns.pack(pady=8)
-        ttk.Button(btns, text='OK', command=on_ok).pack(side=tk.LEFT, padx=6)
-        ttk.Button(btns, text='Cancel', command=on_cancel).pack(side=tk.LEFT)
-        self.wait_window(dialog)
-        return result['value']
-
-    def add_note_via_gui(self):
-        text = self.simple_input_dialog('Add Note', 'Enter note text:')
-        if text:
-            with self.jarvis.notes_file.open('a', encoding='utf-8') as f:
-                ts = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f'[{ts}] {text}\n')
-            self.log('Note added via GUI')
-            self.load_notes()
-
-    def load_notes(self):
-        try:
-            with self.jarvis.notes_file.open('r', encoding='utf-8') as f:
-                content = f.read()
-            self.notes_box.delete('1.0', tk.END)
-            self.notes_box.insert(tk.END, content)
-            self.log('Notes refreshed')
-        except Exception as e:
-            self.log(f'Failed to load notes: {e}')
-
-    def clear_notes_gui(self):
-        if messagebox.askyesno('Confirm', 'Clear all notes?'):
-            try:
-                self.jarvis.notes_file.write_text('')
-                self.load_notes()
-                self.log('Notes cleared')
-            except Exception as e:
-                self.log(f'Failed to clear notes: {e}')
-
-    def gui_translate(self):
-        dest = self.trans_dest_var.get().strip()
-        text = self.trans_text_var.get().strip()
-        if not text:
-            messagebox.showinfo("Translate", "Enter text to translate.")
-            return
-        # run in thread
-        threading.Thread(target=self._do_translate, args=(text, dest), daemon=True).start()
-
-    def _do_translate(self, text, dest):
-        self.log(f"Translating to {dest}: {text}")
-        result = self.jarvis.translate_text(text, dest)
-        # show result in popup and speak result (in dest language if possible)
-        messagebox.showinfo("Translation", f"{result}")
-        try:
-            short = dest.split("-")[0] if "-" in dest else dest
-            self.jarvis.speak(result, lang=short)
-        except Exception:
-            self.jarvis.speak(result)
-
-    def log(self, text: str):
-        ts = datetime.datetime.now().strftime('%H:%M:%S')
-        self.log_box.insert(tk.END, f'[{ts}] {text}\n')
-        self.log_box.see(tk.END)
-
-    def check_queue(self):
-        try:
-            while True:
-                item = self.out_queue.get_nowait()
-                typ, payload = item
-                if typ == 'status':
-                    self.status_var.set(payload)
-                    self.log(payload)
-                elif typ == 'last_command':
-                    self.last_cmd_var.set(payload)
-                    self.log(f'Recognized: {payload}')
-                elif typ == 'notes_updated':
-                    self.load_notes()
-                elif typ == 'exit':
-                    self.on_close()
-                else:
-                    self.log(f'{typ}: {payload}')
-        except queue.Empty:
-            pass
-        self.after(200, self.check_queue)
-
-    def on_close(self):
-        if messagebox.askokcancel('Quit', 'Do you want to quit Jarvis?'):
-            try:
-                self.jarvis.stop_wake_word()
-            except Exception:
-                pass
-            self.destroy()
-
-
-def main():
-    out_q = queue.Queue()
-    jarvis = JarvisCore(config, out_q)
-    if tk is None:
-        print('Tkinter not available. Exiting.')
-        return
-    app = JarvisGUI(jarvis)
-    # start mainloop; wake-word runs on background threads
-    app.mainloop()
-  
-
-if __name__ == '__main__':
-    main()
-
-#Run this file and check 
+"""
+Jarvis AI - Pro (GUI + Voice control + App open/close + Inside-app tasks)
+Final file with:
+ - Multilingual (English, Hindi, Punjabi) listening
+ - Auto-language reply (Jarvis replies in the language you spoke)
+ - Translation features (using googletrans when available)
+ - GUI language selector (Auto / en / hi / pa) and small Translate panel
+ - Graceful fallbacks when optional deps missing
+
+Author: (Your Name) - adapted for Prince
+Save as jarvis_pro_gui_final.py and run: python jarvis_pro_gui_final.py
+"""
+
+import threading
+import queue
+import time
+import os
+import sys
+import webbrowser
+import subprocess
+import signal
+import datetime
+import json
+import re
+import itertools
+import collections
+import array
+import math
+import struct
+import importlib
+import contextlib
+import copy
+import difflib
+import socketserver
+import logging.handlers
+import shlex
+import shutil
+import concurrent.futures
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+# optional imports with graceful fallbacks, loaded on first use (see LazyModule)
+class LazyModule:
+    """
+    An optional dependency imported on first use. Truth-testing imports it and tells whether it
+    is available (so `if not pyautogui:` stays the fallback check); attribute access imports it
+    and raises AttributeError when it is missing. load_ms records how long the import took.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._error = None
+        self._lock = threading.Lock()
+        self.load_ms = None
+
+    def load(self):
+        """The module, importing it now if needed; None if it is not installed or fails to import."""
+        if self.load_ms is None:
+            with self._lock:
+                if self.load_ms is None:
+                    start = time.perf_counter()
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    except Exception as e:  # missing, or fails at import (e.g. no display)
+                        self._error = e
+                    self.load_ms = (time.perf_counter() - start) * 1000
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self.load_ms is not None
+
+    def __bool__(self):
+        return self.load() is not None
+
+    def __getattr__(self, attr):
+        module = self.load()
+        if module is None:
+            raise AttributeError(f"{self._name} is not available ({self._error})")
+        value = getattr(module, attr)
+        setattr(self, attr, value)  # later lookups skip __getattr__
+        return value
+
+    def __repr__(self):
+        state = "not loaded" if not self.loaded else ("unavailable" if self._module is None else "loaded")
+        return f"<LazyModule {self._name} ({state})>"
+
+
+class LazyAttribute:
+    """
+    Instance attribute built by factory(instance) on first read; assigning it works as usual.
+    An instance with a _lazy_source (a copy such as JarvisCore.for_session) reads the source's
+    value instead, so the source builds it once for all of its copies.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.key = "_lazy_" + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.key]
+        except KeyError:
+            source = obj.__dict__.get("_lazy_source")
+            if source is not None:
+                # outside the lock: the source's own read takes it
+                obj.__dict__[self.key] = getattr(source, self.name)
+                return obj.__dict__[self.key]
+            with self._lock:
+                if self.key not in obj.__dict__:
+                    obj.__dict__[self.key] = self.factory(obj)
+            return obj.__dict__[self.key]
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.key] = value
+
+
+OPTIONAL_DEPS = {name: LazyModule(name) for name in (
+    "speech_recognition", "pyttsx3", "requests", "pywhatkit", "pyautogui", "rapidfuzz", "vosk", "googletrans")}
+sr = OPTIONAL_DEPS["speech_recognition"]
+pyttsx3 = OPTIONAL_DEPS["pyttsx3"]
+requests = OPTIONAL_DEPS["requests"]
+pywhatkit = OPTIONAL_DEPS["pywhatkit"]
+pyautogui = OPTIONAL_DEPS["pyautogui"]
+vosk = OPTIONAL_DEPS["vosk"]  # offline speech recognition
+googletrans = OPTIONAL_DEPS["googletrans"]  # translation
+fuzz = LazyModule("rapidfuzz.fuzz")
+process = LazyModule("rapidfuzz.process")
+
+# Tk is imported when a window is opened (see open_window), so headless runs never load it
+tk = LazyModule("tkinter")
+ttk = LazyModule("tkinter.ttk")
+messagebox = LazyModule("tkinter.messagebox")
+scrolledtext = LazyModule("tkinter.scrolledtext")
+
+# ---------------- CONFIG ----------------
+config = {
+    "OPENWEATHER_API_KEY": "PUT_YOUR_OPENWEATHER_API_KEY_HERE",  # or set the OPENWEATHER_API_KEY env var
+    "OPENWEATHER_URL": "https://api.openweathermap.org/data/2.5/weather",
+    "WEATHER_CACHE_TTL": 600,  # seconds a city's weather is reused
+    "WEATHER_WORKERS": 4,  # concurrent requests for multi-city queries
+    "USER_NAME": "Prince",
+    "NOTES_FILE": "jarvis_notes_gui.txt",
+    "WAKE_WORDS": ["jarvis", "hey jarvis", "ok jarvis", "prince", "please","Riya","hey Riya","ok Riya","please Riya"],
+    # Map friendly app names to file paths (Windows) or command names (mac/linux)
+    "APPS": {
+       # Browsers
+    "chrome": r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+    "brave": r"C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
+    "edge": r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe",
+
+    # Code & Editors
+    "vscode": r"C:\\Users\\princ\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe",
+    "notepad": "notepad.exe",
+
+    # System Apps
+    "file explorer": r"C:\\Windows\\explorer.exe",
+    "explorer": r"C:\\Windows\\explorer.exe",
+    "cmd": r"C:\\Windows\\System32\\cmd.exe",
+    "command prompt": r"C:\\Windows\\System32\\cmd.exe",
+    "powershell": r"C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe",
+    "terminal": r"C:\\Users\\princ\\AppData\\Local\\Microsoft\\WindowsApps\\wt.exe",
+
+    # Basic Windows Tools
+    "calculator": "calc",
+    "paint": r"C:\\Windows\\System32\\mspaint.exe",
+    "camera": r"microsoft.windows.camera:",
+    "snipping tool": r"C:\\Windows\\System32\\SnippingTool.exe",
+
+    # Settings & Controls
+    "settings": "ms-settings:",
+    "wifi": "ms-settings:network-wifi",
+    "bluetooth": "ms-settings:bluetooth",
+    "update": "ms-settings:windowsupdate",
+    "display": "ms-settings:display",
+    "sound": "ms-settings:sound",
+    "power": "ms-settings:powersleep",
+    "battery": "ms-settings:batterysaver",
+    "apps settings": "ms-settings:appsfeatures",
+
+    # Control Panels
+    "control panel": r"C:\\Windows\\System32\\control.exe",
+    "system info": r"C:\\Windows\\System32\\msinfo32.exe",
+
+    # Admin / Task Tools
+    "task manager": r"C:\\Windows\\System32\\Taskmgr.exe",
+    "run": r"C:\\Windows\\System32\\run.exe"  # Opens Run dialog
+    },
+    # also index .desktop entries and PATH executables (Linux); cached in APP_INDEX_FILE
+    "APP_DISCOVERY": True,
+    "APP_INDEX_FILE": "jarvis_app_index.json",
+    # minimum 0-100 similarity for fuzzy app / keyword matches
+    "FUZZY_CUTOFF": 60,
+    "FUZZY_PATH_CUTOFF": 90,  # stricter cutoff for bare PATH executables (no config or .desktop entry)
+    # seconds a /proc scan is reused when closing apps (Linux)
+    "PROCESS_TABLE_TTL": 2.0,
+    # languages to attempt for recognition (order)
+    "LANGUAGES": ["en-IN", "hi-IN", "pa-IN"],
+    # "RESPONSE_LANGUAGE": "auto" (auto means follow speaker if auto_reply enabled)
+    "RESPONSE_LANGUAGE": "en",  # default speaking language (en / hi / pa / auto)
+    "AUTO_LANGUAGE_REPLY": True,  # if True, Jarvis replies in the same language the user spoke
+    # speech-to-text backend: "google" (online), "vosk" (offline, needs VOSK_MODELS) or "fake" (jarvis_bench.py)
+    "RECOGNIZER_BACKEND": "google",
+    # Vosk model directories per recognition language, e.g. {"en-IN": "~/models/vosk-model-small-en-in-0.4"}
+    "VOSK_MODELS": {},
+    # recognition strategy over LANGUAGES: "serial", "first_success" or "best_confidence"
+    "RECOGNITION_MODE": "serial",
+    "RECOGNITION_WORKERS": 3,  # max concurrent recognition attempts
+    "RECOGNITION_TIMEOUT": 10,  # seconds to wait for concurrent attempts
+    # local wake-word gate: drops short noises and, with a Vosk model, non-wake-word phrases
+    # before they reach full recognition (model defaults to the English VOSK_MODELS entry).
+    # Without a model only the noise gate runs and every spoken phrase is still recognized.
+    "WAKE_SPOTTER": True,
+    "WAKE_SPOTTER_MODEL": "",
+    "WAKE_MIN_SECONDS": 0.25,  # voiced (above the energy threshold) seconds a phrase needs
+    # translation / language-detection cache (LRU in memory, JSON lines on disk; TTL in seconds or None)
+    "TRANSLATION_CACHE_FILE": "jarvis_translation_cache.jsonl",
+    "TRANSLATION_CACHE_SIZE": 2000,
+    "TRANSLATION_CACHE_TTL": None,
+    # language of recognized text: "local" (offline identifier) or "googletrans" (network, cached)
+    "LANGUAGE_DETECTOR": "local",
+    "TRANSLATION_BATCH_SIZE": 20,  # strings per translator request in batch mode
+    "TRANSLATION_WORKERS": 4,  # concurrent translator requests in batch mode
+    "NOTES_VIEW_LINES": 200,  # notes kept in the GUI notes panel
+    "NOTES_PAGE_LINES": 50,  # older notes loaded per scroll to the top
+    "PERSISTENT_MIC": True,  # keep one microphone stream open instead of reopening it per utterance
+    "TTS_QUEUE_SIZE": 32,  # max utterances waiting for the speech worker
+    "UI_POLL_MS": 1000,  # fallback queue poll; events normally wake the GUI immediately
+    "MICROPHONE": True,  # False: never listen (text-only use); follow-up questions get no answer
+    "TTS_ENABLED": True,  # False: no speech output, replies are still reported as status events
+    "SESSION_WORKERS": 8,  # headless mode: threads shared by all sessions
+    "SESSION_NOTES_DIR": "jarvis_sessions",  # headless mode: one notes file per named session
+    "SESSION_IDLE_TTL": 1800,  # headless mode: seconds before an idle session is dropped (its notes file stays)
+    "SESSION_MAX": 256,  # headless mode: idle sessions beyond this many are dropped, least recently used first
+    "METRICS_ENABLED": True,  # time pipeline stages (mic, recognition, handlers, TTS) for the Metrics panel
+    "METRICS_WINDOW": 500,  # recent samples per stage used for percentiles
+    "METRICS_TRACE_FILE": None,  # e.g. "jarvis_trace.jsonl": one JSON line per timed stage
+    "METRICS_REFRESH_MS": 1000,  # Metrics panel refresh interval
+    # loaded in the background once the window is up; anything not listed loads on first use
+    "WARM_UP": ["tts", "recognizer", "translator", "requests", "rapidfuzz", "pyautogui", "pywhatkit"],
+    "LOG_MAX_LINES": 2000,  # lines kept in the activity log panel
+    "LOG_FILE": None,  # e.g. "jarvis_activity.log": lines dropped from the panel are kept here
+    "LOG_FILE_MAX_BYTES": 1_000_000,  # rotate the log file at this size
+    "LOG_FILE_BACKUPS": 3,  # rotated log files kept
+}
+# ----------------------------------------
+
+def resolve_path(path: str) -> str:
+    if not path:
+        return path
+    return os.path.expanduser(os.path.expandvars(path))
+
+
+# ---------------- FUZZY MATCHING ----------------
+def _ratio_rapidfuzz(a: str, b: str) -> float:
+    return fuzz.ratio(a, b)
+
+
+def _ratio_difflib(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a, b).ratio() * 100
+
+
+class FuzzyIndex:
+    """
+    Closest-name lookup over a fixed set of choices. Character trigrams of every choice are
+    indexed up front; a query only scores the `shortlist` choices sharing the most trigrams with
+    it, so the cost follows the number of near candidates rather than the catalog size. Small
+    indexes skip the shortlist: scoring every choice is cheaper there than collecting trigrams.
+    Scores are 0-100 (rapidfuzz ratio when available, difflib otherwise).
+    """
+
+    FULL_SCAN_RAPIDFUZZ = 500  # choices rapidfuzz's extractOne scans faster than the shortlist
+    FULL_SCAN_PYTHON = 32  # the same crossover for a per-choice Python scorer (difflib or custom)
+
+    def __init__(self, choices, cutoff: float = 60, shortlist: int = 32, scorer=None):
+        self.choices = list(dict.fromkeys(choices))
+        self._lowered = [c.lower() for c in self.choices]
+        self._choice_set = set(self.choices)
+        self.cutoff = cutoff
+        self.shortlist = shortlist
+        self._scorer = scorer  # picked on first query so building the index doesn't import rapidfuzz
+        self._custom_scorer = scorer is not None
+        self._postings = collections.defaultdict(list)  # trigram -> choice ids
+        self._sizes = []
+        for i, choice in enumerate(self.choices):
+            grams = self.grams(choice)
+            self._sizes.append(len(grams))
+            for g in grams:
+                self._postings[g].append(i)
+
+    @property
+    def scorer(self):
+        if self._scorer is None:
+            self._scorer = _ratio_rapidfuzz if fuzz else _ratio_difflib
+        return self._scorer
+
+    @staticmethod
+    def grams(text: str) -> set:
+        padded = "  " + "".join(ch for ch in text.lower() if ch.isalnum()) + " "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def __len__(self):
+        return len(self.choices)
+
+    def __contains__(self, choice):
+        return choice in self._choice_set
+
+    def candidates(self, query: str) -> List[str]:
+        """Choices sharing the most trigrams with query (Dice coefficient), best first."""
+        grams = self.grams(query)
+        postings = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+        # trigrams found in most choices say little and cost the most; count the rarer ones
+        limit = max(self.shortlist * 32, len(self.choices) // 10)
+        shared = collections.Counter()
+        for i, ids in enumerate(postings):
+            if i >= 2 and len(ids) > limit:
+                break
+            shared.update(ids)
+        sizes, n = self._sizes, len(grams)
+        # raw overlap prunes cheaply; Dice then stops long names winning on length alone
+        pool = shared.most_common(self.shortlist * 4)
+        top = sorted(pool, key=lambda kv: 2 * kv[1] / (n + sizes[kv[0]]), reverse=True)
+        return [self.choices[i] for i, _ in top[:self.shortlist]]
+
+    def best(self, query: str, cutoff: float = None):
+        """(choice, score) of the closest choice scoring at least cutoff, or None."""
+        cutoff = self.cutoff if cutoff is None else cutoff
+        query = query.lower().strip()
+        n = len(self.choices)
+        if not self._custom_scorer and n <= self.FULL_SCAN_RAPIDFUZZ and fuzz:
+            hit = process.extractOne(query, self._lowered, scorer=fuzz.ratio, score_cutoff=cutoff)
+            return (self.choices[hit[2]], hit[1]) if hit else None
+        best, best_score = None, cutoff
+        for choice in (self.choices if n <= self.FULL_SCAN_PYTHON else self.candidates(query)):
+            score = self.scorer(query, choice.lower())
+            if score >= best_score:
+                best, best_score = choice, score
+        return (best, best_score) if best is not None else None
+
+
+# ---------------- INTENTS ----------------
+# Declarative intent table. Each keyword is a whole-word phrase; the router picks the
+# match with the highest priority (then the longest phrase, then the earliest one).
+# "start_keywords" only match at the beginning of the command. "fuzzy": False keeps misheard
+# words from being corrected into that intent (anything that closes or exits). "slot" names the
+# handler argument that receives the words after the keyword ("search for cats" -> query="cats").
+INTENTS = [
+    {"name": "lang_hi", "keywords": ["speak hindi", "bol hindi"], "priority": 100,
+     "handler": "handle_language_switch", "args": {"lang": "hi"}},
+    {"name": "lang_pa", "keywords": ["speak punjabi", "bol punjabi", "bol panjabi"], "priority": 100,
+     "handler": "handle_language_switch", "args": {"lang": "pa"}},
+    {"name": "lang_en", "keywords": ["speak english", "bol english"], "priority": 100,
+     "handler": "handle_language_switch", "args": {"lang": "en"}},
+    {"name": "auto_reply", "keywords": ["auto language reply", "auto reply", "auto language"], "priority": 100,
+     "handler": "handle_auto_reply"},
+    {"name": "translate", "keywords": ["translate to"], "start_keywords": ["translate"], "priority": 95,
+     "handler": "handle_translate"},
+    {"name": "stop_listening", "keywords": ["stop listening", "stop wake word"], "priority": 92,
+     "handler": "handle_stop_listening"},
+    {"name": "refresh_apps", "keywords": ["refresh apps", "rescan apps", "refresh app list"], "priority": 93,
+     "handler": "handle_refresh_apps"},
+    {"name": "new_tab", "keywords": ["new tab"], "priority": 91,
+     "handler": "handle_inside_task", "args": {"action": "new_tab"}},
+    {"name": "close_tab", "keywords": ["close tab"], "priority": 91,
+     "handler": "handle_inside_task", "args": {"action": "close_tab"}, "fuzzy": False},
+    {"name": "open", "keywords": ["open", "launch", "start"], "priority": 90,
+     "handler": "handle_open_app"},
+    {"name": "close", "keywords": ["close", "kill", "stop"], "priority": 80,
+     "handler": "handle_close_app", "slot": "target", "fuzzy": False},
+    {"name": "search", "keywords": ["search", "search for", "google"], "priority": 70,
+     "handler": "handle_search", "slot": "query"},
+    {"name": "notes_search", "keywords": ["find note", "find notes", "find my note", "find my notes",
+                                          "search note", "search notes", "search my notes"], "priority": 75,
+     "handler": "handle_note_search"},
+    {"name": "weather", "keywords": ["weather", "temperature", "forecast"], "priority": 60,
+     "handler": "handle_weather"},
+    {"name": "notes_write", "keywords": ["take note", "take notes", "take a note", "add note", "add a note",
+                                         "write note", "write notes", "write a note", "make a note", "note down"],
+     "priority": 50, "handler": "handle_notes", "args": {"action": "write"}, "slot": "text"},
+    {"name": "notes_read", "keywords": ["read note", "read notes", "read my notes", "show notes", "show my notes",
+                                        "list notes", "list my notes"], "priority": 50,
+     "handler": "handle_notes", "args": {"action": "read"}},
+    {"name": "notes_delete_last", "keywords": ["delete last note", "delete my last note", "delete the last note",
+                                               "remove last note", "remove the last note"], "priority": 50,
+     "handler": "handle_notes", "args": {"action": "delete_last"}},
+    {"name": "notes_clear", "keywords": ["delete note", "delete notes", "delete my notes", "clear notes",
+                                         "clear my notes", "remove notes"], "priority": 50,
+     "handler": "handle_notes", "args": {"action": "clear"}},
+    {"name": "notes", "keywords": ["note", "notes"], "priority": 50,
+     "handler": "handle_notes"},
+    {"name": "play", "keywords": ["play", "youtube"], "priority": 40,
+     "handler": "handle_play_youtube"},
+    {"name": "time", "keywords": ["time", "date"], "priority": 30,
+     "handler": "handle_time_date"},
+    {"name": "type_text", "keywords": ["type"], "priority": 20,
+     "handler": "handle_inside_task", "args": {"action": "type"}, "slot": "text"},
+    {"name": "press_enter", "keywords": ["press enter", "press return"], "priority": 20,
+     "handler": "handle_inside_task", "args": {"action": "enter"}},
+    {"name": "press_escape", "keywords": ["press escape", "press esc"], "priority": 20,
+     "handler": "handle_inside_task", "args": {"action": "esc"}},
+    {"name": "copy", "keywords": ["copy"], "priority": 20,
+     "handler": "handle_inside_task", "args": {"action": "copy"}},
+    {"name": "paste", "keywords": ["paste"], "priority": 20,
+     "handler": "handle_inside_task", "args": {"action": "paste"}},
+    {"name": "inside_task", "keywords": ["press"], "priority": 20,
+     "handler": "handle_inside_task"},
+    {"name": "exit", "keywords": ["exit", "quit"], "priority": 10,
+     "handler": "handle_exit", "fuzzy": False},
+]
+
+
+class IntentMatch(NamedTuple):
+    name: str
+    handler: str
+    args: dict
+    keyword: str
+    slots: dict
+
+
+TOKEN_PUNCT = ".,!?;:\"'()"
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in (w.strip(TOKEN_PUNCT) for w in text.lower().split()) if t]
+
+
+class IntentRouter:
+    """Word-level keyword trie compiled from an intent table; matches in one pass over the tokens."""
+
+    _END = None  # trie key holding the intents that terminate at a node
+
+    def __init__(self, intents=None):
+        self._intents = {}
+        self._root = {}
+        self._fuzzy = None  # FuzzyIndex over keyword words, built on first miss
+        self._vocab = set()
+        for intent in intents or []:
+            self.add_intent(intent)
+
+    def add_intent(self, intent: dict):
+        name = intent["name"]
+        self._intents[name] = intent
+        for kw in intent.get("keywords", []):
+            self._insert(kw, name, False)
+        for kw in intent.get("start_keywords", []):
+            self._insert(kw, name, True)
+
+    def _insert(self, phrase: str, name: str, at_start: bool):
+        toks = tokenize(phrase)
+        if not toks:
+            return
+        node = self._root
+        for t in toks:
+            node = node.setdefault(t, {})
+        node.setdefault(self._END, []).append((name, len(toks), at_start, phrase))
+        self._fuzzy = None
+
+    def __len__(self):
+        return len(self._intents)
+
+    def correct(self, command: str, cutoff: float = 75) -> Optional[str]:
+        """command with one misheard word snapped to a keyword word, or None.
+
+        A correction only counts when the snapped word completes a keyword phrase of an intent that
+        allows it; intents marked "fuzzy": False (closing apps, exiting) are never reached this way.
+        """
+        if self._fuzzy is None:
+            words = {w for intent in self._intents.values() if intent.get("fuzzy", True)
+                     for kw in intent.get("keywords", []) + intent.get("start_keywords", [])
+                     for w in tokenize(kw) if len(w) > 2}
+            self._fuzzy = FuzzyIndex(sorted(words), cutoff=cutoff)
+            self._vocab = set(self._words())
+        tokens = tokenize(command)
+        for i, tok in enumerate(tokens):
+            if len(tok) < 3 or tok in self._vocab:
+                continue
+            hit = self._fuzzy.best(tok)
+            # a keyword word plus a suffix is another word, not a mishearing: "timer" is not "time"
+            if not hit or tok.startswith(hit[0]):
+                continue
+            corrected = " ".join(tokens[:i] + [hit[0]] + tokens[i + 1:])
+            match = self.match(corrected)
+            if (match is not None and self._intents[match.name].get("fuzzy", True)
+                    and hit[0] in tokenize(match.keyword)):
+                return corrected
+        return None
+
+    def _words(self):
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for tok, child in node.items():
+                if tok is not self._END:
+                    yield tok
+                    stack.append(child)
+
+    def match(self, command: str) -> Optional[IntentMatch]:
+        # words stay aligned with tokens so the slots keep the original text ("buy milk, eggs")
+        words = [w for w in command.split() if w.strip(TOKEN_PUNCT)]
+        tokens = [w.strip(TOKEN_PUNCT).lower() for w in words]
+        best = None
+        best_key = None
+        for i in range(len(tokens)):
+            node = self._root
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                for name, length, at_start, phrase in node.get(self._END, ()):
+                    if at_start and i != 0:
+                        continue
+                    key = (self._intents[name].get("priority", 0), length, -i)
+                    if best_key is None or key > best_key:
+                        best_key = key
+                        best = (name, phrase, i, j + 1)
+        if best is None:
+            return None
+        name, phrase, start, end = best
+        intent = self._intents[name]
+        slots = {"before": " ".join(words[:start]), "after": " ".join(words[end:])}
+        args = dict(intent.get("args", {}))
+        if "slot" in intent:
+            args[intent["slot"]] = slots["after"]
+        return IntentMatch(name, intent["handler"], args, phrase, slots)
+
+
+# ---------------- METRICS ----------------
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class _Trace:
+    __slots__ = ("metrics", "owner")
+
+    def __init__(self, metrics: "Metrics"):
+        self.metrics = metrics
+
+    def __enter__(self):
+        local = self.metrics._local
+        self.owner = getattr(local, "trace", None) is None
+        if self.owner:
+            local.trace = next(self.metrics._trace_ids)
+        return self
+
+    def __exit__(self, *exc):
+        if self.owner:
+            self.metrics._local.trace = None
+
+
+class Metrics:
+    """
+    Timing spans for the voice pipeline. span(name) times a block; each stage keeps its last
+    METRICS_WINDOW samples for percentiles, and with METRICS_TRACE_FILE every sample is also
+    appended as a JSON line tagged with the command (trace) it belongs to. When disabled, span()
+    and trace() hand back one shared no-op context manager.
+    """
+
+    _NULL = contextlib.nullcontext()
+
+    def __init__(self, enabled: bool = True, window: int = 500, trace_file: Optional[str] = None):
+        self.enabled = enabled
+        self.window = max(1, int(window))
+        self._samples = {}  # stage -> deque of ms
+        self._counts = collections.Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._trace_ids = itertools.count(1)
+        self._trace_file = None
+        if enabled and trace_file:
+            try:
+                self._trace_file = open(trace_file, "a", encoding="utf-8")
+            except OSError as e:
+                print("metrics trace file error", e)
+
+    @classmethod
+    def from_config(cls, config_ref) -> "Metrics":
+        return cls(config_ref.get("METRICS_ENABLED", True), config_ref.get("METRICS_WINDOW", 500),
+                   config_ref.get("METRICS_TRACE_FILE"))
+
+    def span(self, name: str):
+        return _Span(self, name) if self.enabled else self._NULL
+
+    def trace(self):
+        """Group the spans of one command under a trace id (nested calls join the outer trace)."""
+        return _Trace(self) if self.enabled else self._NULL
+
+    def current_trace(self) -> Optional[int]:
+        return getattr(self._local, "trace", None) if self.enabled else None
+
+    def record(self, name: str, ms: float, trace: Optional[int] = None):
+        if not self.enabled:
+            return
+        if trace is None:
+            trace = getattr(self._local, "trace", None)
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = collections.deque(maxlen=self.window)
+            samples.append(ms)
+            self._counts[name] += 1
+            if self._trace_file is not None:
+                try:
+                    self._trace_file.write(json.dumps({"ts": round(time.time(), 3), "trace": trace, "stage": name,
+                                                       "ms": round(ms, 3)}) + "\n")
+                except (OSError, ValueError):
+                    pass
+
+    def summary(self) -> dict:
+        """stage -> count, last and p50/p90/p99/max (ms) over the rolling window."""
+        with self._lock:
+            snapshot = {name: (list(samples), self._counts[name]) for name, samples in self._samples.items()}
+        out = {}
+        for name, (samples, count) in snapshot.items():
+            ordered = sorted(samples)
+            pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+            out[name] = {"count": count, "last": round(samples[-1], 2), "p50": pick(0.5), "p90": pick(0.9),
+                         "p99": pick(0.99), "max": round(ordered[-1], 2)}
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def close(self):
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+
+
+class TTS:
+    PRIORITY_URGENT = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_STATUS = 2
+
+    # voice names that identify a language without carrying its code
+    _VOICE_NAME_LANGS = {"english": "en", "hindi": "hi", "punjabi": "pa", "panjabi": "pa"}
+
+    def __init__(self, config_ref, metrics: Optional[Metrics] = None):
+        self.engine = None
+        self.config = config_ref
+        self.metrics = metrics or Metrics(enabled=False)
+        self._voice_index = {}  # short language code -> voice id
+        self._current_voice = None
+        # speech worker state: one thread owns the engine and drains a bounded priority queue.
+        # Entries are (priority, group seq, seq, item): one command's replies share the priority and
+        # position of its first queued reply, so priorities order commands, never one command's replies
+        self._queue = queue.PriorityQueue(maxsize=self.config.get("TTS_QUEUE_SIZE", 32))
+        self._seq = itertools.count()
+        self._groups = {}  # command (trace, else thread) -> [priority, group seq, replies still queued]
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._worker = None
+        self._speaking = False
+        self._in_flight = {}
+        self._ttfa_ms = collections.deque(maxlen=100)
+        self._stats = {"spoken": 0, "coalesced": 0, "cancelled": 0, "dropped": 0}
+        self._engine_failed = False
+        # the engine is created by the speech worker on first use (or warm_up), not here
+
+        # optional googletrans fallback TTS could be added, but to keep simple we use pyttsx3 only
+        # note: pyttsx3 voices vary by system. We'll try to pick a voice matching language codes.
+
+    @staticmethod
+    def _voice_lang_codes(v) -> List[str]:
+        """Short language codes a voice advertises via v.languages, v.id or v.name."""
+        codes = []
+        for L in getattr(v, "languages", None) or []:
+            if isinstance(L, bytes):
+                # languages can be like [b'\x05en_GB'] or ['en_US']
+                L = L.decode("utf-8", errors="ignore")
+            code = re.split(r"[-_]", re.sub(r"^[^a-zA-Z]+", "", str(L)).lower())[0]
+            if code.isalpha() and 2 <= len(code) <= 3:
+                codes.append(code)
+        ident, name = v.id or "", v.name or ""
+        # locale parts of ids and names: TTS_MS_EN-US_ZIRA_11.0 (SAPI), MSTTS_V110_enUS_MarkM
+        # (OneCore), com.apple.voice.compact.hi-IN.Lekha; split first so "MS_EN" can't hide "EN-US"
+        for part in re.split(r"[\\/_ .]", f"{ident} {name}"):
+            if re.fullmatch(r"[A-Za-z]{2}-[A-Za-z]{2}|[a-z]{2}[A-Z]{2}", part):
+                codes.append(part[:2].lower())
+        # espeak ids are <family>/<language>[-<variant>]: inc/hi, gmw/en-us
+        if "/" in ident and "\\" not in ident:
+            lang = ident.rsplit("/", 1)[-1].lower().split("-")[0]
+            if lang.isalpha() and 2 <= len(lang) <= 3:
+                codes.append(lang)
+        searchable = f"{ident} {name}".lower()
+        for word, code in TTS._VOICE_NAME_LANGS.items():
+            if word in searchable:
+                codes.append(code)
+        return codes
+
+    @property
+    def available(self) -> bool:
+        return self.config.get("TTS_ENABLED", True) and not self._engine_failed and bool(pyttsx3)
+
+    def warm_up(self):
+        """Start the speech worker, which imports pyttsx3 and builds the engine and voice index."""
+        if self.available:
+            self._ensure_worker()
+
+    def _init_engine(self):
+        try:
+            engine = pyttsx3.init()
+            rate = engine.getProperty("rate")
+            # slightly slower
+            engine.setProperty("rate", int(rate * 0.95))
+            self._current_voice = engine.getProperty("voice")
+            self.engine = engine
+        except Exception:
+            self.engine = None
+            self._engine_failed = True
+        self.refresh_voices()
+
+    def refresh_voices(self):
+        """Rebuild the language -> voice lookup from the engine's installed voices."""
+        index = {}
+        if self.engine:
+            try:
+                for v in self.engine.getProperty("voices") or []:
+                    try:
+                        for code in self._voice_lang_codes(v):
+                            index.setdefault(code, v.id)
+                    except Exception:
+                        continue
+            except Exception:
+                pass
+        self._voice_index = index
+
+    def _find_voice_for_lang(self, target_lang_code: str):
+        """Voice id for a short language code (en, hi, pa), from the precomputed index."""
+        if not target_lang_code:
+            return None
+        return self._voice_index.get(target_lang_code)
+
+    def speak(self, text: str, lang: Optional[str] = None, priority: int = None, status: bool = False):
+        """Speak text. lang is short code: 'en', 'hi', 'pa', or None to use config.
+
+        Utterances are queued for the speech worker; lower priority values are spoken first.
+        status=True marks short status phrases that a newer queued status phrase supersedes.
+        """
+        if not text:
+            return
+        # decide language
+        if lang is None:
+            resp_lang = self.config.get("RESPONSE_LANGUAGE", "en")
+            if resp_lang == "auto":
+                resp_lang = "en"
+        else:
+            resp_lang = lang
+
+        print("Jarvis:", text)
+        if not self.available:
+            return
+        # given values in config may be 'en' or 'hi' or 'pa' or full like 'en-IN'; the worker picks the voice
+        voice_lang = resp_lang.split("-")[0] if resp_lang and len(resp_lang) >= 2 else None
+        if priority is None:
+            priority = self.PRIORITY_STATUS if status else self.PRIORITY_NORMAL
+        trace = self.metrics.current_trace()
+        item = {"text": text, "lang": voice_lang, "status": status, "priority": priority,
+                "group": trace if trace is not None else ("thread", threading.get_ident()),
+                "gen": self._generation, "queued_at": time.perf_counter(), "trace": trace}
+        self._ensure_worker()
+        with self._lock:
+            seq = next(self._seq)
+            group = self._groups.setdefault(item["group"], [priority, seq, 0])
+            try:
+                self._queue.put_nowait((group[0], group[1], seq, item))
+                group[2] += 1
+            except queue.Full:
+                self._stats["dropped"] += 1
+                if not group[2]:
+                    del self._groups[item["group"]]
+
+    def _dequeued(self, item: dict):
+        """Worker bookkeeping: item left the queue; its command's group ends with its last reply."""
+        with self._lock:
+            group = self._groups.get(item["group"])
+            if group is not None:
+                group[2] -= 1
+                if group[2] <= 0:
+                    del self._groups[item["group"]]
+
+    def cancel(self):
+        """Barge-in: drop everything queued and interrupt the current utterance."""
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry[-1] is None:
+                    # keep the shutdown sentinel
+                    self._queue.put_nowait(entry)
+                    break
+                self._stats["cancelled"] += 1
+            self._groups.clear()
+        if self._speaking and self.engine:
+            try:
+                self.engine.stop()
+            except Exception:
+                pass
+
+    def shutdown(self):
+        if self._worker:
+            self.cancel()
+            self._queue.put((-1, -1, next(self._seq), None))
+
+    def stats(self) -> dict:
+        """Queue depth and time-to-first-audio (ms) of the speech worker."""
+        ttfa = list(self._ttfa_ms)
+        with self._lock:
+            out = dict(self._stats)
+        out["queue_depth"] = self._queue.qsize()
+        out["ttfa_last_ms"] = round(ttfa[-1], 1) if ttfa else None
+        out["ttfa_avg_ms"] = round(sum(ttfa) / len(ttfa), 1) if ttfa else None
+        out["ttfa_max_ms"] = round(max(ttfa), 1) if ttfa else None
+        return out
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="jarvis-tts", daemon=True)
+                self._worker.start()
+
+    def _on_utterance_started(self, name):
+        item = self._in_flight.get(name)
+        if item is not None:
+            waited = (time.perf_counter() - item["queued_at"]) * 1000
+            self._ttfa_ms.append(waited)
+            self.metrics.record("tts.wait", waited, item["trace"])
+
+    def _run(self):
+        """Speech worker: the only thread that touches the pyttsx3 engine."""
+        self._init_engine()
+        if self.engine is None:
+            return  # speak() stops queueing once _engine_failed is set
+        try:
+            self.engine.connect("started-utterance", self._on_utterance_started)
+            has_callback = True
+        except Exception:
+            has_callback = False
+        while True:
+            entry = self._queue.get()
+            if entry[-1] is None:
+                break
+            batch = [entry]
+            # pull whatever is already waiting at the same priority and speak it in one run
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt[-1] is None or nxt[0] != entry[0]:
+                    try:
+                        self._queue.put_nowait(nxt)
+                    except queue.Full:
+                        with self._lock:
+                            self._stats["dropped"] += 1
+                    break
+                batch.append(nxt)
+            for e in batch:
+                self._dequeued(e[-1])
+            items = [e[-1] for e in batch if e[-1]["gen"] == self._generation]
+            # a status phrase followed by another queued status phrase of the same command and
+            # priority is superseded; replies are never moved, only dropped
+            kept = []
+            for i, item in enumerate(items):
+                if item["status"] and any(later["status"] and later["group"] == item["group"]
+                                          and later["priority"] == item["priority"] for later in items[i + 1:]):
+                    continue
+                kept.append(item)
+            with self._lock:
+                self._stats["cancelled"] += len(batch) - len(items)
+                self._stats["coalesced"] += len(items) - len(kept)
+            if not kept:
+                continue
+            self._in_flight = {}
+            try:
+                for item in kept:
+                    # try to set voice if we can find appropriate one
+                    voice = self._find_voice_for_lang(item["lang"])
+                    if voice and voice != self._current_voice:
+                        try:
+                            self.engine.setProperty("voice", voice)
+                            self._current_voice = voice
+                        except Exception:
+                            pass
+                    name = str(next(self._seq))
+                    self._in_flight[name] = item
+                    if not has_callback:
+                        self._on_utterance_started(name)
+                    self.engine.say(item["text"], name)
+                self._speaking = True
+                started = time.perf_counter()
+                self.engine.runAndWait()
+                self.metrics.record("tts.speak", (time.perf_counter() - started) * 1000, kept[0]["trace"])
+                with self._lock:
+                    self._stats["spoken"] += len(kept)
+            except Exception:
+                pass
+            finally:
+                self._speaking = False
+
+
+# ---------------- AUDIO CAPTURE ----------------
+def audio_rms(chunk: bytes, width: int) -> float:
+    """Root-mean-square energy of little-endian PCM samples."""
+    typecode = {1: "b", 2: "h", 4: "i"}.get(width)
+    if not typecode or not chunk:
+        return 0.0
+    samples = array.array(typecode, chunk[:len(chunk) - len(chunk) % width])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(x * x for x in samples) / len(samples))
+
+
+class AudioStream:
+    """
+    Long-lived capture stream. A background thread reads the microphone into a ring buffer of
+    chunks and keeps the ambient energy threshold updated from non-speech audio, so each
+    listen() starts capturing immediately instead of reopening and recalibrating the device.
+
+    source_factory returns a speech_recognition-style source (sr.Microphone or a recorded stand-in)
+    with SAMPLE_RATE, SAMPLE_WIDTH, CHUNK and a stream.read(n) after __enter__.
+    """
+
+    CALIBRATION_SECONDS = 0.4
+    DYNAMIC_RATIO = 1.5  # threshold = ambient energy * ratio
+    DAMPING = 0.15  # fraction of the old threshold kept after one second
+    MIN_THRESHOLD = 50.0
+    PREROLL_SECONDS = 0.3
+
+    def __init__(self, source_factory, buffer_seconds: float = 10.0, pause_threshold: float = 0.8):
+        self.source_factory = source_factory
+        self.buffer_seconds = buffer_seconds
+        self.pause_threshold = pause_threshold
+        self.energy_threshold = None
+        self.sample_rate = None
+        self.sample_width = None
+        self.chunk_seconds = None
+        self._source = None
+        self._chunks = None
+        self._next_seq = 0  # sequence number of the next chunk to arrive
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._source = self.source_factory()
+        self._source.__enter__()
+        self.sample_rate = self._source.SAMPLE_RATE
+        self.sample_width = self._source.SAMPLE_WIDTH
+        self.chunk_seconds = float(self._source.CHUNK) / self.sample_rate
+        self._chunks = collections.deque(maxlen=max(1, int(self.buffer_seconds / self.chunk_seconds)))
+        self._calibrate()
+        self._thread = threading.Thread(target=self._run, name="jarvis-mic", daemon=True)
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        """False once the capture thread has stopped (device error, or a recorded source ran dry)."""
+        return self._thread is not None and not self._stop.is_set()
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self._error
+
+    def close(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        try:
+            if self._source is not None:
+                self._source.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def _read_chunk(self) -> bytes:
+        return self._source.stream.read(self._source.CHUNK)
+
+    def _calibrate(self):
+        energies = []
+        for _ in range(max(1, int(self.CALIBRATION_SECONDS / self.chunk_seconds))):
+            chunk = self._read_chunk()
+            if not chunk:
+                break
+            energies.append(audio_rms(chunk, self.sample_width))
+        ambient = sum(energies) / len(energies) if energies else 0.0
+        self.energy_threshold = max(self.MIN_THRESHOLD, ambient * self.DYNAMIC_RATIO)
+
+    def _run(self):
+        damping = self.DAMPING ** self.chunk_seconds
+        while not self._stop.is_set():
+            try:
+                chunk = self._read_chunk()
+            except Exception as e:
+                self._error = e
+                break
+            if not chunk:
+                # recorded sources run dry
+                break
+            energy = audio_rms(chunk, self.sample_width)
+            if energy < self.energy_threshold:
+                # only ambient audio moves the threshold
+                target = max(self.MIN_THRESHOLD, energy * self.DYNAMIC_RATIO)
+                self.energy_threshold = self.energy_threshold * damping + target * (1 - damping)
+            with self._cond:
+                self._chunks.append((chunk, energy))
+                self._next_seq += 1
+                self._cond.notify_all()
+        with self._cond:
+            self._stop.set()
+            self._cond.notify_all()
+
+    def _get(self, seq: int, wait: float):
+        """Chunk number seq (or the oldest still buffered) -> (seq, chunk, energy), or None."""
+        with self._cond:
+            if seq >= self._next_seq and not self._stop.is_set():
+                self._cond.wait(wait)
+            if seq >= self._next_seq:
+                return None
+            oldest = self._next_seq - len(self._chunks)
+            seq = max(seq, oldest)
+            chunk, energy = self._chunks[seq - oldest]
+            return seq, chunk, energy
+
+    def listen(self, timeout: Optional[float] = None, phrase_time_limit: Optional[float] = None,
+               stop_event: Optional[threading.Event] = None):
+        """Wait for a phrase in the buffered stream and return it as sr.AudioData."""
+        preroll = collections.deque(maxlen=max(1, int(self.PREROLL_SECONDS / self.chunk_seconds)))
+        pause_chunks = max(1, int(math.ceil(self.pause_threshold / self.chunk_seconds)))
+        with self._cond:
+            seq = self._next_seq
+        frames = []
+        waited = 0.0
+        phrase_seconds = 0.0
+        silent = 0
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                raise sr.WaitTimeoutError("listening stopped")
+            got = self._get(seq, wait=0.25)
+            if got is None:
+                if self._stop.is_set():
+                    if frames:
+                        break
+                    raise sr.WaitTimeoutError(f"audio stream closed: {self._error}" if self._error else "audio stream closed")
+                continue
+            seq, chunk, energy = got
+            seq += 1
+            speech = energy > self.energy_threshold
+            if not frames:
+                waited += self.chunk_seconds
+                if speech:
+                    frames.extend(preroll)
+                    frames.append(chunk)
+                    phrase_seconds = self.chunk_seconds
+                elif timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                else:
+                    preroll.append(chunk)
+                continue
+            frames.append(chunk)
+            phrase_seconds += self.chunk_seconds
+            silent = 0 if speech else silent + 1
+            if silent >= pause_chunks or (phrase_time_limit and phrase_seconds >= phrase_time_limit):
+                break
+        return sr.AudioData(b"".join(frames), self.sample_rate, self.sample_width)
+
+
+class WakeWordSpotter:
+    """
+    Cheap local gate ahead of full recognition for the wake-word loop. Phrases with less than
+    WAKE_MIN_SECONDS of voiced audio (clicks, knocks, short noises) are dropped; when a Vosk model
+    is available, a grammar restricted to the WAKE_WORDS vocabulary then decides whether the
+    phrase probably contains a wake word. Without a model there is no keyword stage: every
+    phrase long enough to be speech is escalated to full recognition.
+    """
+
+    SAMPLE_RATE = 16000
+    FRAME_SECONDS = 0.02
+
+    def __init__(self, config_ref):
+        self.min_seconds = config_ref.get("WAKE_MIN_SECONDS", 0.25)
+        self.phrases = [w.lower() for w in config_ref.get("WAKE_WORDS", [])]
+        vocab = sorted({t for w in self.phrases for t in w.split()})
+        self._grammar = json.dumps(vocab + ["[unk]"])
+        self._model = None
+        model_path = config_ref.get("WAKE_SPOTTER_MODEL") or next(
+            (path for lang, path in config_ref.get("VOSK_MODELS", {}).items() if lang.startswith("en")), None)
+        if model_path and vosk:
+            try:
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(resolve_path(model_path))
+            except Exception as e:
+                print("wake-word model unavailable", e)
+        self.stats = {"checked": 0, "escalated": 0, "rejected": 0}
+
+    @property
+    def has_model(self) -> bool:
+        return self._model is not None
+
+    def voiced_seconds(self, audio, energy_threshold: Optional[float] = None) -> float:
+        """
+        Seconds of audio in 20 ms frames above the energy threshold, so the ambient pre-roll and the
+        pause tail of a captured phrase don't count. Without a threshold (e.g. a WAV file) one is
+        estimated from the quietest frames of the clip itself.
+        """
+        width = audio.sample_width
+        frame = max(1, int(audio.sample_rate * self.FRAME_SECONDS)) * width
+        data = audio.frame_data
+        energies = [audio_rms(data[i:i + frame], width) for i in range(0, len(data), frame)]
+        if not energies:
+            return 0.0
+        if energy_threshold is None:
+            floor = sorted(energies)[len(energies) // 10]
+            energy_threshold = max(AudioStream.MIN_THRESHOLD, floor * AudioStream.DYNAMIC_RATIO)
+        voiced = sum(1 for e in energies if e > energy_threshold)
+        return voiced * frame / float(audio.sample_rate * width)
+
+    def probable(self, audio, energy_threshold: Optional[float] = None) -> bool:
+        """True if audio should be escalated to full recognition."""
+        self.stats["checked"] += 1
+        ok = self.voiced_seconds(audio, energy_threshold) >= self.min_seconds
+        if ok and self._model is not None:
+            rec = vosk.KaldiRecognizer(self._model, self.SAMPLE_RATE, self._grammar)
+            rec.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+            heard = " " + json.loads(rec.FinalResult()).get("text", "") + " "
+            ok = any(f" {p} " in heard for p in self.phrases)
+        self.stats["escalated" if ok else "rejected"] += 1
+        return ok
+
+
+# ---------------- RECOGNIZER BACKENDS ----------------
+class RecognizerBackend:
+    """Speech-to-text backend. recognize(audio, lang) returns (text, confidence); text is None on failure."""
+
+    name = "base"
+
+    def recognize(self, audio, lang: str):
+        raise NotImplementedError
+
+
+class GoogleRecognizerBackend(RecognizerBackend):
+    """Google Web Speech API through speech_recognition (network round-trip per call)."""
+
+    name = "google"
+
+    def __init__(self, config_ref, recognizer):
+        if recognizer is None:
+            raise RuntimeError("SpeechRecognition not available")
+        self.recognizer = recognizer
+
+    def recognize(self, audio, lang: str):
+        try:
+            raw = self.recognizer.recognize_google(audio, language=lang, show_all=True)
+        except Exception:
+            return None, 0.0
+        alternatives = raw.get("alternative", []) if isinstance(raw, dict) else []
+        if not alternatives:
+            return None, 0.0
+        best = alternatives[0]
+        return best.get("transcript"), float(best.get("confidence", 0.0))
+
+
+class VoskRecognizerBackend(RecognizerBackend):
+    """Offline, in-process recognition with Vosk models (config VOSK_MODELS: language -> model dir)."""
+
+    name = "vosk"
+    SAMPLE_RATE = 16000
+
+    def __init__(self, config_ref, recognizer=None):
+        if not vosk:
+            raise RuntimeError("vosk not installed")
+        self.model_paths = config_ref.get("VOSK_MODELS", {})
+        if not self.model_paths:
+            raise RuntimeError("VOSK_MODELS not configured")
+        self._models = {}
+        self._lock = threading.Lock()
+        vosk.SetLogLevel(-1)
+
+    def _model(self, lang: str):
+        path = self.model_paths.get(lang) or self.model_paths.get(lang.split("-")[0])
+        if not path:
+            return None
+        with self._lock:
+            if path not in self._models:
+                self._models[path] = vosk.Model(resolve_path(path))
+            return self._models[path]
+
+    def recognize(self, audio, lang: str):
+        model = self._model(lang)
+        if model is None:
+            return None, 0.0
+        rec = vosk.KaldiRecognizer(model, self.SAMPLE_RATE)
+        rec.SetWords(True)
+        rec.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+        result = json.loads(rec.FinalResult())
+        text = result.get("text", "").strip()
+        if not text:
+            return None, 0.0
+        words = result.get("result", [])
+        conf = sum(w.get("conf", 0.0) for w in words) / len(words) if words else 0.0
+        return text, conf
+
+
+RECOGNIZER_BACKENDS = {
+    "google": GoogleRecognizerBackend,
+    "vosk": VoskRecognizerBackend,
+}
+
+
+def make_recognizer_backend(config_ref, recognizer) -> Optional[RecognizerBackend]:
+    """Build the configured backend, falling back to Google when it can't be created."""
+    name = config_ref.get("RECOGNIZER_BACKEND", "google")
+    cls = RECOGNIZER_BACKENDS.get(name, GoogleRecognizerBackend)
+    try:
+        return cls(config_ref, recognizer)
+    except Exception as e:
+        if cls is GoogleRecognizerBackend:
+            return None
+        print(f"recognizer backend '{name}' unavailable ({e}); using google")
+    try:
+        return GoogleRecognizerBackend(config_ref, recognizer)
+    except Exception:
+        return None
+
+
+# ---------------- LANGUAGE IDENTIFICATION ----------------
+class LanguageIdentifier:
+    """
+    Offline en/hi/pa identifier. Native script decides first (Devanagari -> hi, Gurmukhi -> pa,
+    looked up per 128-codepoint Unicode block); romanized text is scored with weighted token and
+    suffix tables. identify() returns (lang, confidence).
+    """
+
+    # Unicode block (codepoint >> 7) -> language
+    SCRIPT_BLOCKS = {0x0900 >> 7: "hi", 0x0A00 >> 7: "pa"}
+    # Devanagari dandas also end Gurmukhi sentences, so they don't count as letters
+    NEUTRAL_CHARS = frozenset("\u0964\u0965")
+
+    TOKEN_WEIGHTS = {
+        "hi": {
+            "hai": 1.0, "hain": 1.5, "kya": 1.5, "nahi": 1.0, "nahin": 1.5, "mujhe": 2.0, "mera": 1.5,
+            "meri": 1.5, "mere": 1.0, "tum": 1.5, "tumhara": 2.0, "aap": 1.5, "aapka": 2.0, "kaise": 2.0,
+            "kaisa": 1.5, "kahan": 2.0, "kyun": 2.0, "karo": 1.0, "karna": 1.5, "kar": 0.5, "raha": 1.5,
+            "rahi": 1.5, "rahe": 1.5, "gaya": 1.5, "gayi": 1.5, "tha": 1.5, "thi": 1.5, "bahut": 1.0,
+            "accha": 1.5, "acha": 1.5, "achha": 1.5, "bhi": 1.0, "aur": 1.5, "ko": 1.0, "se": 1.0,
+            "mein": 1.5, "hum": 1.5, "hamara": 2.0, "abhi": 1.5, "chalo": 1.0, "batao": 2.0, "bolo": 1.5,
+            "kholo": 2.0, "band": 0.5, "dikhao": 2.0, "sunao": 2.0, "chahiye": 2.0, "kuch": 2.0,
+            "koi": 1.0, "yeh": 1.5, "woh": 1.5, "wahan": 2.0, "yahan": 2.0, "zara": 1.5, "theek": 1.5,
+            "thik": 1.5, "kaun": 2.0, "hamesha": 2.0, "namaste": 1.5, "dhanyavaad": 2.0, "shukriya": 2.0,
+        },
+        "pa": {
+            "hai": 0.5, "tusi": 2.0, "tussi": 2.0, "tuhada": 2.0, "tuhanu": 2.0, "mainu": 2.0, "menu": 0.5,
+            "saanu": 2.0, "sanu": 1.5, "kiven": 2.0, "kidaan": 2.0, "kive": 2.0, "changa": 2.0,
+            "changi": 2.0, "haige": 2.0, "hega": 2.0, "nai": 1.0, "da": 1.0, "di": 1.0, "de": 0.5,
+            "nu": 1.5, "vich": 2.0, "wich": 2.0, "ohna": 2.0, "ehna": 2.0, "kithe": 2.0, "kitthe": 2.0,
+            "hun": 1.5, "hunn": 2.0, "dasso": 2.0, "daso": 2.0, "sadda": 2.0, "saada": 2.0, "sat": 0.5,
+            "sri": 0.5, "akal": 2.0, "bhaji": 2.0, "paaji": 2.0, "veere": 2.0, "kuddi": 2.0, "munda": 2.0,
+            "sohna": 2.0, "bohat": 1.5, "ithe": 2.0, "othe": 2.0, "gall": 1.5, "karange": 2.0,
+            "karanga": 2.0, "haan": 1.0, "ji": 0.5, "khol": 1.0, "chalo": 0.5,
+        },
+        "en": {
+            "the": 1.5, "is": 1.0, "are": 1.0, "what": 1.5, "open": 1.0, "close": 1.0, "please": 1.0,
+            "weather": 1.5, "time": 1.0, "how": 1.5, "to": 0.5, "of": 1.0, "and": 1.0, "you": 1.0,
+            "me": 0.5, "my": 1.0, "in": 0.5, "on": 0.5, "for": 1.0, "it": 1.0, "this": 1.5, "that": 1.5,
+            "search": 1.0, "play": 1.0, "note": 1.0, "notes": 1.0, "today": 1.5, "tomorrow": 1.5,
+            "with": 1.5, "hello": 1.0, "thanks": 1.5, "good": 1.0, "morning": 1.0,
+        },
+    }
+    # word endings typical of romanized verb forms
+    SUFFIX_WEIGHTS = {
+        "enge": ("hi", 1.0), "unga": ("hi", 1.0), "oge": ("hi", 0.5), "iye": ("hi", 0.5),
+        "ange": ("pa", 1.0), "anga": ("pa", 1.0), "eyaan": ("pa", 1.0), "iyan": ("pa", 0.5),
+        "ing": ("en", 1.0), "tion": ("en", 1.0), "ly": ("en", 0.5),
+    }
+    EN_PRIOR = 0.5  # unknown romanized text is assumed to be English
+
+    def identify(self, text: str):
+        script_counts = {}
+        letters = 0
+        blocks = self.SCRIPT_BLOCKS
+        for ch in text:
+            if ch in self.NEUTRAL_CHARS:
+                continue
+            lang = blocks.get(ord(ch) >> 7)
+            if lang:
+                script_counts[lang] = script_counts.get(lang, 0) + 1
+                letters += 1
+            elif ch.isalpha():
+                letters += 1
+        if script_counts:
+            lang = max(script_counts, key=script_counts.get)
+            return lang, round(max(0.5, script_counts[lang] / float(letters)), 3)
+
+        scores = {"en": self.EN_PRIOR, "hi": 0.0, "pa": 0.0}
+        for tok in tokenize(text):
+            matched = False
+            for lang, table in self.TOKEN_WEIGHTS.items():
+                w = table.get(tok)
+                if w:
+                    scores[lang] += w
+                    matched = True
+            if not matched and len(tok) > 4:
+                for suffix, (lang, w) in self.SUFFIX_WEIGHTS.items():
+                    if tok.endswith(suffix):
+                        scores[lang] += w
+                        break
+        lang = max(scores, key=scores.get)
+        return lang, round(scores[lang] / sum(scores.values()), 3)
+
+
+# ---------------- NOTES STORE ----------------
+class Note(NamedTuple):
+    id: int
+    timestamp: str
+    text: str
+    offset: int
+
+
+class NotesSearchIndex:
+    """
+    Inverted index over notes: token -> ascending note ids. Kept in memory, updated per
+    appended note and snapshotted as JSON next to the notes file; on load the owner replays
+    only the notes added since the snapshot.
+    """
+
+    TOKEN_RE = re.compile(r"[\w\u0900-\u097F\u0A00-\u0A7F]+")
+    SAVE_EVERY = 500  # appends between snapshots
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.postings = {}
+        self.upto = 0  # notes [0, upto) are indexed
+        self._dirty = 0
+
+    @classmethod
+    def tokens(cls, text: str) -> set:
+        return set(cls.TOKEN_RE.findall(text.lower()))
+
+    def reset(self):
+        self.postings = {}
+        self.upto = 0
+        self._dirty += 1
+
+    def add(self, note_id: int, text: str, autosave: bool = True):
+        for tok in self.tokens(text):
+            self.postings.setdefault(tok, []).append(note_id)
+        self.upto = max(self.upto, note_id + 1)
+        self._dirty += 1
+        if autosave and self._dirty >= self.SAVE_EVERY:
+            self.save()
+
+    def load(self):
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.postings = data["postings"]
+            self.upto = data["upto"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print("notes search index load error", e)
+            self.reset()
+        self._dirty = 0
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump({"upto": self.upto, "postings": self.postings}, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._dirty = 0
+        except Exception as e:
+            print("notes search index save error", e)
+
+    def query(self, text: str) -> List[int]:
+        """Note ids containing every query token, newest first; any-token matches if none do."""
+        toks = self.tokens(text)
+        lists = sorted((self.postings.get(t, []) for t in toks), key=len)
+        if not lists:
+            return []
+        if lists[0]:
+            hits = set(lists[0])
+            for other in lists[1:]:
+                hits.intersection_update(other)
+                if not hits:
+                    break
+            if hits:
+                return sorted(hits, reverse=True)
+        # no note has all tokens: rank by number of matching tokens, then recency
+        scores = collections.Counter(i for lst in lists for i in lst)
+        return sorted(scores, key=lambda i: (scores[i], i), reverse=True)
+
+
+class NotesStore:
+    """
+    Notes kept as the append-only '[YYYY-mm-dd HH:MM:SS] text' log plus a sidecar index
+    (<notes file>.idx) of fixed-size records: byte offset, length, epoch timestamp, flags.
+    Tail reads, date lookups (binary search on timestamps) and single deletions touch only
+    the records and lines involved. A missing index is built from the log, which also migrates
+    existing notes files; an index whose last record no longer lines up with the log (the log
+    shrank, or an earlier line was edited) is rebuilt. Deleted lines are blanked in place so offsets stay valid.
+    Full-text search uses a NotesSearchIndex (<notes file>.search) kept in step with the index.
+    """
+
+    RECORD = struct.Struct("<QIqB")
+    DELETED = 1
+    TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+    LINE_RE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] ?(.*)$")
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self._lock = threading.RLock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.search_index = NotesSearchIndex(self.path.with_name(self.path.name + ".search"))
+        self.search_index.load()
+        self.sync()
+
+    # -- index maintenance --
+    def _count(self) -> int:
+        return self.index_path.stat().st_size // self.RECORD.size if self.index_path.exists() else 0
+
+    def _read_records(self, start: int, stop: int) -> list:
+        if stop <= start:
+            return []
+        with self.index_path.open("rb") as f:
+            f.seek(start * self.RECORD.size)
+            data = f.read((stop - start) * self.RECORD.size)
+        return [self.RECORD.unpack_from(data, i) for i in range(0, len(data) - self.RECORD.size + 1, self.RECORD.size)]
+
+    @classmethod
+    def _parse(cls, raw: bytes):
+        """(timestamp string, epoch seconds, text) of one log line."""
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        m = cls.LINE_RE.match(line)
+        if not m:
+            return "", 0, line.strip()
+        ts = m.group(1)
+        try:
+            epoch = int(datetime.datetime(int(ts[0:4]), int(ts[5:7]), int(ts[8:10]),
+                                          int(ts[11:13]), int(ts[14:16]), int(ts[17:19])).timestamp())
+        except ValueError:
+            epoch = 0
+        return ts, epoch, m.group(2)
+
+    def _index_from(self, offset: int, mode: str, last_epoch: int = 0):
+        """Index log lines starting at byte offset."""
+        with self.path.open("rb") as log, self.index_path.open(mode) as idx:
+            log.seek(offset)
+            for raw in log:
+                if raw.strip():
+                    _ts, epoch, _text = self._parse(raw)
+                    # lines without a timestamp inherit the previous one to keep the index sorted
+                    last_epoch = epoch or last_epoch
+                    idx.write(self.RECORD.pack(offset, len(raw), last_epoch, 0))
+                offset += len(raw)
+
+    def _record_intact(self, record, size: int) -> bool:
+        """Whether an index record still points at one whole, unchanged line of the log."""
+        off, length, epoch, flags = record
+        if off + length > size:
+            return False
+        with self.path.open("rb") as log:
+            log.seek(max(0, off - 1))
+            raw = log.read(length + (1 if off else 0))
+        if off:
+            if raw[:1] != b"\n":
+                return False  # no longer starts a line: something before it was edited
+            raw = raw[1:]
+        if not raw.endswith(b"\n") and off + length != size:
+            return False
+        if flags & self.DELETED:
+            return not raw.strip()
+        ts, line_epoch, _text = self._parse(raw)
+        return not ts or line_epoch == epoch
+
+    def sync(self):
+        """Bring the index up to date with the log (new lines appended elsewhere, or a rewrite)."""
+        with self._lock:
+            size = self.path.stat().st_size
+            n = self._count()
+            end = last_epoch = 0
+            record = None
+            if n:
+                record = self._read_records(n - 1, n)[0]
+                off, length, last_epoch, _flags = record
+                end = off + length
+            if record is not None and not self._record_intact(record, size):
+                # log shrank, or an earlier line was edited and the offsets moved: rebuild
+                self._index_from(0, "wb")
+                self.search_index.reset()
+            elif end < size or not self.index_path.exists():
+                self._index_from(end, "ab", last_epoch)
+            self._sync_search()
+
+    def _sync_search(self):
+        """Feed notes the search index hasn't seen yet."""
+        total = self._count()
+        if self.search_index.upto > total:
+            self.search_index.reset()
+        start = self.search_index.upto
+        if start >= total:
+            return
+        while start < total:
+            stop = min(total, start + 5000)
+            for note in self._load(start, self._read_records(start, stop)):
+                self.search_index.add(note.id, note.text, autosave=False)
+            self.search_index.upto = stop
+            start = stop
+        self.search_index.save()
+
+    # -- reads --
+    def _load(self, start: int, records) -> List[Note]:
+        """Live notes for consecutive index records beginning at note id start."""
+        notes = []
+        with self.path.open("rb") as f:
+            for i, (off, length, _epoch, flags) in enumerate(records):
+                if flags & self.DELETED:
+                    continue
+                f.seek(off)
+                ts, _epoch, text = self._parse(f.read(length))
+                if text:
+                    notes.append(Note(start + i, ts, text, off))
+        return notes
+
+    def count(self) -> int:
+        return self._count()
+
+    def tail(self, n: int = 10, before: Optional[int] = None) -> List[Note]:
+        """Last n notes (with id < before, if given), oldest first."""
+        with self._lock:
+            self.sync()
+            total = self._count()
+            notes = []
+            start = total if before is None else min(before, total)
+            # widen the window until enough live notes are found (deleted ones are skipped)
+            while start > 0 and len(notes) < n:
+                stop, start = start, max(0, start - max(n, 16))
+                notes = self._load(start, self._read_records(start, stop)) + notes
+            return notes[-n:] if n else []
+
+    def after(self, note_id: int, n: int = 10) -> List[Note]:
+        """First n notes with id > note_id, oldest first (tail(before=...) the other way)."""
+        with self._lock:
+            self.sync()
+            total = self._count()
+            notes = []
+            start = max(0, note_id + 1)
+            while start < total and len(notes) < n:
+                stop = min(total, start + max(n, 16))
+                notes += self._load(start, self._read_records(start, stop))
+                start = stop
+            return notes[:n]
+
+    def window(self, n: int, after: Optional[int] = None):
+        """
+        (last n notes, log end offset) taken together, for readers that continue with read_from.
+        With after, the notes are the first n with id > after instead (see after()).
+        """
+        with self._lock:
+            notes = self.tail(n) if after is None else self.after(after, n)
+            return notes, self.path.stat().st_size
+
+    def on_date(self, day: datetime.date) -> List[Note]:
+        """Notes written on a calendar day (assumes timestamps are appended in order)."""
+        lo_ts = int(datetime.datetime.combine(day, datetime.time()).timestamp())
+        hi_ts = int(datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time()).timestamp())
+        with self._lock:
+            self.sync()
+            total = self._count()
+
+            def first_at_or_after(ts):
+                lo, hi = 0, total
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if self._read_records(mid, mid + 1)[0][2] < ts:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                return lo
+
+            start, stop = first_at_or_after(lo_ts), first_at_or_after(hi_ts)
+            return self._load(start, self._read_records(start, stop))
+
+    def read_from(self, offset: int):
+        """
+        (notes whose line starts at or after byte offset, new end offset) for incremental readers.
+        Notes is None when the log is shorter than offset, i.e. it was cleared or rewritten.
+        """
+        with self._lock:
+            self.sync()
+            size = self.path.stat().st_size
+            if offset > size:
+                return None, size
+            total = self._count()
+            lo, hi = 0, total
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._read_records(mid, mid + 1)[0][0] < offset:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return self._load(lo, self._read_records(lo, total)), size
+
+    def get(self, note_ids) -> List[Note]:
+        """Live notes for the given ids, in the given order."""
+        notes = []
+        with self._lock:
+            for note_id in note_ids:
+                notes.extend(self._load(note_id, self._read_records(note_id, note_id + 1)))
+        return notes
+
+    def search(self, query: str, limit: int = 10) -> List[Note]:
+        """Notes matching query words, newest first."""
+        with self._lock:
+            self.sync()
+            results = []
+            ids = self.search_index.query(query)
+            # deleted notes stay in the postings, so fetch a little more than needed
+            for i in range(0, len(ids), limit):
+                results.extend(self.get(ids[i:i + limit]))
+                if len(results) >= limit:
+                    break
+            return results[:limit]
+
+    def flush(self):
+        with self._lock:
+            self.search_index.save()
+
+    # -- writes --
+    def append(self, text: str) -> Note:
+        text = " ".join(text.split())
+        ts = datetime.datetime.now().strftime(self.TS_FORMAT)
+        raw = f"[{ts}] {text}\n".encode("utf-8")
+        with self._lock:
+            self.sync()
+            with self.path.open("ab") as log:
+                offset = log.tell()
+                log.write(raw)
+            epoch = self._parse(raw)[1]
+            with self.index_path.open("ab") as idx:
+                idx.write(self.RECORD.pack(offset, len(raw), epoch, 0))
+            note = Note(self._count() - 1, ts, text, offset)
+            self.search_index.add(note.id, text)
+            return note
+
+    def delete(self, note_id: int) -> bool:
+        with self._lock:
+            recs = self._read_records(note_id, note_id + 1)
+            if not recs or recs[0][3] & self.DELETED:
+                return False
+            off, length, epoch, flags = recs[0]
+            with self.path.open("r+b") as log:
+                log.seek(off)
+                log.write(b" " * (length - 1) + b"\n")
+            with self.index_path.open("r+b") as idx:
+                idx.seek(note_id * self.RECORD.size)
+                idx.write(self.RECORD.pack(off, length, epoch, flags | self.DELETED))
+            return True
+
+    def clear(self):
+        with self._lock:
+            self.path.write_bytes(b"")
+            self.index_path.write_bytes(b"")
+            self.search_index.reset()
+            self.search_index.save()
+
+
+# ---------------- APP INDEX ----------------
+class AppEntry(NamedTuple):
+    name: str
+    target: str  # resolved path / command / URI
+    argv: list  # pre-split command line for POSIX launches
+    source: str  # 'config', 'desktop' or 'path'
+
+
+class AppIndex:
+    """
+    Launchable applications by spoken name: config APPS plus, on Linux, discovered .desktop
+    entries and executables on PATH. Names and aliases go into a word-level trie so finding the
+    app mentioned in a command costs the same regardless of catalog size. Discovered entries are
+    cached in APP_INDEX_FILE and reused while the scanned directories are unchanged.
+    """
+
+    SOURCE_RANK = {"config": 3, "desktop": 2, "path": 1}
+    FILLER_WORDS = {"the", "my", "a", "an", "app", "application", "please"}
+    URI_RE = re.compile(r"^[a-z][\w.+-]+:", re.I)  # ms-settings:, not a C: drive path
+    DESKTOP_DIRS = ["~/.local/share/applications", "/usr/local/share/applications", "/usr/share/applications",
+                    "/var/lib/flatpak/exports/share/applications", "~/.local/share/flatpak/exports/share/applications"]
+    FIELD_CODE_RE = re.compile(r"\s*%[fFuUdDnNickvm]")
+    VERB_RE = re.compile(r"^(?:please\s+)?(?:open|launch|start|run|close|kill|stop|exit|quit)\s+")
+
+    def __init__(self, config_ref):
+        self.config = config_ref
+        self.entries = {}  # alias -> AppEntry
+        self._trie = {}
+        self._launchable = set()  # aliases whose entry can be started on this machine
+        self._fuzzy = None
+        self._lock = threading.Lock()
+        self.refresh(rescan=False)
+
+    # -- discovery --
+    def _scan_dirs(self) -> List[str]:
+        dirs = [os.path.expanduser(d) for d in self.DESKTOP_DIRS]
+        dirs += [d for d in os.environ.get("PATH", "").split(os.pathsep) if d]
+        return [d for d in dict.fromkeys(dirs) if os.path.isdir(d)]
+
+    def _fingerprint(self, dirs: List[str]) -> dict:
+        out = {}
+        for d in dirs:
+            try:
+                out[d] = os.stat(d).st_mtime
+            except OSError:
+                continue
+        return out
+
+    @classmethod
+    def _parse_desktop(cls, path: str):
+        fields = {}
+        in_entry = False
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("["):
+                        in_entry = line == "[Desktop Entry]"
+                        continue
+                    if in_entry and "=" in line:
+                        k, v = line.split("=", 1)
+                        fields.setdefault(k.strip(), v.strip())
+        except OSError:
+            return None
+        if fields.get("Type", "Application") != "Application" or not fields.get("Exec"):
+            return None
+        if fields.get("NoDisplay", "").lower() == "true" or fields.get("Hidden", "").lower() == "true":
+            return None
+        try:
+            argv = shlex.split(cls.FIELD_CODE_RE.sub("", fields["Exec"]))
+        except ValueError:
+            return None
+        return fields.get("Name", ""), argv
+
+    def _discover(self, dirs: List[str]) -> list:
+        """[alias, target, argv, source] rows for desktop entries and PATH executables."""
+        rows = []
+        desktop_dirs = {os.path.expanduser(d) for d in self.DESKTOP_DIRS}
+        for d in dirs:
+            try:
+                names = os.listdir(d)
+            except OSError:
+                continue
+            if d in desktop_dirs:
+                for fn in names:
+                    if not fn.endswith(".desktop"):
+                        continue
+                    parsed = self._parse_desktop(os.path.join(d, fn))
+                    if not parsed:
+                        continue
+                    name, argv = parsed
+                    stem = fn[:-len(".desktop")].lower()
+                    for alias in {name.lower(), stem, stem.rsplit(".", 1)[-1]}:
+                        if alias:
+                            rows.append([alias, argv[0], argv, "desktop"])
+            else:
+                for fn in names:
+                    full = os.path.join(d, fn)
+                    if os.access(full, os.X_OK) and not os.path.isdir(full):
+                        rows.append([fn.lower(), full, [full], "path"])
+        return rows
+
+    def _load_discovered(self, dirs: List[str]) -> Optional[list]:
+        path = self.config.get("APP_INDEX_FILE")
+        if not path:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") == self._fingerprint(dirs):
+                return data["rows"]
+        except Exception:
+            pass
+        return None
+
+    def _save_discovered(self, dirs: List[str], rows: list):
+        path = self.config.get("APP_INDEX_FILE")
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"fingerprint": self._fingerprint(dirs), "rows": rows}))
+        except Exception as e:
+            print("app index save error", e)
+
+    # -- building --
+    @staticmethod
+    def _config_entry(name: str, path: str) -> AppEntry:
+        resolved = resolve_path(path)
+        argv = [resolved] if os.path.exists(resolved) else resolved.split()
+        return AppEntry(name, resolved, argv, "config")
+
+    @classmethod
+    def _can_launch(cls, entry: AppEntry) -> bool:
+        """Discovered entries always; config entries only if the target exists here (APPS is often
+        written for another machine, e.g. Windows paths on a Linux box)."""
+        if entry.source != "config":
+            return True
+        if os.path.exists(entry.target) or (entry.argv and shutil.which(entry.argv[0])):
+            return True
+        return sys.platform.startswith("win") and bool(cls.URI_RE.match(entry.target))
+
+    def refresh(self, rescan: bool = True):
+        """Rebuild from config APPS and discovery; rescan=False reuses the on-disk cache when valid."""
+        entries = {}
+        if self.config.get("APP_DISCOVERY", True) and sys.platform.startswith("linux"):
+            dirs = self._scan_dirs()
+            rows = None if rescan else self._load_discovered(dirs)
+            if rows is None:
+                rows = self._discover(dirs)
+                self._save_discovered(dirs, rows)
+            for alias, target, argv, source in rows:
+                old = entries.get(alias)
+                if old is None or self.SOURCE_RANK[source] > self.SOURCE_RANK[old.source]:
+                    entries[alias] = AppEntry(alias, target, argv, source)
+        for name, path in self.config.get("APPS", {}).items():
+            entry = self._config_entry(name, path)
+            # a configured path that doesn't exist here must not hide the discovered app
+            if name.lower() not in entries or self._can_launch(entry):
+                entries[name.lower()] = entry
+        launchable = {alias for alias, e in entries.items() if self._can_launch(e)}
+        trie = {}
+        for alias in entries:
+            node = trie
+            for tok in tokenize(alias):
+                node = node.setdefault(tok, {})
+            node[None] = alias
+        with self._lock:
+            self.entries = entries
+            self._trie = trie
+            self._launchable = launchable
+            self._fuzzy = None  # FuzzyIndex pair over the names, built on the first misheard name
+
+    @property
+    def fuzzy(self) -> "FuzzyIndex":
+        """Fuzzy index over launchable configured and .desktop apps."""
+        return self._fuzzy_indexes()[0]
+
+    def _fuzzy_indexes(self):
+        # bare PATH executables are many and short (sprof, tabs, choom), so a loose score would
+        # turn any misheard name into one of them; they get their own, much stricter, index
+        with self._lock:
+            if self._fuzzy is None:
+                usable = [(a, e) for a, e in self.entries.items() if a in self._launchable]
+                named = [a for a, e in usable if e.source != "path"]
+                on_path = [a for a, e in usable if e.source == "path"]
+                self._fuzzy = (FuzzyIndex(named, cutoff=self.config.get("FUZZY_CUTOFF", 60)),
+                               FuzzyIndex(on_path, cutoff=self.config.get("FUZZY_PATH_CUTOFF", 90)))
+            return self._fuzzy
+
+    def __len__(self):
+        return len(self.entries)
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def names_whole(self, entry: AppEntry, command: str) -> bool:
+        """True if the target of command, filler words aside, is exactly entry's name."""
+        tokens = tokenize(self.VERB_RE.sub("", command.lower()))
+        return [t for t in tokens if t not in self.FILLER_WORDS] == tokenize(entry.name.lower())
+
+    def launchable(self, entry: AppEntry) -> bool:
+        return entry.name.lower() in self._launchable if entry.source == "config" else True
+
+    def find(self, command: str) -> Optional[AppEntry]:
+        """
+        The app named in command: launchable apps first, then configured ones, then the longest
+        name, then the earliest. A bare PATH executable only counts when it is the whole target
+        ("open firefox"), never one word of it ("open the file manager" is not /usr/bin/file).
+        """
+        tokens = tokenize(self.VERB_RE.sub("", command.lower()))
+        target = [t for t in tokens if t not in self.FILLER_WORDS]
+        trie, entries, launchable = self._trie, self.entries, self._launchable
+        best, best_key = None, None
+        for i in range(len(tokens)):
+            node = trie
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                alias = node.get(None)
+                if alias is None:
+                    continue
+                source = entries[alias].source
+                if source == "path" and tokens[i:j + 1] != target:
+                    continue
+                key = (alias in launchable, self.SOURCE_RANK[source], j - i, -i)
+                if best_key is None or key > best_key:
+                    best, best_key = entries[alias], key
+        return best
+
+    def closest(self, command: str) -> Optional[AppEntry]:
+        """Fuzzy fallback for misheard names; PATH executables only on a near-exact match."""
+        query = self.VERB_RE.sub("", command.lower())
+        named, on_path = self._fuzzy_indexes()
+        hit = named.best(query) or on_path.best(query)
+        return self.entries[hit[0]] if hit else None
+
+
+def launch_app(entry: AppEntry):
+    if sys.platform.startswith("win"):
+        os.startfile(entry.target)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", entry.target])
+    else:
+        subprocess.Popen(entry.argv)
+
+
+# ---------------- PROCESSES ----------------
+class ProcInfo(NamedTuple):
+    pid: int
+    name: str  # kernel comm (truncated to 15 chars)
+    exe: str
+    cmdline: list
+    start: int  # start time in clock ticks since boot; (pid, start) is unique
+
+
+class ProcessTable:
+    """
+    Running processes read straight from /proc, cached for PROCESS_TABLE_TTL seconds. A refresh
+    re-reads only /proc/<pid>/stat; cmdline and exe are kept for processes already seen with the
+    same start time. Matching is on executable names, never on substrings of the command line.
+    """
+
+    PROC = "/proc"
+
+    def __init__(self, config_ref):
+        self.config = config_ref
+        self._procs = {}  # pid -> ProcInfo
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return os.path.isdir(os.path.join(self.PROC, "self"))
+
+    def _read_stat(self, pid: str):
+        with open(os.path.join(self.PROC, pid, "stat"), "rb") as f:
+            raw = f.read().decode("utf-8", "replace")
+        # comm may itself contain spaces and parentheses: it ends at the last ')'
+        lpar, rpar = raw.index("("), raw.rindex(")")
+        fields = raw[rpar + 2:].split()
+        return raw[lpar + 1:rpar], int(fields[19])
+
+    def _read_details(self, pid: str):
+        base = os.path.join(self.PROC, pid)
+        try:
+            with open(os.path.join(base, "cmdline"), "rb") as f:
+                cmdline = [a.decode("utf-8", "replace") for a in f.read().split(b"\0") if a]
+        except OSError:
+            cmdline = []
+        try:
+            exe = os.readlink(os.path.join(base, "exe"))
+        except OSError:
+            exe = ""
+        return exe, cmdline
+
+    def refresh(self) -> dict:
+        procs = {}
+        old = self._procs
+        with os.scandir(self.PROC) as it:
+            for d in it:
+                if not d.name.isdigit():
+                    continue
+                pid = int(d.name)
+                try:
+                    name, start = self._read_stat(d.name)
+                    prev = old.get(pid)
+                    if prev is not None and prev.start == start:
+                        procs[pid] = prev._replace(name=name)
+                        continue
+                    exe, cmdline = self._read_details(d.name)
+                except (OSError, ValueError, IndexError):
+                    continue  # exited mid-scan
+                procs[pid] = ProcInfo(pid, name, exe, cmdline, start)
+        with self._lock:
+            self._procs = procs
+            self._scanned_at = time.monotonic()
+        return procs
+
+    def snapshot(self, max_age: float = None) -> dict:
+        max_age = self.config.get("PROCESS_TABLE_TTL", 2.0) if max_age is None else max_age
+        if time.monotonic() - self._scanned_at > max_age:
+            return self.refresh()
+        return self._procs
+
+    @staticmethod
+    def _stem(path: str) -> str:
+        base = os.path.basename(path).lower()
+        return base[:-4] if base.endswith(".exe") else base
+
+    @classmethod
+    def proc_names(cls, proc: ProcInfo) -> set:
+        names = {proc.name.lower()}
+        if proc.exe:
+            names.add(cls._stem(proc.exe.replace(" (deleted)", "")))
+        if proc.cmdline:
+            names.add(cls._stem(proc.cmdline[0].split()[0] if proc.cmdline[0] else ""))
+        names.discard("")
+        return names
+
+    def find(self, names, max_age: float = None) -> List[ProcInfo]:
+        """Processes whose comm, exe or argv[0] basename equals one of names (comm matched as a 15-char prefix)."""
+        wanted = {self._stem(n) for n in names if n}
+        me = os.getpid()
+        hits = []
+        for proc in self.snapshot(max_age).values():
+            if proc.pid == me:
+                continue
+            have = self.proc_names(proc)
+            comm = proc.name.lower()
+            if have & wanted or (len(comm) == 15 and any(w.startswith(comm) for w in wanted)):
+                hits.append(proc)
+        return hits
+
+    def terminate(self, procs: List[ProcInfo], sig=signal.SIGTERM) -> List[ProcInfo]:
+        """Signal procs; returns those signalled. Skips PIDs since reused by another process."""
+        closed = []
+        for proc in procs:
+            try:
+                if self._read_stat(str(proc.pid))[1] != proc.start:
+                    continue
+                os.kill(proc.pid, sig)
+                closed.append(proc)
+            except (OSError, ValueError):
+                continue
+        with self._lock:
+            self._procs = {pid: p for pid, p in self._procs.items() if p not in closed}
+        return closed
+
+
+# ---------------- WEATHER ----------------
+class WeatherError(Exception):
+    """Weather provider answered with an error (unknown city, bad key, ...)."""
+
+
+class WeatherClient:
+    """
+    OpenWeather current-weather client over one keep-alive requests.Session, with a TTL cache
+    keyed by normalized city name. The key comes from config OPENWEATHER_API_KEY (or the
+    OPENWEATHER_API_KEY environment variable); OPENWEATHER_URL can point at a local stand-in.
+    """
+
+    def __init__(self, config_ref):
+        self.config = config_ref
+        self._session = None
+        self._cache = {}  # normalized city -> (expires_at, report)
+        self._lock = threading.Lock()
+        self.requests_made = 0
+
+    @property
+    def api_key(self) -> Optional[str]:
+        key = self.config.get("OPENWEATHER_API_KEY") or ""
+        if not key or key.startswith("PUT_YOUR"):
+            key = os.environ.get("OPENWEATHER_API_KEY", "")
+        return key or None
+
+    @staticmethod
+    def normalize_city(city: str) -> str:
+        return " ".join(city.lower().split()).strip(" .,?!")
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                pool = max(1, self.config.get("WEATHER_WORKERS", 4))
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def current(self, city: str) -> dict:
+        """{'city', 'description', 'temp'} for city; raises WeatherError on provider errors."""
+        key = self.normalize_city(city)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit and hit[0] > now:
+                return hit[1]
+        url = self.config.get("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+        resp = self._get_session().get(url, params={"q": key, "appid": self.api_key, "units": "metric"}, timeout=8)
+        self.requests_made += 1
+        data = resp.json()
+        if resp.status_code != 200:
+            raise WeatherError(data.get('message', 'unknown'))
+        report = {"city": data.get("name") or city, "description": data['weather'][0]['description'],
+                  "temp": data['main']['temp']}
+        with self._lock:
+            self._cache[key] = (now + self.config.get("WEATHER_CACHE_TTL", 600), report)
+        return report
+
+    def current_many(self, cities: List[str]) -> list:
+        """[(city, report or exception)] in input order, fetched on up to WEATHER_WORKERS threads."""
+        if len(cities) <= 1:
+            out = []
+            for city in cities:
+                try:
+                    out.append((city, self.current(city)))
+                except Exception as e:
+                    out.append((city, e))
+            return out
+        workers = max(1, min(len(cities), self.config.get("WEATHER_WORKERS", 4)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jarvis-weather") as pool:
+            futures = [pool.submit(self.current, city) for city in cities]
+            out = []
+            for city, fut in zip(cities, futures):
+                try:
+                    out.append((city, fut.result()))
+                except Exception as e:
+                    out.append((city, e))
+            return out
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+# ---------------- TRANSLATION CACHE ----------------
+class TranslationCache:
+    """
+    Memoizes translations and language detections. Bounded in-memory LRU with optional TTL,
+    persisted as an append-only JSON-lines file that is compacted when it grows past twice
+    the in-memory capacity.
+    """
+
+    def __init__(self, path: Optional[str], max_entries: int = 2000, ttl: Optional[float] = None):
+        self.path = Path(path) if path else None
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._data = collections.OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+        self._file_lines = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    @classmethod
+    def translation_key(cls, text: str, dest: str) -> str:
+        return f"t|{dest}|{cls.normalize(text)}"
+
+    @classmethod
+    def detection_key(cls, text: str) -> str:
+        return f"d|{cls.normalize(text)}"
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    self._file_lines += 1
+                    try:
+                        rec = json.loads(line)
+                        self._store(rec["k"], rec["v"], rec["t"])
+                    except Exception:
+                        continue
+        except Exception as e:
+            print("translation cache load error", e)
+
+    def _store(self, key: str, value: str, stored_at: float):
+        self._data[key] = (value, stored_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[1] > self.ttl:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+            if not self.path:
+                return
+            try:
+                if self._file_lines >= 2 * self.max_entries:
+                    self._compact()
+                else:
+                    with self.path.open("a", encoding="utf-8") as f:
+                        f.write(json.dumps({"k": key, "v": value, "t": now}, ensure_ascii=False) + "\n")
+                    self._file_lines += 1
+            except Exception as e:
+                print("translation cache write error", e)
+
+    def _compact(self):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for key, (value, stored_at) in self._data.items():
+                f.write(json.dumps({"k": key, "v": value, "t": stored_at}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+        self._file_lines = len(self._data)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+
+# ---------------- ACTIVITY LOG ----------------
+class ActivityLog:
+    """
+    Ring buffer behind the activity log panel. append() is cheap and thread-safe; the GUI drains
+    the lines added since its last render in one batch. Lines pushed out of the buffer (and the
+    rest on close) are spilled to a rotating file when LOG_FILE is set.
+    """
+
+    def __init__(self, max_lines: int = 2000, path: Optional[str] = None, max_bytes: int = 1_000_000,
+                 backups: int = 3):
+        self.max_lines = max(1, int(max_lines))
+        self._lines = collections.deque()
+        self._pending = collections.deque(maxlen=self.max_lines)
+        self._lock = threading.Lock()
+        self.total = 0
+        self._spill = None
+        if path:
+            try:
+                self._spill = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                                   encoding="utf-8", delay=True)
+                self._spill.setFormatter(logging.Formatter("%(message)s"))
+            except Exception as e:
+                print("activity log file error", e)
+
+    def _write_spill(self, line: str):
+        try:
+            self._spill.emit(logging.makeLogRecord({"msg": line}))
+        except Exception:
+            pass
+
+    def append(self, text: str) -> str:
+        line = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {text}"
+        with self._lock:
+            self._lines.append(line)
+            self._pending.append(line)
+            self.total += 1
+            if len(self._lines) > self.max_lines:
+                old = self._lines.popleft()
+                if self._spill:
+                    self._write_spill(old)
+        return line
+
+    def drain(self) -> List[str]:
+        """Lines appended since the last drain (at most max_lines)."""
+        with self._lock:
+            out = list(self._pending)
+            self._pending.clear()
+        return out
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            return list(self._lines)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def close(self):
+        if not self._spill:
+            return
+        with self._lock:
+            for line in self._lines:
+                self._write_spill(line)
+            self._lines.clear()
+            self._spill.close()
+            self._spill = None
+
+
+class JarvisCore:
+    # optional engines, built on first use (or by warm_up) so startup doesn't import their libraries
+    recognizer = LazyAttribute(lambda self: sr.Recognizer() if sr else None)
+    translator = LazyAttribute(lambda self: googletrans.Translator() if googletrans else None)
+    backend = LazyAttribute(lambda self: make_recognizer_backend(self.config, self.recognizer))
+
+    def __init__(self, config: dict, out_queue: queue.Queue):
+        self.config = config
+        self.out_queue = out_queue
+        self.username = config.get("USER_NAME", "User")
+        self.notes_file = Path(config.get("NOTES_FILE", "jarvis_notes_gui.txt"))
+        self.notes = NotesStore(self.notes_file)
+        self.wake_words = config.get("WAKE_WORDS", [])
+        self.metrics = Metrics.from_config(config)
+        self.tts = TTS(config, self.metrics)
+        self.listening = False
+        self._stop_listening_flag = threading.Event()
+        self.lang_id = LanguageIdentifier()
+        self.weather = WeatherClient(config)
+        self.apps = AppIndex(config)
+        self.processes = ProcessTable(config)
+        self.translation_cache = TranslationCache(config.get("TRANSLATION_CACHE_FILE"),
+                                                  config.get("TRANSLATION_CACHE_SIZE", 2000),
+                                                  config.get("TRANSLATION_CACHE_TTL"))
+        self.last_detected_lang = "en"  # short code like 'en', 'hi', 'pa'
+        self.router = IntentRouter(INTENTS)
+        self.wake_spotter = WakeWordSpotter(config) if config.get("WAKE_SPOTTER", True) else None
+        self.audio_stream = None  # AudioStream shared by every listen, opened on first use
+        self._audio_stream_failed = False
+        self._audio_stream_opened = False
+        self._audio_retry_at = 0.0  # monotonic time before which the device is not touched again
+        self._audio_backoff = 0.0
+        self._audio_lock = threading.Lock()
+        self._recognition_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, config.get("RECOGNITION_WORKERS", 3)), thread_name_prefix="jarvis-asr")
+
+    def warm_up(self):
+        """Load the WARM_UP engines and libraries on a background thread so first use is fast."""
+        def run():
+            for name in self.config.get("WARM_UP", []):
+                with self.metrics.span(f"warm_up.{name}"):
+                    try:
+                        if name == "tts":
+                            self.tts.warm_up()
+                        elif name == "recognizer":
+                            if self.config.get("MICROPHONE", True):
+                                _ = self.backend
+                        elif name == "translator":
+                            _ = self.translator
+                        elif name in OPTIONAL_DEPS:
+                            OPTIONAL_DEPS[name].load()
+                    except Exception as e:
+                        print("warm-up error", name, e)
+        threading.Thread(target=run, name="jarvis-warmup", daemon=True).start()
+
+    def for_session(self, out_queue, notes_file: Optional[str] = None) -> "JarvisCore":
+        """
+        A view of this core for one user: engines, caches and indexes are shared, while settings
+        changed by commands (a ChainMap over config), the detected language and notes are private.
+        The lazy engines (recognizer, translator, backend) are built once, by this core, whichever
+        view needs them first. notes_file=None keeps this core's notes.
+        """
+        view = copy.copy(self)
+        view._lazy_source = self.__dict__.get("_lazy_source", self)
+        view.config = collections.ChainMap({}, self.config)
+        view.out_queue = out_queue
+        view.last_detected_lang = "en"
+        if notes_file is not None:
+            view.notes_file = Path(notes_file)
+            view.notes = NotesStore(view.notes_file)
+        return view
+
+    def _put(self, typ: str, payload):
+        try:
+            self.out_queue.put((typ, payload))
+        except Exception:
+            pass
+
+    def speak(self, text: str, lang: Optional[str] = None, status: bool = False):
+        # if auto-reply enabled, prefer last_detected_lang
+        if self.config.get("AUTO_LANGUAGE_REPLY", False):
+            lang_to_use = self.last_detected_lang or lang or self.config.get("RESPONSE_LANGUAGE", "en")
+        else:
+            # use explicit RESPONSE_LANGUAGE unless set to 'auto'
+            resp = self.config.get("RESPONSE_LANGUAGE", "en")
+            if resp == "auto":
+                lang_to_use = self.last_detected_lang or lang or "en"
+            else:
+                lang_to_use = lang or resp
+        # normalize to short codes
+        if isinstance(lang_to_use, str) and "-" in lang_to_use:
+            lang_to_use = lang_to_use.split("-")[0]
+        # finally speak
+        self.tts.speak(text, lang=lang_to_use, status=status)
+        self._put("status", f"Spoke: {text}")
+
+    def _get_audio_stream(self) -> Optional["AudioStream"]:
+        """The shared microphone stream, opened on first use; None if it can't be opened (yet)."""
+        with self._audio_lock:
+            stream = self.audio_stream
+            if stream is not None and not stream.alive:
+                # the capture thread died (e.g. the device went away): drop it and reopen after a pause
+                stream.close()
+                self.audio_stream = None
+                self._mic_failed(stream.error or "stream ended")
+            if (self.audio_stream is None and not self._audio_stream_failed
+                    and time.monotonic() >= self._audio_retry_at):
+                try:
+                    with self.metrics.span("mic.open"):  # includes the one-off calibration
+                        stream = AudioStream(sr.Microphone, pause_threshold=self.recognizer.pause_threshold)
+                        stream.start()
+                    self.audio_stream = stream
+                    self._audio_stream_opened = True
+                except Exception as e:
+                    if self._audio_stream_opened:
+                        self._mic_failed(e)  # it worked before: the device is gone for now
+                    else:
+                        print("persistent microphone unavailable", e)
+                        self._audio_stream_failed = True
+            return self.audio_stream
+
+    def _mic_failed(self, error):
+        """Back off (1 s doubling to 30 s) before touching the device again; reported once per outage."""
+        if not self._audio_backoff:
+            self._put("status", f"Microphone unavailable ({error}); retrying")
+        self._audio_backoff = min(30.0, max(1.0, self._audio_backoff * 2))
+        self._audio_retry_at = time.monotonic() + self._audio_backoff
+
+    def _capture_audio(self, timeout: Optional[int], phrase_time_limit: Optional[int]):
+        stream = self._get_audio_stream() if self.config.get("PERSISTENT_MIC", True) else None
+        backoff = self._audio_retry_at - time.monotonic()
+        if stream is None and backoff > 0:
+            # the device failed recently: wait like a quiet microphone instead of spinning on errors
+            self._stop_listening_flag.wait(min(backoff, timeout) if timeout else backoff)
+            raise sr.WaitTimeoutError("microphone unavailable")
+        if stream is not None:
+            stop = self._stop_listening_flag if self.listening else None
+            with self.metrics.span("mic.listen"):
+                audio = stream.listen(timeout=timeout, phrase_time_limit=phrase_time_limit, stop_event=stop)
+            self._audio_backoff = 0.0
+            return audio
+        # fallback: open the device and calibrate for this utterance only
+        try:
+            with contextlib.ExitStack() as stack:
+                with self.metrics.span("mic.open"):
+                    source = stack.enter_context(sr.Microphone())
+                with self.metrics.span("mic.calibrate"):
+                    try:
+                        self.recognizer.adjust_for_ambient_noise(source, duration=0.4)
+                    except Exception:
+                        pass
+                with self.metrics.span("mic.listen"):
+                    audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            raise
+        except Exception as e:
+            self._mic_failed(e)
+            raise
+        self._audio_backoff = 0.0
+        return audio
+
+    def listen_once(self, timeout: Optional[int] = None, phrase_time_limit: Optional[int] = None,
+                    wake_gate: bool = False) -> Optional[str]:
+        """
+        Listen once and try to recognize speech. We attempt multiple languages (config LANGUAGES).
+        After recognition, detect language (if translator available) and set last_detected_lang.
+        wake_gate=True runs the local wake-word spotter first and skips recognition if it rejects.
+        """
+        if not self.config.get("MICROPHONE", True):
+            return None
+        if not self.recognizer:
+            self._put("status", "SpeechRecognition not available")
+            return None
+        try:
+            self._put("status", "Listening...")
+            audio = self._capture_audio(timeout, phrase_time_limit)
+            if wake_gate and self.wake_spotter is not None:
+                with self.metrics.span("wake_gate"):
+                    stream = self.audio_stream
+                    threshold = stream.energy_threshold if stream is not None else getattr(
+                        self.recognizer, "energy_threshold", None)
+                    probable = self.wake_spotter.probable(audio, threshold)
+                if not probable:
+                    return None
+            self._put("status", "Recognizing...")
+            # try multiple languages
+            with self.metrics.span("asr"):
+                detected_text = self.recognize_audio(audio)
+
+            if not detected_text:
+                self._put("status", "Could not understand audio")
+                return None
+
+            # detected_text now holds string. detect its language
+            with self.metrics.span("detect_language"):
+                detected_lang_short = self.detect_language(detected_text)
+
+            # update last detected
+            self.last_detected_lang = detected_lang_short
+            self._put("last_command", detected_text)
+            return detected_text.lower()
+        except sr.WaitTimeoutError:
+            self._put("status", "Listen timeout")
+            return None
+        except sr.UnknownValueError:
+            self._put("status", "Could not understand audio")
+            return None
+        except sr.RequestError as e:
+            self._put("status", f"Speech service error: {e}")
+            return None
+        except Exception as e:
+            self._put("status", f"Unexpected listening error: {e}")
+            return None
+
+    def _recognize_one(self, audio, lang: str):
+        """Recognize audio in one language. Returns (text, confidence); text is None on failure."""
+        if self.backend is None:
+            return None, 0.0
+        with self.metrics.span(f"asr.{lang}"):
+            return self.backend.recognize(audio, lang)
+
+    def recognize_audio(self, audio) -> Optional[str]:
+        """
+        Run recognition over config LANGUAGES. RECOGNITION_MODE picks the strategy:
+        'serial' tries languages in order, 'first_success' fans out concurrently and takes the
+        first non-empty result, 'best_confidence' fans out and keeps the most confident one.
+        """
+        languages = self.config.get("LANGUAGES", ["en-IN"])
+        mode = self.config.get("RECOGNITION_MODE", "serial")
+        if mode == "serial" or len(languages) < 2:
+            for lang in languages:
+                try:
+                    text, _conf = self._recognize_one(audio, lang)
+                except Exception:
+                    continue
+                if text:
+                    return text
+            return None
+
+        futures = {self._recognition_pool.submit(self._recognize_one, audio, lang): i
+                   for i, lang in enumerate(languages)}
+        best = None
+        best_key = None
+        try:
+            for fut in concurrent.futures.as_completed(futures, timeout=self.config.get("RECOGNITION_TIMEOUT", 10)):
+                try:
+                    text, conf = fut.result()
+                except Exception:
+                    continue
+                if not text:
+                    continue
+                if mode == "first_success":
+                    best = text
+                    break
+                # ties go to the language listed first
+                key = (conf, -futures[fut])
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best = text
+        except concurrent.futures.TimeoutError:
+            pass
+        # stragglers that haven't started are dropped; running ones finish and are ignored
+        for fut in futures:
+            fut.cancel()
+        return best
+
+    def detect_language(self, text: str) -> str:
+        """
+        Short language code of text. LANGUAGE_DETECTOR 'local' uses the offline identifier;
+        'googletrans' asks the translator (cached) and falls back to the local identifier.
+        """
+        if self.config.get("LANGUAGE_DETECTOR", "local") == "googletrans" and self.translator:
+            key = TranslationCache.detection_key(text)
+            cached = self.translation_cache.get(key)
+            if cached is not None:
+                return cached
+            try:
+                with self.metrics.span("translator.detect"):
+                    det = self.translator.detect(text)
+                # map to short code (googletrans returns 'en', 'hi', 'pa')
+                lang = det.lang.split('-')[0]
+                self.translation_cache.put(key, lang)
+                return lang
+            except Exception:
+                pass
+        return self.lang_id.identify(text)[0]
+
+    def is_wake_word(self, text: str) -> bool:
+        if not text:
+            return False
+        for w in self.wake_words:
+            if w in text:
+                return True
+        return False
+
+    # fuzzy name matcher
+    def fuzzy_match(self, command: str, choices):
+        """Closest key of choices (a dict, iterable or prebuilt FuzzyIndex) to command, or None."""
+        if not choices:
+            return None
+        index = choices if isinstance(choices, FuzzyIndex) else FuzzyIndex(choices, self.config.get("FUZZY_CUTOFF", 60))
+        hit = index.best(command)
+        return hit[0] if hit else None
+
+    # Open application by config name, discovered app or command
+    def handle_open_app(self, command: str):
+        entry = self.apps.find(command)
+        if entry and not self.apps.launchable(entry):
+            # configured for another machine; a discovered app of a similar name may still be here
+            entry = self.apps.closest(command) or entry
+        if entry:
+            try:
+                launch_app(entry)
+                self.speak(f"Opening {entry.name}", status=True)
+            except Exception as e:
+                print("open app error", e)
+                self.speak(f"Couldn't open {entry.name}")
+            return
+        # fallback: youtube or web
+        if "youtube" in command:
+            webbrowser.open("https://www.youtube.com")
+            self.speak("Opening YouTube", status=True)
+            return
+        entry = self.apps.closest(command)
+        if entry:
+            try:
+                launch_app(entry)
+                self.speak(f"Opening {entry.name}", status=True)
+                return
+            except Exception as e:
+                print("fuzzy open error", e)
+        self.speak("I could not find that application. Please add it to APPS in config.")
+
+    def handle_refresh_apps(self, _command: str = None):
+        self.apps.refresh()
+        self.speak(f"App list refreshed. I know {len(self.apps)} apps.")
+
+    # Close application by name (best-effort) - cross-platform
+    CLOSE_VERBS = {"close", "kill", "stop", "exit", "quit"}
+
+    def handle_close_app(self, command: str, target: Optional[str] = None):
+        if target is None:
+            # called without the router's slot: drop the verbs, as whole words ("desktop" stays)
+            target = " ".join(w for w in command.split() if w.lower() not in self.CLOSE_VERBS)
+        if not target:
+            self.speak("Which application should I close?")
+            resp = self.listen_once(timeout=5, phrase_time_limit=4)
+            if not resp:
+                return
+            target = resp
+        # only an app named by the whole target is closed straight away; an app named by part of it
+        # ("close my python script") or a fuzzy guess for a misheard name is confirmed first
+        entry = self.apps.find(target)
+        if entry is not None and not self.apps.names_whole(entry, target):
+            guess, entry = entry, None
+        else:
+            guess = None if entry else self.apps.closest(target)
+        if guess is not None:
+            self.speak(f"Did you mean {guess.name}? Should I close it?")
+            resp = self.listen_once(timeout=5, phrase_time_limit=4)
+            if not (resp and ('yes' in resp or 'yeah' in resp or 'haan' in resp)):
+                self.speak('Okay, leaving it open.', status=True)
+                return
+            entry = guess
+        if self.processes.available:
+            self._close_running(target, entry)
+            return
+        if entry:
+            name, proc_name = entry.name, os.path.basename(entry.target)
+            try:
+                if sys.platform.startswith('win'):
+                    subprocess.run(["taskkill", "/f", "/im", proc_name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                else:
+                    proc_name = os.path.basename(entry.argv[0] if entry.argv else entry.target)
+                    subprocess.run(["pkill", "-x", proc_name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                self.speak(f"Attempted to close {name}", status=True)
+                return
+            except Exception as e:
+                print("close error", e)
+                self.speak("Failed to close application")
+                return
+        # generic close attempts
+        try:
+            if sys.platform.startswith('win'):
+                subprocess.run(["taskkill", "/f", "/im", f"{target}.exe"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                subprocess.run(["pkill", "-x", target], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.speak(f"Attempted to close {target}", status=True)
+        except Exception as e:
+            print("close generic error", e)
+            self.speak("Failed to close app")
+
+    def _close_running(self, target: str, entry: Optional[AppEntry]):
+        """Close through the /proc process table: exact executable-name matches only."""
+        if entry:
+            label = entry.name
+            names = {entry.name, entry.target, entry.argv[0] if entry.argv else ""}
+        else:
+            label = target
+            names = {target, target.replace(" ", "")}
+        procs = self.processes.find(names)
+        if not procs:
+            procs = self.processes.find(names, max_age=0)  # maybe started after the cached scan
+        if not procs:
+            self.speak(f"{label} doesn't seem to be running")
+            return
+        closed = self.processes.terminate(procs)
+        if not closed:
+            self.speak(f"Couldn't close {label}")
+            return
+        detail = ", ".join(f"{p.name} ({p.pid})" for p in closed[:5])
+        if len(closed) > 5:
+            detail += f" and {len(closed) - 5} more"
+        self._put('status', f"Closed {detail}")
+        self.speak(f"Closed {label}" + (f", {len(closed)} processes" if len(closed) > 1 else ""), status=True)
+
+    # Inside-app tasks using pyautogui
+    INSIDE_KEYS = {"enter": (("enter",), "Pressed enter"), "esc": (("esc",), "Pressed escape"),
+                   "new_tab": (("ctrl", "t"), "Opened new tab"), "close_tab": (("ctrl", "w"), "Closed tab"),
+                   "copy": (("ctrl", "c"), "Copied"), "paste": (("ctrl", "v"), "Pasted")}
+
+    def handle_inside_task(self, command: str, action: Optional[str] = None, text: str = ""):
+        if not pyautogui:
+            self.speak("pyautogui not installed. Install it to use inside-app tasks.")
+            return
+        if action == "type":
+            pyautogui.typewrite(text, interval=0.05)
+            self.speak("Typed the text", status=True)
+        elif action in self.INSIDE_KEYS:
+            keys, done = self.INSIDE_KEYS[action]
+            pyautogui.hotkey(*keys)
+            self.speak(done, status=True)
+        else:
+            self.speak("Task not recognized for inside-app automation.")
+
+    def handle_search(self, command: str, query: Optional[str] = None):
+        # the router passes the words after "search"/"google"; the web-search fallback, the whole command
+        query = (command if query is None else query).strip()
+        if not query:
+            self.speak("What should I search for?")
+            q = self.listen_once(timeout=5, phrase_time_limit=8)
+            if not q:
+                self.speak("No query received.")
+                return
+            query = q
+        url = f"https://www.google.com/search?q={requests.utils.requote_uri(query) if requests else query}"
+        webbrowser.open(url)
+        self.speak(f"Here are the results for {query}")
+
+    def handle_play_youtube(self, command: str):
+        query = command
+        for trigger in ["play on youtube", "play youtube", "play"]:
+            if trigger in command:
+                query = command.split(trigger, 1)[-1].strip()
+                break
+        if not query:
+            self.speak("What should I play on YouTube?")
+            q = self.listen_once(timeout=6, phrase_time_limit=8)
+            if not q:
+                self.speak("No query provided.")
+                return
+            query = q
+        self.speak(f"Playing {query} on YouTube")
+        if pywhatkit:
+            try:
+                pywhatkit.playonyt(query)
+            except Exception:
+                webbrowser.open(f"https://www.youtube.com/results?search_query={query}")
+        else:
+            webbrowser.open(f"https://www.youtube.com/results?search_query={query}")
+
+    WEATHER_TIME_RE = re.compile(
+        r"\b(?:(?:at|by|around)\s+)?\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.|o'?clock)(?!\w)"
+        r"|\b(?:at|by|around)\s+\d{1,2}(?::\d{2})?\b|\b(?:at\s+)?(?:noon|midnight)\b"
+        r"|\b(?:right\s+)?now\b|\b(?:today|tonight|tomorrow)\b|\bnext\s+week\b"
+        r"|\bthis\s+(?:morning|afternoon|evening|week|weekend)\b"
+        r"|\b(?:on\s+)?(?:mon|tues|wednes|thurs|fri|satur|sun)day\b")
+    WEATHER_PREP_RE = re.compile(r"\b(?:in|for|at)\s+")
+    LIST_SEP_RE = re.compile(r"\s*(?:,|&|\band\b)\s*")
+
+    @classmethod
+    def parse_weather_cities(cls, command: str) -> List[str]:
+        """
+        Cities in 'weather in delhi, mumbai and amritsar' (else the last word). Time words are
+        dropped first, then the list is read back from the last in/for/at, so 'forecast for
+        tomorrow in delhi' and 'weather at 5 pm in delhi' both give ['delhi'].
+        """
+        text = cls.WEATHER_TIME_RE.sub(" ", command.lower())
+        segments = cls.WEATHER_PREP_RE.split(text)
+        if len(segments) == 1:
+            words = text.split()
+            return words[-1:] if words and words[-1] not in ("weather", "forecast", "temperature") else []
+        # 'in new york and in london': earlier segments belong to the list while they end in a separator
+        group = [segments[-1]]
+        for seg in reversed(segments[1:-1]):
+            head = re.sub(r"\s*(?:,|&|\band)\s*$", "", seg)
+            if head == seg.rstrip():
+                break
+            group.insert(0, head)
+        cities = []
+        for p in cls.LIST_SEP_RE.split(" , ".join(group)):
+            p = WeatherClient.normalize_city(p)
+            if p and p not in cities:
+                cities.append(p)
+        return cities
+
+    def handle_weather(self, command: str):
+        if not requests:
+            self.speak("Requests not available. Can't fetch weather.")
+            return
+        cities = self.parse_weather_cities(command)
+        if not cities:
+            self.speak("Which city?")
+            city = self.listen_once(timeout=5, phrase_time_limit=5)
+            if not city:
+                self.speak("No city specified.")
+                return
+            cities = self.parse_weather_cities(f"in {city}")
+        if not self.weather.api_key:
+            self.speak('Weather API key not configured. Please update config.')
+            return
+        results = self.weather.current_many(cities)
+        if len(results) == 1:
+            city, report = results[0]
+            if isinstance(report, WeatherError):
+                self.speak(f"Couldn't fetch weather: {report}")
+            elif isinstance(report, Exception):
+                print('weather error', report)
+                self.speak('Failed to fetch weather right now.')
+            else:
+                self.speak(f"Weather in {city}: {report['description']}, {report['temp']} degree Celsius")
+            return
+        parts = []
+        failed = []
+        for city, report in results:
+            if isinstance(report, Exception):
+                failed.append(city)
+            else:
+                parts.append(f"{city}: {report['description']}, {report['temp']} degrees")
+        reply = "Weather in " + "; ".join(parts) + "." if parts else "Failed to fetch weather right now."
+        if parts and failed:
+            reply += f" Couldn't get {', '.join(failed)}."
+        self.speak(reply)
+
+    def _parse_note_date(self, command: str) -> Optional[datetime.date]:
+        today = datetime.date.today()
+        if "today" in command:
+            return today
+        if "yesterday" in command:
+            return today - datetime.timedelta(days=1)
+        m = re.search(r"(\d{4})-(\d{1,2})-(\d{1,2})", command)
+        if m:
+            try:
+                return datetime.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+            except ValueError:
+                return None
+        return None
+
+    def handle_notes(self, command: str, action: Optional[str] = None, text: str = ""):
+        if action is None:
+            self.speak('Write, read, or delete notes?')
+            resp = self.listen_once(timeout=5, phrase_time_limit=4)
+            if not resp:
+                self.speak('No response. Cancelling notes.')
+                return
+            if 'write' in resp or 'add' in resp:
+                action = 'write'
+            elif 'read' in resp or 'show' in resp:
+                action = 'read'
+            elif 'delete' in resp or 'clear' in resp:
+                action = 'delete_last' if 'last' in resp else 'clear'
+        if action == 'write':
+            # "take note buy milk" / "add a note: call mom" carry their text inline (typed / headless
+            # commands); "write a note" or "write notes" alone still ask for it
+            note = re.sub(r"^(?:that|saying)\s+", "", text.strip(" :,.-"))
+            if not note:
+                self.speak('What should I write?')
+                note = self.listen_once(timeout=8, phrase_time_limit=15)
+            if not note:
+                self.speak('No note content detected.')
+                return
+            self.notes.append(note)
+            self.speak('Note saved.', status=True)
+            self._put('notes_updated', None)
+        elif action == 'read':
+            # "read notes from today / yesterday / 2024-05-01" or the last ten
+            day = self._parse_note_date(command)
+            notes = self.notes.on_date(day) if day else self.notes.tail(10)
+            if not notes:
+                self.speak('No notes found.')
+                return
+            for n in notes:
+                self.speak(f"[{n.timestamp}] {n.text}" if n.timestamp else n.text)
+        elif action in ('delete_last', 'clear'):
+            if action == 'delete_last':
+                last = self.notes.tail(1)
+                if not last:
+                    self.speak('No notes found.')
+                    return
+                self.speak(f'Delete the note: {last[0].text}? Say yes to confirm.')
+            else:
+                last = None
+                self.speak('Are you sure you want to clear all notes? Say yes to confirm.')
+            conf = self.listen_once(timeout=5, phrase_time_limit=4)
+            if conf and 'yes' in conf:
+                if last:
+                    self.notes.delete(last[0].id)
+                    self.speak('Last note deleted.')
+                else:
+                    self.notes.clear()
+                    self.speak('All notes cleared.')
+                # existing lines changed: the GUI reloads instead of appending
+                self._put('notes_updated', 'reset')
+            else:
+                self.speak('Delete cancelled.')
+
+    def handle_note_search(self, command: str):
+        # "find note about milk" / "search notes for meeting"
+        query = re.sub(r"^.*?\b(?:find|search)\s+(?:my\s+)?notes?\b\s*(?:about|for|on|with|containing)?\s*",
+                       "", command).strip()
+        if not query:
+            self.speak('What should I look for in your notes?')
+            query = self.listen_once(timeout=5, phrase_time_limit=6)
+            if not query:
+                self.speak('No search words given.')
+                return
+        notes = self.notes.search(query, limit=3)
+        if not notes:
+            self.speak(f'No notes found about {query}.')
+            return
+        self.speak(f'Found {len(notes)} note{"s" if len(notes) > 1 else ""} about {query}.')
+        for n in notes:
+            self.speak(n.text)
+
+    def handle_time_date(self, _=None):
+        now = datetime.datetime.now()
+        self.speak(f"It is {now.strftime('%I:%M %p on %A, %B %d, %Y')}")
+
+    # Translation helpers
+    def translate_text(self, text: str, dest: str = "en") -> str:
+        if not text:
+            return ""
+        return self.translate_batch([text], dest)[0]
+
+    def _translate_group(self, texts: List[str], dest: str) -> List[str]:
+        """One translator request for a group of strings; originals come back on failure."""
+        if not self.translator:
+            # no translator available
+            return list(texts)
+        try:
+            res = self.translator.translate(list(texts), dest=dest)
+            translated = [r.text for r in res]
+        except Exception:
+            # fallback: return original
+            return list(texts)
+        for text, value in zip(texts, translated):
+            self.translation_cache.put(TranslationCache.translation_key(text, dest), value)
+        return translated
+
+    def translate_batch(self, texts: List[str], dest: str = "en", on_result=None) -> List[str]:
+        """
+        Translate many strings. Duplicates and cached entries are resolved locally; the rest are sent
+        in groups of TRANSLATION_BATCH_SIZE with up to TRANSLATION_WORKERS requests in flight.
+        on_result(index, translated) is called in input order as soon as each result is known.
+        """
+        dest_short = dest.split("-")[0] if "-" in dest else dest
+        keys = [TranslationCache.translation_key(t, dest_short) if t else None for t in texts]
+        known = {}  # key -> translation
+        pending = collections.OrderedDict()  # key -> text still to translate
+        for text, key in zip(texts, keys):
+            if key is None or key in known or key in pending:
+                continue
+            cached = self.translation_cache.get(key)
+            if cached is not None:
+                known[key] = cached
+            else:
+                pending[key] = text
+
+        results = [None] * len(texts)
+        emitted = 0
+
+        def flush():
+            nonlocal emitted
+            while emitted < len(texts):
+                key = keys[emitted]
+                if key is not None and key not in known:
+                    return
+                results[emitted] = known[key] if key is not None else ""
+                if on_result:
+                    on_result(emitted, results[emitted])
+                emitted += 1
+
+        flush()
+        items = list(pending.items())
+        size = max(1, self.config.get("TRANSLATION_BATCH_SIZE", 20))
+        groups = [items[i:i + size] for i in range(0, len(items), size)]
+        if groups:
+            workers = max(1, min(len(groups), self.config.get("TRANSLATION_WORKERS", 4)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jarvis-translate") as pool:
+                futures = [pool.submit(self._translate_group, [t for _, t in g], dest_short) for g in groups]
+                # collect in submission order so results stream out in input order
+                for fut, group in zip(futures, groups):
+                    for (key, _), value in zip(group, fut.result()):
+                        known[key] = value
+                    flush()
+        return results
+
+    def handle_language_switch(self, _command: str, lang: str = "en"):
+        self.config["RESPONSE_LANGUAGE"] = lang
+        self.config["AUTO_LANGUAGE_REPLY"] = False
+        if lang == "hi":
+            self.speak("अब मैं हिंदी में बात करूँगा।", lang="hi")
+        elif lang == "pa":
+            # Punjabi phrase - written in Gurmukhi
+            self.speak("ਹੁਣ ਮੈਂ ਪੰਜਾਬੀ ਵਿੱਚ ਗੱਲ ਕਰਾਂਗਾ।", lang="pa")
+        else:
+            self.speak("I will now speak in English.", lang="en")
+
+    def handle_auto_reply(self, _command: str = None):
+        self.config["AUTO_LANGUAGE_REPLY"] = not self.config.get("AUTO_LANGUAGE_REPLY", False)
+        state = "enabled" if self.config["AUTO_LANGUAGE_REPLY"] else "disabled"
+        self.speak(f"Auto language reply {state}.")
+
+    def handle_stop_listening(self, _command: str = None):
+        self.stop_wake_word()
+        self.speak("Wake-word listening stopped.")
+
+    def handle_exit(self, _command: str = None):
+        self.speak('Goodbye.')
+        self._put('exit', None)
+
+    # translate command: "translate to hi <text>" or "translate <text> to pa"
+    def handle_translate(self, command: str):
+        # naive parser
+        dest = "en"
+        text = ""
+        if " to " in command:
+            # eg "translate hello to hi" or "translate to hi hello"
+            parts = command.split(" to ")
+            if parts[0].strip() == "translate":
+                # form: translate to hi something OR translate to hi
+                after = parts[1].strip()
+                toks = after.split()
+                if len(toks) >= 2:
+                    dest = toks[0]
+                    text = " ".join(toks[1:])
+                elif toks:
+                    dest = toks[0]
+                    text = ""
+            else:
+                # form: translate some text to hi
+                dest = parts[-1].strip().split()[0] if parts[-1].strip() else "en"
+                text = " to ".join(parts[:-1]).replace("translate", "").strip()
+        else:
+            text = command.replace("translate", "").strip()
+        if not text:
+            self.speak("What text should I translate?")
+            q = self.listen_once(timeout=6, phrase_time_limit=10)
+            if not q:
+                self.speak("No text provided for translation.")
+                return
+            text = q
+        # normalize language codes
+        code_map = {"hindi": "hi", "hi": "hi", "english": "en", "en": "en", "punjabi": "pa", "pa": "pa", "panjabi": "pa"}
+        if dest.lower() in code_map:
+            dest_short = code_map[dest.lower()]
+        else:
+            dest_short = dest.split("-")[0] if "-" in dest else dest[:2]
+        translated = self.translate_text(text, dest_short)
+        self.speak(f"Translation: {translated}", lang=dest_short)
+
+    def process_command(self, command: str):
+        if not command:
+            return
+        with self.metrics.trace(), self.metrics.span("command"):
+            self._process_command(command)
+
+    def _process_command(self, command: str):
+        command = command.lower()
+        # strip wake words
+        for w in self.config.get('WAKE_WORDS', []):
+            if w in command:
+                command = command.replace(w, '').strip()
+
+        with self.metrics.span("route"):
+            match = self.router.match(command)
+            corrected = self.router.correct(command) if match is None else None
+        if corrected:
+            # misheard keyword? offer the corrected command instead of guessing
+            self.speak(f"Did you mean: {corrected}?")
+            resp = self.listen_once(timeout=5, phrase_time_limit=4)
+            if not (resp and ('yes' in resp or 'yeah' in resp or 'haan' in resp)):
+                self.speak('Okay. Waiting for commands.', status=True)
+                return
+            command, match = corrected, self.router.match(corrected)
+        if match is None:
+            # fallback quick search
+            self.speak("I didn't catch that. Should I search the web for it?")
+            resp = self.listen_once(timeout=5, phrase_time_limit=6)
+            if resp and ('yes' in resp or 'search' in resp):
+                self.handle_search(command)
+            else:
+                self.speak('Okay. Waiting for commands.', status=True)
+            return
+        with self.metrics.span(f"handler.{match.name}"):
+            getattr(self, match.handler)(command, **match.args)
+
+    # Wake-word loop
+    def run_wake_word_loop(self):
+        if not self.recognizer:
+            self._put('status', 'SpeechRecognition not installed; wake-word disabled')
+            return
+        self.listening = True
+        self._stop_listening_flag.clear()
+        if self.wake_spotter is not None and not self.wake_spotter.has_model:
+            # say so: without a model the local gate only drops noises, every phrase still goes to recognition
+            self._put('status', 'Wake-word mode active (no Vosk wake model: only noises are filtered locally)')
+        else:
+            self._put('status', 'Wake-word mode active')
+        while not self._stop_listening_flag.is_set():
+            # one trace per heard phrase: its listen, recognition and command spans
+            with self.metrics.trace():
+                text = self.listen_once(timeout=None, phrase_time_limit=6, wake_gate=True)
+                if not text:
+                    continue
+                if self.is_wake_word(text):
+                    # barge-in: a new command interrupts whatever is still being said
+                    self.tts.cancel()
+                    remainder = text
+                    for w in self.wake_words:
+                        remainder = remainder.replace(w, '')
+                    remainder = remainder.strip()
+                    if remainder:
+                        self.process_command(remainder)
+                    else:
+                        # ask and process
+                        self.speak('Yes? What can I do for you?')
+                        cmd = self.listen_once(timeout=6, phrase_time_limit=12)
+                        if cmd:
+                            self.process_command(cmd)
+        self._put('status', 'Wake-word mode stopped')
+        self.listening = False
+
+    def start_wake_word(self):
+        if self.listening:
+            return
+        self._stop_listening_flag.clear()
+        threading.Thread(target=self.run_wake_word_loop, daemon=True).start()
+
+    def stop_wake_word(self):
+        if not self.listening:
+            return
+        self._stop_listening_flag.set()
+
+    def shutdown(self):
+        self.stop_wake_word()
+        self.tts.shutdown()
+        self.metrics.close()
+        self.notes.flush()
+        self.weather.close()
+        if self.audio_stream is not None:
+            self.audio_stream.close()
+        self._recognition_pool.shutdown(wait=False)
+
+    def listen_and_process_once(self):
+        self.tts.cancel()
+        with self.metrics.trace():
+            text = self.listen_once(timeout=None, phrase_time_limit=12)
+            if text:
+                for w in self.config.get('WAKE_WORDS', []):
+                    text = text.replace(w, '')
+                text = text.strip()
+                self.process_command(text)
+
+
+# ---------------- UI DISPATCH ----------------
+class UIDispatcher(queue.Queue):
+    """
+    out_queue for the GUI. put() from any thread posts one virtual event to wake the Tk loop
+    (only when no wake-up is already pending), and call() runs a function on the Tk thread, so
+    worker threads never touch widgets directly. Without an attached widget it is a plain queue.
+    """
+
+    WAKE_EVENT = '<<JarvisWake>>'
+
+    def __init__(self):
+        super().__init__()
+        self._widget = None
+        self._wake_pending = False
+
+    def attach(self, widget):
+        self._widget = widget
+
+    def detach(self):
+        self._widget = None
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        widget = self._widget
+        if widget is not None and not self._wake_pending:
+            self._wake_pending = True
+            try:
+                widget.event_generate(self.WAKE_EVENT, when='tail')
+            except Exception:
+                self._wake_pending = False  # loop not running (yet); the fallback poll drains it
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the Tk thread."""
+        self.put(('call', (fn, args)))
+
+    def drain(self) -> list:
+        """Everything queued so far; called on the Tk thread."""
+        self._wake_pending = False
+        items = []
+        try:
+            while True:
+                items.append(self.get_nowait())
+        except queue.Empty:
+            pass
+        return items
+
+
+class JarvisGUI:
+    """The main window's widgets and handlers; open_window() puts them on a tk.Tk root."""
+
+    def __init__(self, jarvis: JarvisCore):
+        super().__init__()
+        self.title('Jarvis AI - Pro (Final)')
+        self.geometry('860x600')
+        self.jarvis = jarvis
+        self.out_queue = jarvis.out_queue  # a UIDispatcher
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        cfg = jarvis.config
+        self.activity = ActivityLog(cfg.get("LOG_MAX_LINES", 2000), cfg.get("LOG_FILE"),
+                                    cfg.get("LOG_FILE_MAX_BYTES", 1_000_000), cfg.get("LOG_FILE_BACKUPS", 3))
+        self._log_render_pending = False
+        self._log_box_lines = 0
+        self.create_widgets()
+        self.bind(UIDispatcher.WAKE_EVENT, lambda _evt: self.check_queue())
+        self.out_queue.attach(self)
+        self.after(self.jarvis.config.get("UI_POLL_MS", 1000), self._poll_queue)
+        # optional engines load once the window is on screen, not before it
+        self.after(200, self.jarvis.warm_up)
+
+    def create_widgets(self):
+        pad = 8
+        frm_top = ttk.Frame(self)
+        frm_top.pack(fill=tk.X, padx=pad, pady=(pad, 0))
+
+        self.status_var = tk.StringVar(value='Idle')
+        ttk.Label(frm_top, text='Status:').pack(side=tk.LEFT)
+        ttk.Label(frm_top, textvariable=self.status_var, foreground='blue').pack(side=tk.LEFT, padx=(6, 20))
+
+        ttk.Label(frm_top, text='Last Command:').pack(side=tk.LEFT)
+        self.last_cmd_var = tk.StringVar(value='None')
+        ttk.Label(frm_top, textvariable=self.last_cmd_var, foreground='green').pack(side=tk.LEFT, padx=(6, 20))
+
+        # Language selector and auto checkbox
+        ttk.Label(frm_top, text='Response Language:').pack(side=tk.LEFT)
+        self.lang_var = tk.StringVar(value=self.jarvis.config.get("RESPONSE_LANGUAGE", "en"))
+        lang_choices = ["auto", "en", "hi", "pa"]
+        self.lang_combo = ttk.Combobox(frm_top, values=lang_choices, textvariable=self.lang_var, width=6, state="readonly")
+        self.lang_combo.pack(side=tk.LEFT, padx=(6, 10))
+        self.lang_combo.bind("<<ComboboxSelected>>", self.on_lang_change)
+
+        self.auto_reply_var = tk.BooleanVar(value=self.jarvis.config.get("AUTO_LANGUAGE_REPLY", True))
+        self.auto_chk = ttk.Checkbutton(frm_top, text='Auto-reply', variable=self.auto_reply_var, command=self.on_auto_toggle)
+        self.auto_chk.pack(side=tk.LEFT, padx=(6, 10))
+
+        ttk.Button(frm_top, text='Start Wake-word', command=self.toggle_wake).pack(side=tk.RIGHT)
+        self.wake_btn = ttk.Button(frm_top, text='Push-to-Talk', command=self.push_to_talk)
+        self.wake_btn.pack(side=tk.RIGHT, padx=(0,10))
+
+        # Middle: notes, translate and log
+        frm_mid = ttk.Frame(self)
+        frm_mid.pack(fill=tk.BOTH, expand=True, padx=pad, pady=pad)
+
+        left_col = ttk.Frame(frm_mid)
+        left_col.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        notes_frame = ttk.LabelFrame(left_col, text='Notes')
+        notes_frame.pack(fill=tk.BOTH, expand=True, padx=(0,6))
+        self.notes_box = scrolledtext.ScrolledText(notes_frame, wrap=tk.WORD, width=40, height=10)
+        self.notes_box.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+        # windowed view: one line per note, older notes paged in when scrolled to the top
+        self.notes_box.configure(yscrollcommand=self._on_notes_scroll)
+        self._notes_ids = collections.deque()  # note id of each line in notes_box
+        self._notes_offset = 0  # log offset already shown
+        self._notes_at_end = True  # the view ends at the newest note (not paged back into history)
+        self._notes_at_start = False  # the view starts at the oldest note: nothing older to page in
+        self._notes_paging = False
+        self._notes_searching = False  # notes_box shows search results instead of the live view
+
+        notes_btns = ttk.Frame(notes_frame)
+        notes_btns.pack(fill=tk.X, padx=6, pady=(0,6))
+        ttk.Button(notes_btns, text='Refresh Notes', command=self.load_notes).pack(side=tk.LEFT)
+        ttk.Button(notes_btns, text='Add Note (text)', command=self.add_note_via_gui).pack(side=tk.LEFT, padx=6)
+        ttk.Button(notes_btns, text='Clear Notes', command=self.clear_notes_gui).pack(side=tk.LEFT)
+
+        notes_search = ttk.Frame(notes_frame)
+        notes_search.pack(fill=tk.X, padx=6, pady=(0,6))
+        self.notes_query_var = tk.StringVar()
+        query_entry = ttk.Entry(notes_search, textvariable=self.notes_query_var, width=30)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        query_entry.bind('<Return>', lambda _evt: self.search_notes_gui())
+        ttk.Button(notes_search, text='Search Notes', command=self.search_notes_gui).pack(side=tk.LEFT, padx=(6,0))
+
+        # Translate panel
+        translate_frame = ttk.LabelFrame(left_col, text='Translate (manual, one phrase per line)')
+        translate_frame.pack(fill=tk.BOTH, expand=False, pady=(8,0))
+        trans_top = ttk.Frame(translate_frame)
+        trans_top.pack(fill=tk.X)
+        ttk.Label(trans_top, text='Dest (en/hi/pa):').pack(side=tk.LEFT, padx=6)
+        self.trans_dest_var = tk.StringVar(value='hi')
+        self.trans_entry = ttk.Entry(trans_top, width=6, textvariable=self.trans_dest_var)
+        self.trans_entry.pack(side=tk.LEFT, padx=(0,8))
+        ttk.Button(trans_top, text='Translate', command=self.gui_translate).pack(side=tk.LEFT)
+        self.trans_input = scrolledtext.ScrolledText(translate_frame, wrap=tk.WORD, width=40, height=3)
+        self.trans_input.pack(fill=tk.X, padx=6, pady=(6,0))
+        self.trans_output = scrolledtext.ScrolledText(translate_frame, wrap=tk.WORD, width=40, height=3)
+        self.trans_output.pack(fill=tk.X, padx=6, pady=6)
+
+        right_col = ttk.Frame(frm_mid)
+        right_col.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+
+        log_frame = ttk.LabelFrame(right_col, text='Activity Log')
+        log_frame.pack(fill=tk.BOTH, expand=True)
+        self.log_box = scrolledtext.ScrolledText(log_frame, height=20)
+        self.log_box.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+
+        # Metrics panel: rolling per-stage timings from jarvis.metrics
+        if self.jarvis.metrics.enabled:
+            metrics_frame = ttk.LabelFrame(right_col, text='Metrics (ms)')
+            metrics_frame.pack(fill=tk.BOTH, expand=False, pady=(8,0))
+            cols = ('count', 'last', 'p50', 'p90', 'p99', 'max')
+            self.metrics_tree = ttk.Treeview(metrics_frame, columns=cols, height=7)
+            self.metrics_tree.heading('#0', text='stage')
+            self.metrics_tree.column('#0', width=130)
+            for col in cols:
+                self.metrics_tree.heading(col, text=col)
+                self.metrics_tree.column(col, width=55, anchor=tk.E)
+            self.metrics_tree.pack(fill=tk.BOTH, expand=True, padx=6, pady=(6,0))
+            self.metrics_var = tk.StringVar(value='')
+            ttk.Label(metrics_frame, textvariable=self.metrics_var).pack(fill=tk.X, padx=6, pady=(2,6))
+            self.after(self.jarvis.config.get("METRICS_REFRESH_MS", 1000), self.refresh_metrics)
+
+        # Bottom: quick commands
+        frm_bottom = ttk.Frame(self)
+        frm_bottom.pack(fill=tk.X, padx=pad, pady=(0,pad))
+        ttk.Label(frm_bottom, text='Quick Commands:').pack(side=tk.LEFT)
+        ttk.Button(frm_bottom, text='Open Chrome', command=lambda: self.run_quick('open chrome')).pack(side=tk.LEFT, padx=6)
+        ttk.Button(frm_bottom, text='Search Google', command=self.quick_search_prompt).pack(side=tk.LEFT, padx=6)
+        ttk.Button(frm_bottom, text='Play YouTube', command=self.quick_play_prompt).pack(side=tk.LEFT, padx=6)
+        ttk.Button(frm_bottom, text='Weather', command=self.quick_weather_prompt).pack(side=tk.LEFT, padx=6)
+        ttk.Button(frm_bottom, text='Translate sample', command=lambda: self.run_quick('translate hello to hi')).pack(side=tk.LEFT, padx=6)
+
+        self.load_notes()
+
+    def on_lang_change(self, _evt=None):
+        sel = self.lang_var.get()
+        self.jarvis.config["RESPONSE_LANGUAGE"] = sel
+        self.log(f"Response language set to: {sel}")
+
+    def on_auto_toggle(self):
+        val = self.auto_reply_var.get()
+        self.jarvis.config["AUTO_LANGUAGE_REPLY"] = val
+        self.log(f"Auto language reply: {'ON' if val else 'OFF'}")
+
+    def toggle_wake(self):
+        if self.jarvis.listening:
+            self.jarvis.stop_wake_word()
+            self.status_var.set('Wake-word stopped')
+            self.log('Wake-word listening stopped')
+        else:
+            self.jarvis.start_wake_word()
+            self.status_var.set('Wake-word active')
+            self.log('Wake-word listening started')
+
+    def push_to_talk(self):
+        self.status_var.set('Push-to-Talk: Listening')
+        self.log('Push-to-Talk activated')
+        threading.Thread(target=self._push_thread, daemon=True).start()
+
+    def _push_thread(self):
+        self.jarvis.listen_and_process_once()
+        time.sleep(0.5)
+        self.out_queue.call(self.status_var.set, 'Idle')
+
+    def run_quick(self, command: str):
+        self.log(f'Quick command: {command}')
+        threading.Thread(target=self.jarvis.process_command, args=(command,), daemon=True).start()
+
+    def quick_search_prompt(self):
+        q = self.simple_input_dialog('Search Google', 'Enter search query:')
+        if q:
+            self.run_quick(f'search {q}')
+
+    def quick_play_prompt(self):
+        q = self.simple_input_dialog('Play YouTube', 'Enter song or video name:')
+        if q:
+            self.run_quick(f'play {q}')
+
+    def quick_weather_prompt(self):
+        city = self.simple_input_dialog('Weather', 'Enter city name:')
+        if city:
+            self.run_quick(f'weather in {city}')
+
+    def simple_input_dialog(self, title: str, prompt: str) -> Optional[str]:
+        dialog = tk.Toplevel(self)
+        dialog.title(title)
+        dialog.geometry('420x120')
+        ttk.Label(dialog, text=prompt).pack(padx=8, pady=8)
+        entry = ttk.Entry(dialog, width=60)
+        entry.pack(padx=8)
+        entry.focus()
+        result = {'value': None}
+
+        def on_ok():
+            result['value'] = entry.get().strip()
+            dialog.destroy()
+
+        def on_cancel():
+            dialog.destroy()
+
+        btns = ttk.Frame(dialog)
+        btns.pack(pady=8)
+        ttk.Button(btns, text='OK', command=on_ok).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btns, text='Cancel', command=on_cancel).pack(side=tk.LEFT)
+        self.wait_window(dialog)
+        return result['value']
+
+    def add_note_via_gui(self):
+        text = self.simple_input_dialog('Add Note', 'Enter note text:')
+        if text:
+            self.jarvis.notes.append(text)
+            self.log('Note added via GUI')
+            self.append_new_notes()
+
+    @staticmethod
+    def _note_line(note: Note) -> str:
+        return f'[{note.timestamp}] {note.text}\n' if note.timestamp else f'{note.text}\n'
+
+    def load_notes(self):
+        """Reset the notes view to the latest NOTES_VIEW_LINES notes."""
+        try:
+            lines = self.jarvis.config.get('NOTES_VIEW_LINES', 200)
+            notes, self._notes_offset = self.jarvis.notes.window(lines)
+            self._notes_at_start = len(notes) < lines
+            self.notes_box.delete('1.0', tk.END)
+            self.notes_box.insert(tk.END, ''.join(self._note_line(n) for n in notes))
+            self._notes_ids = collections.deque(n.id for n in notes)
+            self._notes_searching = False
+            self._notes_at_end = True
+            self.notes_box.see(tk.END)
+            self.log('Notes refreshed')
+        except Exception as e:
+            self.log(f'Failed to load notes: {e}')
+
+    def append_new_notes(self):
+        """Append notes written since the last refresh, trimming the oldest lines past the cap."""
+        if self._notes_searching or not self._notes_at_end:
+            # picked up by load_notes when the search is cleared, or by paging down to the end
+            return
+        try:
+            notes, end = self.jarvis.notes.read_from(self._notes_offset)
+        except Exception as e:
+            self.log(f'Failed to load notes: {e}')
+            return
+        if notes is None:
+            # log was cleared or rewritten
+            self.load_notes()
+            return
+        self._notes_offset = end
+        if not notes:
+            return
+        at_bottom = self.notes_box.yview()[1] >= 0.999
+        self.notes_box.insert(tk.END, ''.join(self._note_line(n) for n in notes))
+        self._notes_ids.extend(n.id for n in notes)
+        self._trim_notes(from_top=True)
+        if at_bottom:
+            self.notes_box.see(tk.END)
+
+    def _trim_notes(self, from_top: bool):
+        """Drop lines past NOTES_VIEW_LINES from one end, keeping the visible lines in place."""
+        extra = len(self._notes_ids) - self.jarvis.config.get('NOTES_VIEW_LINES', 200)
+        if extra <= 0:
+            return
+        if from_top:
+            first_visible = int(self.notes_box.index('@0,0').split('.')[0])
+            self.notes_box.delete('1.0', f'{extra + 1}.0')
+            for _ in range(extra):
+                self._notes_ids.popleft()
+            self._notes_at_start = False
+            self.notes_box.yview(f'{max(1, first_visible - extra)}.0')
+        else:
+            keep = len(self._notes_ids) - extra
+            self.notes_box.delete(f'{keep + 1}.0', tk.END)
+            for _ in range(extra):
+                self._notes_ids.pop()
+            self._notes_at_end = False
+
+    def search_notes_gui(self):
+        query = self.notes_query_var.get().strip()
+        if not query:
+            self.load_notes()
+            return
+        try:
+            start = time.perf_counter()
+            notes = self.jarvis.notes.search(query, limit=self.jarvis.config.get('NOTES_VIEW_LINES', 200))
+            ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            self.log(f'Notes search failed: {e}')
+            return
+        self._notes_searching = True
+        self._notes_ids = collections.deque()
+        self.notes_box.delete('1.0', tk.END)
+        self.notes_box.insert(tk.END, ''.join(self._note_line(n) for n in notes) or 'No matching notes.\n')
+        self.log(f"Notes search '{query}': {len(notes)} result(s) in {ms:.1f} ms (clear the box and search to go back)")
+
+    def _on_notes_scroll(self, first, last):
+        self.notes_box.vbar.set(first, last)
+        if self._notes_paging or not self._notes_ids:
+            return
+        # defer paging so the scrollbar update completes first
+        if float(first) <= 0.0 and not self._notes_at_start:
+            self._notes_paging = True
+            self.after_idle(self._page_older_notes)
+        elif float(last) >= 1.0 and not self._notes_at_end:
+            self._notes_paging = True
+            self.after_idle(self._page_newer_notes)
+
+    def _page_older_notes(self):
+        try:
+            page = self.jarvis.config.get('NOTES_PAGE_LINES', 50)
+            older = self.jarvis.notes.tail(page, before=self._notes_ids[0])
+            # a short page reached the oldest note (note 0 may be deleted): stop asking for more
+            self._notes_at_start = len(older) < page
+            if older:
+                self.notes_box.insert('1.0', ''.join(self._note_line(n) for n in older))
+                self._notes_ids.extendleft(reversed([n.id for n in older]))
+                # keep the previously first line in view
+                self.notes_box.yview(f'{len(older) + 1}.0')
+                self._trim_notes(from_top=False)
+        except Exception as e:
+            self.log(f'Failed to load notes: {e}')
+        finally:
+            self._notes_paging = False
+
+    def _page_newer_notes(self):
+        """Page history back in below the view after older pages evicted the newest lines."""
+        try:
+            page = self.jarvis.config.get('NOTES_PAGE_LINES', 50)
+            newer, end = self.jarvis.notes.window(page, after=self._notes_ids[-1])
+            if newer:
+                self.notes_box.insert(tk.END, ''.join(self._note_line(n) for n in newer))
+                self._notes_ids.extend(n.id for n in newer)
+                self._trim_notes(from_top=True)
+            if len(newer) < page:
+                # caught up with the log: everything up to end is shown, continue live from there
+                self._notes_offset = end
+                self._notes_at_end = True
+                self.append_new_notes()
+        except Exception as e:
+            self.log(f'Failed to load notes: {e}')
+        finally:
+            self._notes_paging = False
+
+    def clear_notes_gui(self):
+        if messagebox.askyesno('Confirm', 'Clear all notes?'):
+            try:
+                self.jarvis.notes.clear()
+                self.load_notes()
+                self.log('Notes cleared')
+            except Exception as e:
+                self.log(f'Failed to clear notes: {e}')
+
+    def gui_translate(self):
+        dest = self.trans_dest_var.get().strip()
+        lines = [ln.strip() for ln in self.trans_input.get('1.0', tk.END).splitlines() if ln.strip()]
+        if not lines:
+            messagebox.showinfo("Translate", "Enter text to translate.")
+            return
+        self.trans_output.delete('1.0', tk.END)
+        self.log(f"Translating {len(lines)} line(s) to {dest}")
+        # run in thread
+        threading.Thread(target=self._do_translate, args=(lines, dest), daemon=True).start()
+
+    def _do_translate(self, lines, dest):
+        # results stream back through the GUI queue in input order
+        try:
+            results = self.jarvis.translate_batch(
+                lines, dest, on_result=lambda i, text: self.out_queue.put(('translation', text)))
+        except Exception as e:
+            self.out_queue.call(messagebox.showerror, "Translate", f"Translation failed: {e}")
+            return
+        # speak a single result (in dest language if possible)
+        if len(results) == 1:
+            short = dest.split("-")[0] if "-" in dest else dest
+            self.jarvis.speak(results[0], lang=short or None)
+
+    def log(self, text: str):
+        self.activity.append(text)
+        if not self._log_render_pending:
+            self._log_render_pending = True
+            self.after(50, self._render_log)
+
+    def _render_log(self):
+        """Insert everything logged since the last render at once and trim the panel to LOG_MAX_LINES."""
+        self._log_render_pending = False
+        lines = self.activity.drain()
+        if not lines:
+            return
+        follow = self.log_box.yview()[1] >= 0.999  # only auto-scroll when already at the bottom
+        self.log_box.insert(tk.END, '\n'.join(lines) + '\n')
+        self._log_box_lines += len(lines)
+        excess = self._log_box_lines - self.activity.max_lines
+        if excess > 0:
+            self.log_box.delete('1.0', f'{excess + 1}.0')
+            self._log_box_lines -= excess
+        if follow:
+            self.log_box.see(tk.END)
+
+    def check_queue(self):
+        """Apply queued events in one batch: only the newest status is shown, notes refresh once."""
+        status = None
+        notes = None
+        for typ, payload in self.out_queue.drain():
+            if typ == 'status':
+                status = payload
+                self.log(payload)
+            elif typ == 'last_command':
+                self.last_cmd_var.set(payload)
+                self.log(f'Recognized: {payload}')
+            elif typ == 'notes_updated':
+                notes = 'reset' if payload == 'reset' or notes == 'reset' else 'append'
+            elif typ == 'translation':
+                self.trans_output.insert(tk.END, f'{payload}\n')
+            elif typ == 'call':
+                fn, args = payload
+                try:
+                    fn(*args)
+                except Exception as e:
+                    self.log(f'UI call failed: {e}')
+            elif typ == 'exit':
+                self.on_close()
+            else:
+                self.log(f'{typ}: {payload}')
+        if status is not None:
+            self.status_var.set(status)
+        if notes == 'reset':
+            self.load_notes()
+        elif notes == 'append':
+            self.append_new_notes()
+
+    def refresh_metrics(self):
+        summary = self.jarvis.metrics.summary()
+        tree = self.metrics_tree
+        for name in sorted(summary):
+            row = summary[name]
+            values = tuple(row[c] for c in ('count', 'last', 'p50', 'p90', 'p99', 'max'))
+            if tree.exists(name):
+                tree.item(name, values=values)
+            else:
+                tree.insert('', tk.END, iid=name, text=name, values=values)
+        tts = self.jarvis.tts.stats()
+        cache = self.jarvis.translation_cache.stats()
+        self.metrics_var.set(f"TTS queue {tts.get('queue_depth', 0)}, first audio avg {tts.get('ttfa_avg_ms')} ms | "
+                             f"translation cache hits {cache.get('hits', 0)}/{cache.get('hits', 0) + cache.get('misses', 0)}")
+        self.after(self.jarvis.config.get("METRICS_REFRESH_MS", 1000), self.refresh_metrics)
+
+    def _poll_queue(self):
+        # safety net for events whose wake-up could not be posted
+        self.check_queue()
+        self.after(self.jarvis.config.get("UI_POLL_MS", 1000), self._poll_queue)
+
+    def on_close(self):
+        if messagebox.askokcancel('Quit', 'Do you want to quit Jarvis?'):
+            try:
+                self.jarvis.shutdown()
+            except Exception:
+                pass
+            self.activity.close()
+            self.out_queue.detach()
+            self.destroy()
+
+
+# ---------------- HEADLESS ----------------
+class JsonLineClient:
+    """One consumer of headless events: every event is written to stream as a JSON line."""
+
+    def __init__(self, stream, binary: bool = False):
+        self.stream = stream
+        self.binary = binary
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.pending = 0  # commands submitted but not finished
+
+    def send(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            try:
+                self.stream.write(line.encode("utf-8") if self.binary else line)
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass  # client went away; the command still runs
+
+    def _begin(self):
+        with self._lock:
+            self.pending += 1
+
+    def _end(self):
+        with self._lock:
+            self.pending -= 1
+            self._idle.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            return self._idle.wait_for(lambda: self.pending == 0, timeout)
+
+
+class Session:
+    """One user's command stream: its JarvisCore view, queued commands and the client to answer."""
+
+    def __init__(self, session_id: str, core: "JarvisCore"):
+        self.id = session_id
+        self.core = core
+        self.client = None
+        self.pending = collections.deque()  # (cmd_id, command, client, submitted_at)
+        self.running = False  # a pool task owns this session
+        self.current = None  # id of the command being handled
+        self.last_used = time.monotonic()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    # out_queue interface used by JarvisCore._put
+    def put(self, item, block=True, timeout=None):
+        typ, payload = item
+        if typ == 'exit':
+            self.closed = True
+        event = {"event": typ, "data": payload, "session": self.id}
+        if self.current is not None:
+            event["id"] = self.current
+        if self.client is not None:
+            self.client.send(event)
+
+
+class HeadlessService:
+    """
+    Text front end for JarvisCore without Tk, hosting any number of sessions. Each session has
+    its own response language, auto-reply setting, detected language and notes file; engines,
+    caches and indexes are shared. Sessions run on one worker pool: a session's commands run
+    one at a time in arrival order, and different sessions run side by side. Events are sent
+    as JSON lines to the session's client, each command ending with a 'done' event.
+
+    The 'default' session keeps the config NOTES_FILE notes but, like every other session, has its
+    own settings layer, so its language switches don't leak into the others; an exit command
+    there stops the service. Other sessions are dropped once idle for SESSION_IDLE_TTL seconds or
+    when more than SESSION_MAX exist.
+    """
+
+    def __init__(self, config_ref, workers: int = None):
+        start = time.perf_counter()
+        self.config = config_ref
+        self.clients = set()
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.stopped = threading.Event()
+        default = Session("default", None)
+        self.jarvis = JarvisCore(config_ref, default)
+        default.core = self.jarvis.for_session(default)
+        self.sessions["default"] = default
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, workers or config_ref.get("SESSION_WORKERS", 8)), thread_name_prefix="jarvis-session")
+        self.startup_ms = (time.perf_counter() - start) * 1000
+
+    def connect(self, client: JsonLineClient):
+        with self._lock:
+            self.clients.add(client)
+        client.send({"event": "ready", "data": {"startup_ms": round(self.startup_ms, 1)}})
+
+    def disconnect(self, client: JsonLineClient):
+        with self._lock:
+            self.clients.discard(client)
+
+    def _notes_path(self, session_id: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)[:64] or "_"
+        folder = self.config.get("SESSION_NOTES_DIR", "jarvis_sessions")
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, f"{safe}.txt")
+
+    def session(self, session_id: str) -> Session:
+        expired = []
+        with self._lock:
+            sess = self.sessions.get(session_id)
+            if sess is None:
+                expired = self._expire_idle()
+                sess = Session(session_id, None)
+                sess.core = self.jarvis.for_session(sess, self._notes_path(session_id))
+                self.sessions[session_id] = sess
+            sess.last_used = time.monotonic()
+        for old in expired:
+            old.core.notes.flush()
+        return sess
+
+    def _expire_idle(self) -> List[Session]:
+        """Drop sessions idle past SESSION_IDLE_TTL, then the least recently used idle ones over
+        SESSION_MAX; called with _lock held when a session is created. A dropped session's notes
+        stay on disk and are picked up again if it comes back."""
+        ttl = self.config.get("SESSION_IDLE_TTL", 1800)
+        cap = self.config.get("SESSION_MAX", 256)
+        now = time.monotonic()
+        idle = sorted((s for s in self.sessions.values() if s.id != "default" and not s.running and not s.pending),
+                      key=lambda s: s.last_used)
+        over = max(0, len(self.sessions) + 1 - cap) if cap else 0
+        expired = [s for i, s in enumerate(idle) if i < over or (ttl and now - s.last_used > ttl)]
+        for s in expired:
+            del self.sessions[s.id]
+        return expired
+
+    def submit(self, client: JsonLineClient, command: str, session_id: str = "default") -> int:
+        cmd_id = next(self._ids)
+        sess = self.session(session_id)
+        client._begin()
+        with sess.lock:
+            sess.pending.append((cmd_id, command, client, time.perf_counter()))
+            schedule = not sess.running
+            sess.running = True
+        if schedule:
+            self._pool.submit(self._run_next, sess)
+        return cmd_id
+
+    def _run_next(self, sess: Session):
+        """Handle one queued command of sess, then requeue it behind the other sessions."""
+        with sess.lock:
+            cmd_id, command, client, submitted = sess.pending.popleft()
+            sess.client, sess.current = client, cmd_id
+        start = time.perf_counter()
+        wait_ms = (start - submitted) * 1000
+        ok = False
+        if not sess.closed:
+            try:
+                sess.core.process_command(command)
+                ok = True
+            except Exception as e:
+                client.send({"event": "error", "id": cmd_id, "session": sess.id, "data": str(e)})
+        # commands queued behind an exit are not run
+        client.send({"event": "done", "id": cmd_id, "session": sess.id,
+                     "data": {"command": command, "ok": ok, "ms": round((time.perf_counter() - start) * 1000, 2),
+                              "wait_ms": round(wait_ms, 2)}})
+        sess.current = None
+        with sess.lock:
+            more = bool(sess.pending)
+            sess.running = more
+            if not more and sess.closed:
+                self._close_session(sess)
+        client._end()
+        if more:
+            self._pool.submit(self._run_next, sess)
+
+    def _close_session(self, sess: Session):
+        if sess.id == "default":
+            self.stopped.set()
+            return
+        with self._lock:
+            if self.sessions.get(sess.id) is sess:
+                del self.sessions[sess.id]
+        sess.core.notes.flush()
+
+    @staticmethod
+    def parse_line(line: str, session_id: str):
+        """(session, command) from a plain command or a {"session": ..., "command": ...} JSON line."""
+        if line.startswith("{"):
+            try:
+                msg = json.loads(line)
+                return str(msg.get("session") or session_id), str(msg.get("command", "")).strip()
+            except ValueError:
+                pass
+        return session_id, line
+
+    def serve_lines(self, lines, client: JsonLineClient, session_id: str = "default"):
+        """Submit each non-empty line, then wait for all of them; stops early once the service stops."""
+        self.connect(client)
+        try:
+            for line in lines:
+                sid, command = self.parse_line(line.strip(), session_id)
+                if command:
+                    self.submit(client, command, sid)
+                if self.stopped.is_set():
+                    break
+            client.wait_idle()
+        finally:
+            self.disconnect(client)
+
+    def serve_socket(self, path: str):
+        """Accept clients on a Unix-domain socket until the default session exits or Ctrl+C.
+        Plain lines from a connection go to a session of its own."""
+        service = self
+        conn_ids = itertools.count(1)
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lines = (raw.decode("utf-8", "replace") for raw in self.rfile)
+                service.serve_lines(lines, JsonLineClient(self.wfile, binary=True), f"conn-{next(conn_ids)}")
+
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket from an earlier run
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            self.stopped.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+            server.server_close()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            sessions = list(self.sessions.values())
+        for sess in sessions:
+            if sess.core.notes is not self.jarvis.notes:
+                sess.core.notes.flush()
+        self.jarvis.shutdown()
+
+
+def run_headless(argv: List[str]):
+    """python jarvis_pro_gui_final.py --headless [--socket PATH] [--speak] [--listen]"""
+    socket_path = None
+    if "--socket" in argv:
+        idx = argv.index("--socket") + 1
+        if idx >= len(argv) or argv[idx].startswith("--"):
+            print("--socket needs a path, e.g. --socket /tmp/jarvis.sock", file=sys.stderr)
+            sys.exit(2)
+        socket_path = argv[idx]
+    cfg = dict(config)
+    cfg["TTS_ENABLED"] = "--speak" in argv
+    cfg["MICROPHONE"] = "--listen" in argv
+    # stdout carries the JSON events; console chatter (e.g. "Jarvis: ...") goes to stderr
+    out, sys.stdout = sys.stdout, sys.stderr
+    service = HeadlessService(cfg)
+    service.jarvis.warm_up()
+    try:
+        if socket_path:
+            service.serve_socket(socket_path)
+        else:
+            service.serve_lines(sys.stdin, JsonLineClient(out))
+    finally:
+        service.shutdown()
+
+
+_window_class = None
+
+
+def open_window(jarvis: JarvisCore) -> JarvisGUI:
+    """The main window, a JarvisGUI on a tk.Tk root; the first call imports Tk."""
+    global _window_class
+    if _window_class is None:
+        _window_class = type("JarvisWindow", (JarvisGUI, tk.Tk), {})
+    return _window_class(jarvis)
+
+
+def main():
+    if "--headless" in sys.argv:
+        run_headless(sys.argv)
+        return
+    out_q = UIDispatcher()
+    jarvis = JarvisCore(config, out_q)
+    if not tk:
+        print('Tkinter not available. Exiting.')
+        return
+    app = open_window(jarvis)
+    # start mainloop; wake-word runs on background threads
+    app.mainloop()
+  
+
+if __name__ == '__main__':
+    main()
+
+#Run this file and check 
@@ -0,0 +1,23 @@
+import os
+import queue
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def core(tmp_path):
+    """JarvisCore over a copy of config with its files in tmp_path and replies collected in core.said."""
+    import jarvis_pro_gui_final as jarvis
+
+    cfg = dict(jarvis.config, NOTES_FILE=str(tmp_path / "notes.txt"),
+               TRANSLATION_CACHE_FILE=str(tmp_path / "translation_cache.jsonl"),
+               APP_INDEX_FILE=str(tmp_path / "app_index.json"), APP_DISCOVERY=False)
+    c = jarvis.JarvisCore(cfg, queue.Queue())
+    c.said = []
+    c.speak = lambda text, *args, **kwargs: c.said.append(text)
+    c.answers = []
+    c.listen_once = lambda *args, **kwargs: c.answers.pop(0) if c.answers else None
+    return c
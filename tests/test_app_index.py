@@ -0,0 +1,61 @@
+import stat
+import sys
+
+import pytest
+
+from jarvis_pro_gui_final import AppIndex
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="app discovery is Linux-only")
+
+
+def executable(path):
+    path.write_text("#!/bin/sh\n", encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+@pytest.fixture
+def apps(tmp_path, monkeypatch):
+    bin_dir, share = tmp_path / "bin", tmp_path / "applications"
+    bin_dir.mkdir()
+    share.mkdir()
+    for name in ("file", "firefox", "gnome-terminal", "google-chrome-stable"):
+        executable(bin_dir / name)
+    (share / "org.gnome.Terminal.desktop").write_text(
+        "[Desktop Entry]\nType=Application\nName=Terminal\nExec=gnome-terminal\n", encoding="utf-8")
+    (share / "google-chrome.desktop").write_text(
+        "[Desktop Entry]\nType=Application\nName=Google Chrome\nExec=google-chrome-stable %U\n", encoding="utf-8")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setattr(AppIndex, "DESKTOP_DIRS", [str(share)])
+    config = {
+        "APP_INDEX_FILE": str(tmp_path / "index.json"),
+        "APPS": {
+            "chrome": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+            "terminal": "wt.exe",
+            "editor": executable(tmp_path / "editor"),
+        },
+    }
+    return AppIndex(config)
+
+
+def test_path_executable_must_be_whole_target(apps):
+    assert apps.find("open the file manager") is None
+    assert apps.find("open file").source == "path"
+    assert apps.find("please open the firefox").name == "firefox"
+    assert apps.find("open firefox and play music") is None
+
+
+def test_discovered_app_beats_missing_config_path(apps):
+    entry = apps.find("open terminal")
+    assert (entry.source, entry.argv) == ("desktop", ["gnome-terminal"])
+
+
+def test_missing_config_path_falls_back_to_discovered_app(apps):
+    entry = apps.find("open chrome")
+    assert entry.source == "config" and not apps.launchable(entry)
+    assert apps.closest("open chrome").argv == ["google-chrome-stable"]
+
+
+def test_existing_config_path_is_launchable(apps):
+    entry = apps.find("launch editor")
+    assert entry.source == "config" and apps.launchable(entry)
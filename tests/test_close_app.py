@@ -0,0 +1,36 @@
+import types
+
+import pytest
+
+from jarvis_pro_gui_final import AppIndex
+
+
+@pytest.fixture
+def closing(core):
+    core.apps = AppIndex({"APP_DISCOVERY": False, "APPS": {"python": "python3", "desktop clock": "xclock"}})
+    core.processes = types.SimpleNamespace(available=True)
+    core.closed = []
+    core._close_running = lambda target, entry: core.closed.append((target, entry and entry.name))
+    return core
+
+
+def test_exact_name_closes_without_asking(closing):
+    closing.handle_close_app("close python")
+    assert closing.closed == [("python", "python")]
+    assert not any("Did you mean" in s for s in closing.said)
+
+
+def test_verbs_are_removed_as_whole_words(closing):
+    closing.handle_close_app("please close the desktop clock")
+    assert closing.closed == [("please the desktop clock", "desktop clock")]
+
+
+def test_partial_name_is_confirmed(closing):
+    closing.handle_close_app("close my python script")
+    assert closing.closed == []
+    assert closing.said[0] == "Did you mean python? Should I close it?"
+
+    closing.said.clear()
+    closing.answers.append("yes")
+    closing.handle_close_app("close my python script")
+    assert closing.closed == [("my python script", "python")]
@@ -0,0 +1,53 @@
+import random
+import string
+
+import pytest
+
+from jarvis_pro_gui_final import INTENTS, FuzzyIndex, IntentRouter, _ratio_difflib
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter(INTENTS)
+
+
+@pytest.mark.parametrize("command, corrected", [
+    ("opne chrome", "open chrome"),
+    ("wether in delhi", "weather in delhi"),
+    ("serch for cats", "search for cats"),
+])
+def test_misheard_keyword_is_corrected(router, command, corrected):
+    assert router.match(command) is None
+    assert router.correct(command) == corrected
+
+
+@pytest.mark.parametrize("command", [
+    "set a timer",  # a keyword word plus a suffix is a different word
+    "the weathered fence",
+    "clos chrome",  # never corrected into close or exit
+    "clse tab",
+    "exot now",
+    "quitt",
+    "xyzzy plugh",
+])
+def test_no_correction(router, command):
+    assert router.correct(command) is None
+
+
+@pytest.mark.parametrize("scorer", [None, _ratio_difflib])
+def test_small_index_scans_every_choice(scorer):
+    # "bacedf" shares no trigram with "abcdef", so a trigram shortlist never scores it
+    idx = FuzzyIndex(["abcdef", "zzzzzz"], cutoff=50, scorer=scorer)
+    assert idx.best("bacedf")[0] == "abcdef"
+
+
+@pytest.mark.parametrize("scorer", [None, _ratio_difflib])
+def test_full_scan_and_shortlist_agree(scorer):
+    rng = random.Random(7)
+    words = sorted({"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+                    for _ in range(2000)})
+    small, large = FuzzyIndex(words[:20], scorer=scorer), FuzzyIndex(words, scorer=scorer)
+    for word in words[:20]:
+        query = word[:-1] + ("a" if word[-1] != "a" else "b")
+        assert small.best(query)[0] == word
+        assert large.best(query)[0] == word
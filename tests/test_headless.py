@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_does_not_load_tk(tmp_path):
+    # argv is read by main(), not at import: importing never pulls in Tk, --headless or not
+    code = "import sys, jarvis_pro_gui_final; print('tkinter' in sys.modules)"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True,
+                          env=dict(os.environ, PYTHONPATH=ROOT), timeout=60)
+    assert proc.stdout.strip() == "False", proc.stderr
+
+
+def test_headless_run_answers_without_tk(tmp_path):
+    script = os.path.join(ROOT, "jarvis_pro_gui_final.py")
+    code = ("import sys, runpy; sys.argv = [%r, '--headless']; runpy.run_path(%r, run_name='__main__'); "
+            "print('tk loaded' if 'tkinter' in sys.modules else 'no tk')") % (script, script)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, input="what time is it\n",
+                          capture_output=True, text=True, timeout=60)
+    assert '"event": "done"' in proc.stdout
+    assert proc.stderr.strip().endswith("no tk"), proc.stderr  # headless mode prints to stderr
@@ -0,0 +1,45 @@
+import pytest
+
+from jarvis_pro_gui_final import LanguageIdentifier
+
+# phrases not used to build the identifier's tables (nor the jarvis_bench tuning/held-out sets)
+HELD_OUT = [
+    ("please open the calculator", "en"), ("what is on my calendar today", "en"),
+    ("how far is the airport", "en"), ("play some relaxing music", "en"),
+    ("switch off the bedroom fan", "en"), ("tell me a joke", "en"),
+    ("is it going to rain tomorrow", "en"), ("order a pizza for dinner", "en"),
+    ("mera chashma kahan hai", "hi"), ("khana bana do", "hi"), ("bahut garmi ho rahi hai", "hi"),
+    ("mujhe ek kahani sunao", "hi"), ("kitne baje hain abhi", "hi"), ("darwaza band kar do", "hi"),
+    ("tum kya kar rahe ho", "hi"), ("aaj bahut kaam hai", "hi"),
+    ("tusi kithe jaa rahe ho", "pa"), ("mainu pyaas lagi hai", "pa"), ("ajj mausam vadhiya hai", "pa"),
+    ("oh kadon aauga", "pa"), ("tuhada naam ki hai", "pa"), ("assi kal milange", "pa"),
+    ("bachche school gaye ne", "pa"), ("menu chaa chahidi hai", "pa"),
+]
+
+SCRIPTS = [("कल बारिश होगी क्या", "hi"), ("मेरा फ़ोन कहाँ है", "hi"),
+           ("ਤੁਸੀਂ ਕਿਵੇਂ ਹੋ", "pa"), ("ਕੱਲ੍ਹ ਮੀਂਹ ਪਵੇਗਾ", "pa")]
+
+MIN_ACCURACY = 0.75
+
+
+@pytest.fixture(scope="module")
+def lid():
+    return LanguageIdentifier()
+
+
+@pytest.mark.parametrize("text, lang", SCRIPTS)
+def test_native_script(lid, text, lang):
+    assert lid.identify(text)[0] == lang
+
+
+def test_held_out_accuracy(lid):
+    misses = [(text, lang, lid.identify(text)[0]) for text, lang in HELD_OUT if lid.identify(text)[0] != lang]
+    accuracy = 1 - len(misses) / len(HELD_OUT)
+    assert accuracy >= MIN_ACCURACY, f"{accuracy:.0%} held-out accuracy; misses: {misses}"
+
+
+@pytest.mark.parametrize("lang", ["en", "hi", "pa"])
+def test_every_language_mostly_right(lid, lang):
+    cases = [text for text, expected in HELD_OUT if expected == lang]
+    right = sum(lid.identify(text)[0] == lang for text in cases)
+    assert right / len(cases) >= 0.5
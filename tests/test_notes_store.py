@@ -0,0 +1,98 @@
+from jarvis_pro_gui_final import NotesStore
+
+LEGACY = (
+    "[2024-01-01 09:00:00] alpha soup\n"
+    "[2024-01-02 10:00:00] beta\n"
+    "loose line without a timestamp\n"
+    "[2024-01-03 11:30:00] gamma ray\n"
+)
+
+
+def texts(notes):
+    return [n.text for n in notes]
+
+
+def test_migrates_existing_log(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text(LEGACY, encoding="utf-8")
+    store = NotesStore(path)
+    assert store.index_path.exists()
+    assert store.count() == 4
+    assert texts(store.tail(10)) == ["alpha soup", "beta", "loose line without a timestamp", "gamma ray"]
+    assert texts(store.search("gamma")) == ["gamma ray"]
+
+
+def test_append_then_reopen(tmp_path):
+    path = tmp_path / "notes.txt"
+    store = NotesStore(path)
+    store.append("buy milk")
+    store.append("call   mom")
+    reopened = NotesStore(path)
+    assert texts(reopened.tail(10)) == ["buy milk", "call mom"]
+
+
+def test_delete_leaves_tombstone(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text(LEGACY, encoding="utf-8")
+    store = NotesStore(path)
+    size = path.stat().st_size
+    assert store.delete(1)
+    assert not store.delete(1)
+    # blanked in place: offsets of later notes stay valid
+    assert path.stat().st_size == size
+    assert texts(store.tail(10)) == ["alpha soup", "loose line without a timestamp", "gamma ray"]
+    assert store.search("beta") == []
+    reopened = NotesStore(path)
+    assert texts(reopened.tail(10)) == ["alpha soup", "loose line without a timestamp", "gamma ray"]
+
+
+def test_rebuilds_after_earlier_line_grows(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text(LEGACY, encoding="utf-8")
+    NotesStore(path)
+    # fix a "typo" in the first note: everything after it moves, the log gets longer
+    path.write_text(LEGACY.replace("alpha soup", "alphabet soup"), encoding="utf-8")
+    store = NotesStore(path)
+    assert texts(store.tail(10)) == ["alphabet soup", "beta", "loose line without a timestamp", "gamma ray"]
+
+
+def test_rebuilds_after_log_shrinks(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text(LEGACY, encoding="utf-8")
+    store = NotesStore(path)
+    path.write_text("[2024-02-01 08:00:00] only one\n", encoding="utf-8")
+    assert texts(store.tail(10)) == ["only one"]
+    assert store.search("gamma") == []
+
+
+def test_picks_up_lines_appended_elsewhere(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text(LEGACY, encoding="utf-8")
+    store = NotesStore(path)
+    with path.open("a", encoding="utf-8") as f:
+        f.write("[2024-01-04 12:00:00] delta\n")
+    assert texts(store.tail(2)) == ["gamma ray", "delta"]
+    assert store.count() == 5
+
+
+def test_after_pages_forward_past_deleted_notes(tmp_path):
+    store = NotesStore(tmp_path / "notes.txt")
+    for i in range(40):
+        store.append(f"note {i}")
+    store.delete(11)
+    assert texts(store.after(9, 3)) == ["note 10", "note 12", "note 13"]
+    assert texts(store.after(37, 5)) == ["note 38", "note 39"]
+    assert store.after(39, 5) == []
+
+
+def test_window_after_hands_over_to_read_from(tmp_path):
+    store = NotesStore(tmp_path / "notes.txt")
+    for i in range(10):
+        store.append(f"note {i}")
+    notes, end = store.window(5, after=6)
+    assert texts(notes) == ["note 7", "note 8", "note 9"]
+    # the end offset continues exactly after the last note: nothing repeated, nothing skipped
+    assert store.read_from(end) == ([], end)
+    store.append("note 10")
+    new, _ = store.read_from(end)
+    assert texts(new) == ["note 10"]
@@ -0,0 +1,52 @@
+import pytest
+
+import jarvis_pro_gui_final as jarvis
+from jarvis_pro_gui_final import INTENTS, IntentRouter
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter(INTENTS)
+
+
+@pytest.mark.parametrize("command, name, args", [
+    ("search for cheap flights", "search", {"query": "cheap flights"}),
+    ("google weather radar", "search", {"query": "weather radar"}),
+    ("take a note: buy milk, eggs", "notes_write", {"action": "write", "text": "buy milk, eggs"}),
+    ("write a note", "notes_write", {"action": "write", "text": ""}),
+    ("read my notes from today", "notes_read", {"action": "read"}),
+    ("delete my last note", "notes_delete_last", {"action": "delete_last"}),
+    ("clear notes", "notes_clear", {"action": "clear"}),
+    ("notes", "notes", {}),
+    ("please close the desktop clock", "close", {"target": "the desktop clock"}),
+    ("type hello world", "type_text", {"action": "type", "text": "hello world"}),
+    ("press enter", "press_enter", {"action": "enter"}),
+    ("close tab", "close_tab", {"action": "close_tab"}),
+])
+def test_match_passes_slot(router, command, name, args):
+    match = router.match(command)
+    assert (match.name, match.args) == (name, args)
+
+
+def test_slots_split_around_keyword(router):
+    match = router.match("could you search for cats")
+    assert match.slots == {"before": "could you", "after": "cats"}
+
+
+def test_search_uses_slot_not_command(core, monkeypatch):
+    opened = []
+    monkeypatch.setattr(jarvis.webbrowser, "open", opened.append)
+    core.process_command("search for google fonts")
+    assert len(opened) == 1 and opened[0].endswith(("q=google%20fonts", "q=google fonts"))
+
+
+def test_note_text_comes_from_slot(core):
+    core.process_command("add a note: call mom, then dentist")
+    assert [n.text for n in core.notes.tail(5)] == ["call mom, then dentist"]
+
+
+def test_note_without_text_asks(core):
+    core.answers.append("water the plants")
+    core.process_command("take a note")
+    assert core.said[0] == "What should I write?"
+    assert [n.text for n in core.notes.tail(5)] == ["water the plants"]
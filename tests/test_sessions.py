@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+import jarvis_pro_gui_final as jarvis
+from jarvis_pro_gui_final import HeadlessService, JarvisCore, JsonLineClient, LazyAttribute
+
+
+@pytest.fixture
+def make_service(tmp_path):
+    services = []
+
+    def make(**overrides):
+        cfg = dict(jarvis.config, NOTES_FILE=str(tmp_path / "notes.txt"),
+                   TRANSLATION_CACHE_FILE=str(tmp_path / "translation_cache.jsonl"),
+                   APP_INDEX_FILE=str(tmp_path / "app_index.json"), APP_DISCOVERY=False,
+                   SESSION_NOTES_DIR=str(tmp_path / "sessions"), TTS_ENABLED=False, MICROPHONE=False,
+                   METRICS_ENABLED=False, **overrides)
+        service = HeadlessService(cfg)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.shutdown()
+
+
+def run(service, session_id, *commands):
+    client = JsonLineClient(io.StringIO())
+    for command in commands:
+        service.submit(client, command, session_id)
+    assert client.wait_idle(10)
+
+
+def test_settings_and_notes_are_per_session(make_service):
+    service = make_service()
+    run(service, "alice", "speak hindi", "take note alice's secret")
+    run(service, "bob", "take note bob's list")
+    alice, bob = service.sessions["alice"].core, service.sessions["bob"].core
+    assert alice.config["RESPONSE_LANGUAGE"] == "hi"
+    assert bob.config["RESPONSE_LANGUAGE"] == service.config["RESPONSE_LANGUAGE"]
+    assert service.sessions["default"].core.config["RESPONSE_LANGUAGE"] == service.config["RESPONSE_LANGUAGE"]
+    assert [n.text for n in alice.notes.tail(5)] == ["alice's secret"]
+    assert [n.text for n in bob.notes.tail(5)] == ["bob's list"]
+
+
+def test_sessions_share_lazy_engines(make_service, monkeypatch):
+    built = []
+    attr = LazyAttribute(lambda core: built.append(core) or object())
+    attr.__set_name__(JarvisCore, "translator")
+    monkeypatch.setattr(JarvisCore, "translator", attr)
+    service = make_service()
+    engines = {id(service.session(sid).core.translator) for sid in ("a", "b", "default")}
+    assert engines == {id(service.jarvis.translator)}
+    assert built == [service.jarvis]
+
+
+def test_least_recently_used_idle_sessions_are_dropped(make_service):
+    service = make_service(SESSION_MAX=3)
+    for sid in ("s1", "s2", "s3"):
+        service.session(sid)
+    assert sorted(service.sessions) == ["default", "s2", "s3"]
+
+
+def test_idle_session_expires_and_keeps_its_notes(make_service):
+    service = make_service(SESSION_IDLE_TTL=60)
+    run(service, "s1", "take note remember me")
+    service.sessions["s1"].last_used -= 120
+    service.session("s2")
+    assert "s1" not in service.sessions
+    assert [n.text for n in service.session("s1").core.notes.tail(5)] == ["remember me"]
@@ -0,0 +1,41 @@
+import types
+
+import pytest
+
+from jarvis_pro_gui_final import TTS
+
+
+def voice(id, name, languages=()):
+    return types.SimpleNamespace(id=id, name=name, languages=list(languages))
+
+
+SAPI = "HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech\\Voices\\Tokens\\"
+ONECORE = "HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech_OneCore\\Voices\\Tokens\\"
+
+
+@pytest.mark.parametrize("v, code", [
+    (voice(SAPI + "TTS_MS_EN-US_ZIRA_11.0", "Microsoft Zira Desktop - English (United States)"), "en"),
+    (voice(SAPI + "TTS_MS_EN-GB_HAZEL_11.0", "Microsoft Hazel Desktop - English (Great Britain)"), "en"),
+    (voice(SAPI + "TTS_MS_HI-IN_KALPANA_11.0", "Microsoft Kalpana Desktop - Hindi"), "hi"),
+    (voice(ONECORE + "MSTTS_V110_hiIN_HemantM", "Microsoft Hemant"), "hi"),
+    (voice("gmw/en-US", "English (America)", [b"\x05en-us"]), "en"),
+    (voice("inc/hi", "Hindi", [b"\x05hi"]), "hi"),
+    (voice("inc/pa", "Punjabi"), "pa"),
+    (voice("com.apple.voice.compact.hi-IN.Lekha", "Lekha"), "hi"),
+    (voice("com.apple.speech.synthesis.voice.Alex", "Alex", ["en_US"]), "en"),
+])
+def test_voice_codes(v, code):
+    codes = TTS._voice_lang_codes(v)
+    assert code in codes
+    assert "ms" not in codes and "tt" not in codes
+
+
+def test_index_picks_first_voice_per_language():
+    tts = TTS({"TTS_ENABLED": False})
+    zira = voice(SAPI + "TTS_MS_EN-US_ZIRA_11.0", "Microsoft Zira Desktop - English (United States)")
+    kalpana = voice(SAPI + "TTS_MS_HI-IN_KALPANA_11.0", "Microsoft Kalpana Desktop - Hindi")
+    tts.engine = types.SimpleNamespace(getProperty=lambda name: [zira, kalpana])
+    tts.refresh_voices()
+    assert tts._find_voice_for_lang("en") == zira.id
+    assert tts._find_voice_for_lang("hi") == kalpana.id
+    assert tts._find_voice_for_lang("pa") is None
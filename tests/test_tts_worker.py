@@ -0,0 +1,105 @@
+import threading
+import types
+
+import pytest
+
+import jarvis_pro_gui_final as jarvis
+from jarvis_pro_gui_final import TTS, Metrics
+
+
+class FakeEngine:
+    """pyttsx3 stand-in: records what each runAndWait spoke; the first run blocks until released."""
+
+    def __init__(self):
+        self.pending, self.spoken = [], []
+        self.speaking = threading.Event()
+        self.release = threading.Event()
+        self.idle = threading.Event()
+
+    def getProperty(self, name):
+        return {"rate": 200, "voice": "default", "voices": []}[name]
+
+    def setProperty(self, name, value):
+        pass
+
+    def connect(self, topic, callback):
+        raise NotImplementedError  # no callbacks: the worker times utterances itself
+
+    def say(self, text, name=None):
+        self.pending.append(text)
+
+    def runAndWait(self):
+        self.idle.clear()
+        if not self.spoken:
+            self.speaking.set()
+            self.release.wait(5)
+        self.spoken.extend(self.pending)
+        self.pending = []
+        self.idle.set()
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def tts(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(jarvis, "pyttsx3", types.SimpleNamespace(init=lambda: engine))
+    t = TTS({"TTS_ENABLED": True}, Metrics(enabled=True))
+    t.engine_fake = engine
+    yield t
+    t.shutdown()
+
+
+def start_speaking(tts):
+    """Speak "first" and wait until the engine is busy with it, so the next replies queue up."""
+    tts.speak("first")
+    assert tts.engine_fake.speaking.wait(5)
+
+
+def spoken_after_release(tts):
+    tts.engine_fake.release.set()
+    for _ in range(50):
+        if tts.engine_fake.idle.wait(0.1) and tts._queue.empty():
+            break
+    return tts.engine_fake.spoken
+
+
+def test_one_commands_replies_keep_their_order(tts):
+    with tts.metrics.trace():
+        start_speaking(tts)
+        for i in range(1, 5):
+            tts.speak(f"status {i}", status=True)
+        tts.speak("normal A")
+    assert spoken_after_release(tts) == ["first", "status 4", "normal A"]
+    assert tts.stats()["coalesced"] == 3
+
+
+def test_status_only_superseded_within_its_priority(tts):
+    with tts.metrics.trace():
+        start_speaking(tts)
+        tts.speak("checking", status=True)
+        tts.speak("urgent notice", priority=TTS.PRIORITY_URGENT, status=True)
+        tts.speak("done", status=True)
+    assert spoken_after_release(tts) == ["first", "urgent notice", "done"]
+
+
+def test_urgent_command_goes_first(tts):
+    with tts.metrics.trace():
+        start_speaking(tts)
+        tts.speak("normal A")
+    with tts.metrics.trace():
+        tts.speak("alarm", priority=TTS.PRIORITY_URGENT)
+    assert spoken_after_release(tts) == ["first", "alarm", "normal A"]
+
+
+def test_counters_consistent_under_concurrent_speak(tts):
+    start_speaking(tts)
+    threads = [threading.Thread(target=lambda: [tts.speak("x") for _ in range(50)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tts.cancel()
+    stats = tts.stats()
+    assert stats["dropped"] + stats["cancelled"] == 200
@@ -0,0 +1,22 @@
+import pytest
+
+from jarvis_pro_gui_final import JarvisCore
+
+
+@pytest.mark.parametrize("command, cities", [
+    ("weather in delhi, mumbai and amritsar", ["delhi", "mumbai", "amritsar"]),
+    ("weather forecast for tomorrow in delhi", ["delhi"]),
+    ("what's the weather at 5 pm in delhi", ["delhi"]),
+    ("weather in new york and in london", ["new york", "london"]),
+    ("weather in delhi tomorrow", ["delhi"]),
+    ("weather for london today", ["london"]),
+    ("weather in new delhi on monday at 6", ["new delhi"]),
+    ("weather amritsar", ["amritsar"]),
+])
+def test_cities(command, cities):
+    assert JarvisCore.parse_weather_cities(command) == cities
+
+
+@pytest.mark.parametrize("command", ["weather", "what is the weather", "weather for tomorrow", "weather at 5pm"])
+def test_no_city_asks(command):
+    assert JarvisCore.parse_weather_cities(command) == []